@@ -0,0 +1,52 @@
+"""
+File Detection Benchmark
+Per-query cost of FileManager.detect_file_from_query on representative queries
+
+    python -m benchmarks.file_detection --repeat 2000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vicky_server import file_manager  # noqa: E402
+
+QUERIES = {
+    "no file": "What is the output of code -s? Install and run Visual Studio Code and paste the output.",
+    "upload marker": "Sum the values in the CSV. The file data.csv is located at {upload}",
+    "url": "Download https://example.org/files/q-extract-csv-zip.zip and report the answer column.",
+    "example url": "Deploy to https://.your-app.vercel.app and call https://.example.com with the JSON body.",
+    "unix path": "Read /nonexistent/path/to/report.pdf and count the tables on page 3.",
+    "known file": "Use q-fastapi.csv to build the API; what is the URL of the endpoint?",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as upload:
+        upload.write(b"a,b\n1,2\n")
+    try:
+        print(f"{'query':<14} {'us/query':>9}  source")
+        total = 0.0
+        for name, query in QUERIES.items():
+            query = query.format(upload=upload.name)
+            info = file_manager.detect_file_from_query(query)  # warm up
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                file_manager.detect_file_from_query(query)
+            elapsed = (time.perf_counter() - started) / args.repeat * 1e6
+            total += elapsed
+            print(f"{name:<14} {elapsed:>9.1f}  {info.get('source')}")
+        print(f"{'mean':<14} {total / len(QUERIES):>9.1f}")
+    finally:
+        os.unlink(upload.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Log Ingest Benchmark
+Parse a synthetic multi-million-line gzipped Apache log with 1..N worker processes
+
+    python -m benchmarks.log_ingest --lines 3000000 --max-workers 8
+"""
+import argparse
+import gzip
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.solvers.log_engine import LogTable, parse_workers  # noqa: E402
+
+URLS = ["/kannada/", "/kannada/song%20one.mp3", "/telugu/", "/carnatic/", "/carnatic/raga%20list.mp3",
+        "/hindi/", "/blog/", "/", "/favicon.ico", "/tamil/track.mp3"]
+AGENTS = ["Mozilla/5.0 (Windows NT 10.0; Win64; x64)", "Mozilla/5.0 (X11; Linux x86_64)",
+          "Googlebot/2.1 (+http://www.google.com/bot.html)", 'curl/8.0 \\"quoted\\"']
+
+
+def generate_log(path: str, lines: int, seed: int = 0):
+    """Write a gzipped combined-format log with vhost and server columns"""
+    rng = random.Random(seed)
+    ips = [f"{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+           for _ in range(5000)]
+    batch = 100000
+    with gzip.open(path, "wt", encoding="utf-8", compresslevel=6) as f:
+        for start in range(0, lines, batch):
+            rows = []
+            for _ in range(min(batch, lines - start)):
+                rows.append(
+                    f'{rng.choice(ips)} - - [{rng.randint(1, 31):02d}/May/2024:{rng.randint(0, 23):02d}:'
+                    f'{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d} -0500] '
+                    f'"{rng.choice(("GET", "GET", "GET", "POST", "HEAD"))} {rng.choice(URLS)} HTTP/1.1" '
+                    f'{rng.choice((200, 200, 200, 206, 304, 404))} {rng.randint(0, 100000)} "-" '
+                    f'"{rng.choice(AGENTS)}" s-anand.net 10.0.0.{rng.randint(1, 4)}\n'
+                )
+            f.write("".join(rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=3_000_000)
+    parser.add_argument("--max-workers", type=int, default=parse_workers(sys.maxsize))
+    parser.add_argument("--log", help="existing log to reuse (generated if missing)")
+    args = parser.parse_args()
+
+    path = args.log or os.path.join(tempfile.gettempdir(), f"synthetic-access-{args.lines}.log.gz")
+    if not os.path.exists(path):
+        print(f"Generating {args.lines:,} lines at {path} ...")
+        started = time.perf_counter()
+        generate_log(path, args.lines)
+        print(f"  {time.perf_counter() - started:.1f}s, {os.path.getsize(path) / 2**20:.1f} MB gzipped")
+
+    baseline = reference = None
+    print(f"{'workers':>7} {'seconds':>8} {'lines/s':>11} {'speedup':>7}")
+    for workers in range(1, max(1, args.max_workers) + 1):
+        started = time.perf_counter()
+        table = LogTable.from_file(path, workers=workers)
+        elapsed = time.perf_counter() - started
+
+        # Same partial-aggregate results regardless of the worker count
+        result = (len(table), table.count(method="GET", path_prefix="/kannada/", weekday=6),
+                  table.bytes_by_ip(path_prefix="/carnatic/").sum())
+        if reference is None:
+            baseline, reference = elapsed, result
+        elif result != reference:
+            raise SystemExit(f"Result mismatch with {workers} workers: {result} != {reference}")
+        print(f"{workers:>7} {elapsed:>8.2f} {len(table) / elapsed:>11,.0f} {baseline / elapsed:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Answer Cache
+LRU/TTL cache of solver answers keyed by solver, parameters and input content
+"""
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from src.core.config import settings
+from src.core.content_signature import file_signature
+from src.core.question_router import file_suffix
+from src.core.shared_cache import shared_cache
+
+logger = logging.getLogger(__name__)
+
+# Per-solver cache policy, keyed by solution file suffix. Solvers with side
+# effects (repos, deployments, pushed images, servers, tunnels) are not
+# cached unless flipped to True here; live-data solvers get a short TTL.
+SOLVER_CACHE_POLICY: Dict[str, Dict[str, Any]] = {
+    # Side effects
+    "GA1/thirteenth.py": {"cache": False},  # creates a GitHub repository
+    "GA2/third.py": {"cache": False},       # publishes GitHub Pages
+    "GA2/sixth.py": {"cache": False},       # deploys to Vercel / starts a server
+    "GA2/seventh.py": {"cache": False},     # creates and triggers a GitHub Action
+    "GA2/eighth.py": {"cache": False},      # pushes a Docker Hub image
+    "GA2/ninth.py": {"cache": False},       # starts a FastAPI server
+    "GA2/tenth.py": {"cache": False},       # llamafile server + ngrok tunnel
+    "GA3/seventh.py": {"cache": False},     # starts a FastAPI server
+    "GA3/eighth.py": {"cache": False},      # starts a FastAPI server
+    "GA4/eighth.py": {"cache": False},      # scheduled GitHub Action commit
+    # Live data
+    "GA1/first.py": {"ttl": 60},
+    "GA4/first.py": {"ttl": 600},
+    "GA4/second.py": {"ttl": 600},
+    "GA4/fourth.py": {"ttl": 600},
+    "GA4/fifth.py": {"ttl": 600},
+    "GA4/sixth.py": {"ttl": 600},
+    "GA4/seventh.py": {"ttl": 600},
+}
+
+# Outputs that describe a failure rather than an answer are never stored
+UNCACHEABLE_PREFIXES = ("error", "no solution available")
+
+
+def normalize_parameters(query: Optional[str], file_path: Optional[str] = None) -> str:
+    """
+    Query text as a cache parameter: the input file path (which differs per
+    upload) is replaced by a placeholder and whitespace is collapsed. Case is
+    kept because solvers read case-sensitive values from the query.
+    """
+    if not query:
+        return ""
+    if file_path:
+        query = query.replace(file_path, "<file>")
+    return re.sub(r'\s+', ' ', query).strip()
+
+
+def invocation_key(solution_path: str, query: Optional[str],
+                   file_info: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Identity of one solver invocation: the routed solver, the normalized
+    query parameters and the content signature of the detected input file.
+    """
+    file_path = signature = None
+    if file_info and file_info.get("exists"):
+        file_path = file_info.get("path")
+        signature = file_info.get("content_signature")
+        if file_info.get("is_remote"):
+            file_path = None  # the URL is the parameter
+        elif signature is None and file_path:
+            signature = file_signature(file_path)
+
+    material = json.dumps([file_suffix(solution_path), normalize_parameters(query, file_path), signature])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """
+    Thread-safe LRU cache of solver answers with per-entry expiry.
+
+    Keys combine the routed solver, the normalized query parameters and the
+    content signature of the detected input file, so re-uploads of the same
+    file hit while edited files miss.
+
+    With a ``backend`` (a SharedCache) this is the in-process front of a
+    host-wide tier: misses fall through to the backend, stores write
+    through, and ``warm()`` preloads the most recently used answers.
+    """
+
+    NAMESPACE = "answers"
+
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[float] = None,
+                 policy: Optional[Dict[str, Dict[str, Any]]] = None, enabled: Optional[bool] = None,
+                 backend=None):
+        self.max_entries = settings.ANSWER_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.ttl = settings.ANSWER_CACHE_TTL_SECONDS if ttl is None else ttl
+        self.policy = SOLVER_CACHE_POLICY if policy is None else policy
+        self.enabled = settings.ANSWER_CACHE_ENABLED if enabled is None else enabled
+        self.backend = backend
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "shared_hits": 0, "stores": 0, "bypassed": 0,
+                      "evictions": 0, "expirations": 0}
+
+    def policy_for(self, solution_path: str) -> Dict[str, Any]:
+        policy = self.policy.get(file_suffix(solution_path), {})
+        return {"cache": policy.get("cache", True), "ttl": policy.get("ttl", self.ttl)}
+
+    def key_for(self, solution_path: str, query: Optional[str],
+                file_info: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Cache key for one invocation, or None if the solver is not cacheable"""
+        return self.cache_key(invocation_key(solution_path, query, file_info), solution_path)
+
+    def cache_key(self, call_key: str, solution_path: str) -> Optional[str]:
+        """call_key if answers of this solver may be cached, else None"""
+        if not self.enabled or not self.max_entries or not self.policy_for(solution_path)["cache"]:
+            with self._lock:
+                self.stats["bypassed"] += 1
+            return None
+        return call_key
+
+    def get(self, key: Optional[str]) -> Optional[str]:
+        """Cached answer for key, or None"""
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                answer, expires_at = entry
+                if expires_at >= time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return answer
+                del self._entries[key]
+                self.stats["expirations"] += 1
+
+        shared = self._backend_get(key)
+        with self._lock:
+            if shared is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["shared_hits"] += 1
+            self._remember(key, *shared)
+            return shared[0]
+
+    def _backend_get(self, key: str):
+        """(answer, expires_at) from the shared tier, or None"""
+        if self.backend is None:
+            return None
+        try:
+            entry = self.backend.get_entry(self.NAMESPACE, key)
+        except Exception as e:
+            logger.warning(f"Shared answer cache unavailable: {e}")
+            return None
+        if entry is None:
+            return None
+        # Keep it locally only for what is left of the expiry set by the solver's policy
+        value, expires_at = entry
+        remaining = self.ttl if expires_at is None else expires_at - time.time()
+        return value.decode("utf-8"), time.monotonic() + remaining
+
+    def put(self, key: Optional[str], answer: Any, solution_path: str) -> bool:
+        """Store a successful answer; returns whether it was stored"""
+        if key is None or answer is None:
+            return False
+        answer = str(answer)
+        if not answer.strip():
+            return False
+        if answer.lstrip().lower().startswith(UNCACHEABLE_PREFIXES):
+            return False
+
+        ttl = self.policy_for(solution_path)["ttl"]
+        with self._lock:
+            self._remember(key, answer, time.monotonic() + ttl)
+            self.stats["stores"] += 1
+        if self.backend is not None:
+            try:
+                self.backend.put(self.NAMESPACE, key, answer.encode("utf-8"), ttl=ttl)
+            except Exception as e:
+                logger.warning(f"Shared answer cache unavailable: {e}")
+        return True
+
+    def _remember(self, key: str, answer: str, expires_at: float):
+        """Insert into the in-process LRU (caller holds the lock)"""
+        self._entries[key] = (answer, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def warm(self, limit: Optional[int] = None) -> int:
+        """Preload the most recently used shared answers; returns how many"""
+        if self.backend is None or not self.enabled:
+            return 0
+        limit = min(self.max_entries, settings.SHARED_CACHE_WARM_ENTRIES if limit is None else limit)
+        try:
+            rows = self.backend.recent(self.NAMESPACE, limit)
+        except Exception as e:
+            logger.warning(f"Shared answer cache unavailable: {e}")
+            return 0
+        now, wall_now = time.monotonic(), time.time()
+        with self._lock:
+            # Oldest first so the most recent end up at the LRU tail
+            for key, value, expires_at in reversed(rows):
+                remaining = self.ttl if expires_at is None else expires_at - wall_now
+                self._remember(key, value.decode("utf-8"), now + remaining)
+        return len(rows)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Global answer cache (in-process front of the shared tier, when enabled)
+answer_cache = AnswerCache(backend=shared_cache)
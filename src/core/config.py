@@ -3,6 +3,7 @@ Application Configuration
 Centralized settings for TDS Assistant
 """
 import os
+import tempfile
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -41,6 +42,64 @@ class Settings:
     # Notification Settings
     NOTIF_INTERVAL_SECONDS: int = int(os.getenv("NOTIF_INTERVAL_SECONDS", "300"))
     
+    # Solver Execution (0 workers runs solvers in threads, without limits)
+    SOLVER_WORKERS: int = int(os.getenv("SOLVER_WORKERS", "2"))
+    SOLVER_MAX_QUEUE: int = int(os.getenv("SOLVER_MAX_QUEUE", "8"))
+    SOLVER_TIMEOUT_SECONDS: float = float(os.getenv("SOLVER_TIMEOUT_SECONDS", "120"))
+    SOLVER_MEMORY_LIMIT_MB: int = int(os.getenv("SOLVER_MEMORY_LIMIT_MB", "2048"))
+    SOLVER_VERBOSE: bool = os.getenv("SOLVER_VERBOSE", "false").lower() == "true"
+    
+    # Answer Cache
+    ANSWER_CACHE_ENABLED: bool = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+    ANSWER_CACHE_MAX_ENTRIES: int = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "512"))
+    ANSWER_CACHE_TTL_SECONDS: float = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+    
+    # Shared Cache (one SQLite store per host, shared by all workers)
+    SHARED_CACHE_ENABLED: bool = os.getenv("SHARED_CACHE_ENABLED", "true").lower() == "true"
+    SHARED_CACHE_DIR: str = os.getenv("SHARED_CACHE_DIR", os.path.join(tempfile.gettempdir(), "tds-cache"))
+    SHARED_CACHE_MAX_MB: int = int(os.getenv("SHARED_CACHE_MAX_MB", "512"))
+    SHARED_CACHE_WARM_ENTRIES: int = int(os.getenv("SHARED_CACHE_WARM_ENTRIES", "256"))
+    DOWNLOAD_CACHE_TTL_SECONDS: float = float(os.getenv("DOWNLOAD_CACHE_TTL_SECONDS", "86400"))
+    
+    # Upload Index (periodic rescan interval; inotify delivers changes sooner)
+    UPLOAD_INDEX_RESCAN_SECONDS: float = float(os.getenv("UPLOAD_INDEX_RESCAN_SECONDS", "30"))
+    
+    # Upload Store (content-addressed; uploads expire after the retention period)
+    UPLOAD_STORE_DIR: str = os.getenv("UPLOAD_STORE_DIR", "uploads")
+    UPLOAD_STORE_MAX_MB: int = int(os.getenv("UPLOAD_STORE_MAX_MB", "1024"))
+    UPLOAD_RETENTION_HOURS: float = float(os.getenv("UPLOAD_RETENTION_HOURS", "168"))
+    
+    # Upload Registry (file IDs shared by all workers; this many are kept in memory per worker)
+    UPLOAD_REGISTRY_MAX_ENTRIES: int = int(os.getenv("UPLOAD_REGISTRY_MAX_ENTRIES", "1024"))
+    
+    # Upload Limits (default matches nginx client_max_body_size; overrides as "/path=MB,...")
+    UPLOAD_MAX_MB: float = float(os.getenv("UPLOAD_MAX_MB", "50"))
+    UPLOAD_ENDPOINT_LIMITS_MB: str = os.getenv("UPLOAD_ENDPOINT_LIMITS_MB", "")
+    
+    # Remote Downloads (cached copies are revalidated with ETag/Last-Modified after this long)
+    DOWNLOAD_MAX_MB: float = float(os.getenv("DOWNLOAD_MAX_MB", "100"))
+    DOWNLOAD_TIMEOUT_SECONDS: float = float(os.getenv("DOWNLOAD_TIMEOUT_SECONDS", "60"))
+    DOWNLOAD_REVALIDATE_SECONDS: float = float(os.getenv("DOWNLOAD_REVALIDATE_SECONDS", "300"))
+    
+    # Content Signatures (full mode hashes whole files instead of the first and last 2 KB)
+    SIGNATURE_FULL_CONTENT: bool = os.getenv("SIGNATURE_FULL_CONTENT", "false").lower() == "true"
+    
+    # Workspaces (per-invocation scratch directories; leftovers of killed workers expire)
+    WORKSPACE_DIR: str = os.getenv("WORKSPACE_DIR", os.path.join(tempfile.gettempdir(), "tds-workspaces"))
+    WORKSPACE_MAX_AGE_SECONDS: float = float(os.getenv("WORKSPACE_MAX_AGE_SECONDS", "3600"))
+    
+    # Artifact Janitor (age and size quota per artifact directory, e.g. static/audio)
+    ARTIFACT_MAX_AGE_HOURS: float = float(os.getenv("ARTIFACT_MAX_AGE_HOURS", "24"))
+    ARTIFACT_MAX_MB: int = int(os.getenv("ARTIFACT_MAX_MB", "512"))
+    JANITOR_INTERVAL_SECONDS: float = float(os.getenv("JANITOR_INTERVAL_SECONDS", "600"))
+    
+    # Log Parsing (0 workers uses every available core)
+    LOG_PARSE_WORKERS: int = int(os.getenv("LOG_PARSE_WORKERS", "0"))
+    LOG_PARALLEL_MIN_MB: int = int(os.getenv("LOG_PARALLEL_MIN_MB", "16"))
+    
+    # PDF Extraction (tables and text, pages extracted in parallel; 0 workers uses every available core)
+    PDF_EXTRACT_WORKERS: int = int(os.getenv("PDF_EXTRACT_WORKERS", "0"))
+    
     # CORS
     CORS_ORIGINS: list = ["*"]
     
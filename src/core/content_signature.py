@@ -0,0 +1,137 @@
+"""
+Content Signature
+Fast file signatures for cache keys, memoized by (inode, size, mtime)
+"""
+import hashlib
+import os
+import stat as stat_module
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from src.core.config import settings
+
+# Sampled signatures hash this many bytes: the first and last halves
+SIGNATURE_BYTES = 4096
+
+READ_BYTES = 1024 * 1024
+MAX_MEMOIZED = 4096
+
+
+def _hasher():
+    return hashlib.blake2b(digest_size=16)
+
+
+def _sampled_digest(head: bytes, tail: bytes, size: int, max_bytes: int) -> str:
+    """Whole content up to max_bytes, otherwise first and last halves plus the size"""
+    digest = _hasher()
+    if size <= max_bytes:
+        digest.update(head[:size])
+    else:
+        digest.update(head[:max_bytes // 2])
+        digest.update(tail)
+        digest.update(str(size).encode())
+    return digest.hexdigest()
+
+
+class ContentSignature:
+    """
+    Incremental form of ``file_signature``, for data seen once while it
+    is written (uploads); gives the same value as signing the finished file.
+    """
+
+    def __init__(self, full: Optional[bool] = None, max_bytes: int = SIGNATURE_BYTES):
+        self.full = settings.SIGNATURE_FULL_CONTENT if full is None else full
+        self.max_bytes = max_bytes
+        self.half = max_bytes // 2
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.size = 0
+        self._full_digest = _hasher() if self.full else None
+
+    def update(self, chunk: bytes):
+        self.size += len(chunk)
+        if self._full_digest is not None:
+            self._full_digest.update(chunk)
+            return
+        if len(self.head) < self.max_bytes:
+            self.head += chunk[:self.max_bytes - len(self.head)]
+        self.tail += chunk[-self.half:]
+        del self.tail[:-self.half]
+
+    def hexdigest(self) -> str:
+        if self._full_digest is not None:
+            return self._full_digest.hexdigest()
+        return _sampled_digest(bytes(self.head), bytes(self.tail), self.size, self.max_bytes)
+
+
+_memo: "OrderedDict[tuple, str]" = OrderedDict()
+_memo_lock = threading.Lock()
+stats = {"hits": 0, "computed": 0}
+
+
+def _memo_key(stat: os.stat_result, full: bool, max_bytes: int) -> tuple:
+    return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns, full, max_bytes)
+
+
+def _memoize(key: tuple, signature: str):
+    with _memo_lock:
+        _memo[key] = signature
+        _memo.move_to_end(key)
+        while len(_memo) > MAX_MEMOIZED:
+            _memo.popitem(last=False)
+
+
+def file_signature(path: str, full: Optional[bool] = None, max_bytes: int = SIGNATURE_BYTES) -> Optional[str]:
+    """
+    Signature of a regular file's content, or None if it cannot be read.
+
+    By default only the first and last ``max_bytes // 2`` bytes and the size
+    are hashed; ``full`` (or SIGNATURE_FULL_CONTENT) hashes everything.
+    Results are reused while the file's inode, size and mtime are unchanged.
+    """
+    full = settings.SIGNATURE_FULL_CONTENT if full is None else full
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    if not stat_module.S_ISREG(stat.st_mode):
+        return None
+
+    key = _memo_key(stat, full, max_bytes)
+    with _memo_lock:
+        signature = _memo.get(key)
+        if signature is not None:
+            _memo.move_to_end(key)
+            stats["hits"] += 1
+            return signature
+
+    try:
+        with open(path, "rb") as f:
+            if full:
+                digest = _hasher()
+                for chunk in iter(lambda: f.read(READ_BYTES), b""):
+                    digest.update(chunk)
+                signature = digest.hexdigest()
+            elif stat.st_size <= max_bytes:
+                signature = _sampled_digest(f.read(), b"", stat.st_size, max_bytes)
+            else:
+                head = f.read(max_bytes // 2)
+                f.seek(-(max_bytes // 2), os.SEEK_END)
+                signature = _sampled_digest(head, f.read(), stat.st_size, max_bytes)
+    except OSError:
+        return None
+
+    stats["computed"] += 1
+    _memoize(key, signature)
+    return signature
+
+
+def remember_signature(path: str, signature: str, full: Optional[bool] = None,
+                       max_bytes: int = SIGNATURE_BYTES):
+    """Record a signature computed while the file was written, so it is not re-read"""
+    full = settings.SIGNATURE_FULL_CONTENT if full is None else full
+    try:
+        _memoize(_memo_key(os.stat(path), full, max_bytes), signature)
+    except OSError:
+        pass
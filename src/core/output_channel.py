@@ -0,0 +1,99 @@
+"""
+Output Channel
+Per-invocation capture of solver output, safe under threads and asyncio
+"""
+import io
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from src.core.config import settings
+
+# Buffer receiving print() output in the current context (None = pass through)
+_channel: ContextVar[Optional[io.StringIO]] = ContextVar("solver_output_channel", default=None)
+_verbose: ContextVar[Optional[bool]] = ContextVar("solver_verbose", default=None)
+
+
+class _Discard:
+    """Write sink for discarded output"""
+
+    def write(self, text):
+        return len(text)
+
+    def getvalue(self):
+        return ""
+
+
+class ChannelWriter:
+    """
+    Stand-in for sys.stdout that writes to the calling context's channel.
+
+    Installed once; contexts without a channel write straight through to
+    the stream it replaced, so unrelated output is unaffected.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, text):
+        channel = _channel.get()
+        if channel is None:
+            return self._stream.write(text)
+        return channel.write(text)
+
+    def flush(self):
+        if _channel.get() is None:
+            self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def install():
+    """Route sys.stdout through the channel writer (idempotent)"""
+    if not isinstance(sys.stdout, ChannelWriter):
+        sys.stdout = ChannelWriter(sys.stdout)
+
+
+@contextmanager
+def capture_output(verbose: Optional[bool] = None):
+    """
+    Collect everything printed in this context (this thread or task only).
+
+    Yields a StringIO; read it with ``getvalue()``. ``verbose`` overrides
+    whether ``progress()`` messages are emitted inside the block.
+    """
+    install()
+    buffer = io.StringIO()
+    token = _channel.set(buffer)
+    verbose_token = _verbose.set(verbose) if verbose is not None else None
+    try:
+        yield buffer
+    finally:
+        if verbose_token is not None:
+            _verbose.reset(verbose_token)
+        _channel.reset(token)
+
+
+@contextmanager
+def discard_output():
+    """Drop everything printed in this context"""
+    install()
+    token = _channel.set(_Discard())
+    try:
+        yield
+    finally:
+        _channel.reset(token)
+
+
+def is_verbose() -> bool:
+    """Whether progress messages are enabled in this context"""
+    verbose = _verbose.get()
+    return settings.SOLVER_VERBOSE if verbose is None else verbose
+
+
+def progress(*args, **kwargs):
+    """print() for progress chatter; a no-op unless verbose"""
+    if is_verbose():
+        print(*args, **kwargs)
@@ -0,0 +1,298 @@
+"""
+Question Router
+Inverted index over the question bank, built once at startup
+"""
+import copy
+import re
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Any, Tuple
+
+KEYWORD_RE = re.compile(r'\b\w+\b')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Patterns recorded for every stored question
+QUESTION_PATTERNS = {
+    "code_command": re.compile(r'code\s+(-[a-z]+|--[a-z]+)'),
+    "email": re.compile(r'[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+'),
+    "date_range": re.compile(r'(\d{4}[-/]\d{1,2}[-/]\d{1,2})\s+to\s+(\d{4}[-/]\d{1,2}[-/]\d{1,2})'),
+    "pdf_extraction": re.compile(r'pdf|extract|table|marks|physics|maths'),
+    "github_pages": re.compile(r'github\s+pages|showcase|email_off'),
+    "github_action": re.compile(r'github\s+action|workflow|yml|steps:|run:'),
+    "github_search": re.compile(r'github\s+search|location:|followers:|sort by'),
+    "vercel": re.compile(r'vercel|deploy|api\?name=|students\.json'),
+    "hidden_input": re.compile(r'hidden\s+input|secret\s+value'),
+    "sql_query": re.compile(r'sql|query|select|from|where'),
+    "weekdays": re.compile(r'monday|tuesday|wednesday|thursday|friday|saturday|sunday'),
+}
+
+# Patterns detected in incoming queries (order matters for score accumulation)
+QUERY_PATTERNS = {
+    "code_command": re.compile(r'code\s+(-[a-z]+|--[a-z]+)'),
+    "email": re.compile(r'[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+'),
+    "date_range": re.compile(r'(\d{4}[-/]\d{1,2}[-/]\d{1,2})\s+to\s+(\d{4}[-/]\d{1,2}[-/]\d{1,2})'),
+    "pdf_extraction": re.compile(r'pdf|extract|table|marks|physics|maths|students'),
+    "github_pages": re.compile(r'github\s+pages|showcase|email_off'),
+    "vercel": re.compile(r'vercel|deploy|api\?name=|students\.json'),
+    "hidden_input": re.compile(r'hidden\s+input|secret\s+value'),
+    "weekdays": re.compile(r'monday|tuesday|wednesday|thursday|friday|saturday|sunday'),
+    "github_action": re.compile(r'github\s+action|workflow|yml|steps:|run:'),
+    "github_search": re.compile(r'github\s+search|location:|followers:|sort by'),
+    "image_compression": re.compile(r'compress\s+.*\s+image|lossless|bytes'),
+    "pixel_counting": re.compile(r'pixel|lightness|brightness'),
+    "file_extraction": re.compile(r'extract\s+.*\s+(zip|csv|file)|unzip'),
+    "sql_query": re.compile(r'sql|query|select|from|where'),
+}
+
+# Domain classification used to boost questions from the same area
+DOMAIN_INDICATORS = {
+    "vscode": ["code -", "visual studio code", "vscode", "--version", "--help", "-v", "-h"],
+    "github": ["github", "repository", "commit", "action", "pages"],
+    "excel": ["excel", "sales", "margin", "clean", "data"],
+    "colab": ["colab", "google", "notebook", "calculate", "pixels"],
+    "vercel": ["vercel", "deploy", "api", "marks", "students"],
+    "fastapi": ["fastapi", "api", "endpoint", "server"],
+    "file_processing": ["extract", "zip", "csv", "replace", "compare"],
+    "markdown": ["markdown", "heading", "bold", "italic", "hyperlink"],
+    "image": ["image", "compress", "lossless", "bytes", "pixel"],
+    "openai": ["openai", "api", "completion", "sentiment", "embedding"]
+}
+
+# Score weights and acceptance threshold
+BASE_WEIGHT = 0.4
+PATTERN_WEIGHT = 0.3
+DOMAIN_WEIGHT = 0.2
+KEYWORD_WEIGHT = 0.1
+MIN_MATCH_SCORE = 0.35
+
+
+def normalize_text(text):
+    """Normalize text for similarity matching"""
+    if not text:
+        return ""
+    return _WHITESPACE_RE.sub(' ', text.lower()).strip()
+
+
+def extract_keywords(text):
+    """Return the set of lowercase word tokens in text"""
+    return set(KEYWORD_RE.findall(text.lower()))
+
+
+def extract_question_patterns(question_text):
+    """Flag which QUESTION_PATTERNS occur in a stored question"""
+    text_lower = question_text.lower()
+    return {name: bool(pattern.search(text_lower)) for name, pattern in QUESTION_PATTERNS.items()}
+
+
+def extract_query_patterns(query):
+    """Flag which QUERY_PATTERNS occur in an incoming query"""
+    query_lower = query.lower()
+    return {name: bool(pattern.search(query_lower)) for name, pattern in QUERY_PATTERNS.items()}
+
+
+def classify_primary_domain(query_lower):
+    """Pick the domain with the most indicator hits (first one wins ties)"""
+    domain_scores = {}
+    for domain, indicators in DOMAIN_INDICATORS.items():
+        score = sum(3 if indicator in query_lower else 0 for indicator in indicators)
+        if score > 0:
+            domain_scores[domain] = score
+    return max(domain_scores.items(), key=lambda x: x[1])[0] if domain_scores else None
+
+
+def domain_boost(primary_domain, query_patterns, file_path):
+    """Boost for a question whose (lowercase) file path fits the query's domain"""
+    if primary_domain == "vscode" and "GA1/first" in file_path:
+        return 0.3
+    elif primary_domain == "github":
+        if query_patterns.get("github_search") and "GA5/third" in file_path:
+            return 0.4
+        elif query_patterns.get("github_pages") and "GA2/third" in file_path:
+            return 0.4
+        elif query_patterns.get("github_action") and "GA2/seventh" in file_path:
+            return 0.4
+        elif "GA1/thirteenth" in file_path:
+            return 0.2
+    elif primary_domain == "excel" and "GA5/first" in file_path:
+        return 0.3
+    elif primary_domain == "vercel" and "GA2/sixth" in file_path:
+        return 0.3
+    elif primary_domain == "fastapi" and ("GA2/ninth" in file_path or "GA3/seventh" in file_path):
+        return 0.3
+    elif primary_domain == "file_processing" and any(x in file_path for x in ["eighth", "twelfth", "fourteenth", "seventeenth"]):
+        return 0.3
+    elif primary_domain == "image" and ("GA2/second" in file_path or "GA2/fifth" in file_path):
+        return 0.3
+    elif primary_domain == "openai" and "GA3" in file_path:
+        return 0.25
+    return 0
+
+
+def file_suffix(file_path, parts=2):
+    """Normalize a solution path to its last components, e.g. 'GA2/tenth.py'"""
+    if not file_path:
+        return ""
+    components = [c for c in re.split(r'[\\/]+', file_path) if c]
+    return "/".join(components[-parts:])
+
+
+class QuestionRouter:
+    """
+    Precompiled index over processed questions.
+
+    Per-query work is driven by the query's own tokens and patterns: token and
+    pattern postings give the cheap score components, a length-sorted table
+    bounds the text similarity of everything else, and the expensive
+    SequenceMatcher ratio is only computed for candidates whose upper bound
+    can still reach the top of the ranking.
+    """
+
+    def __init__(self, processed_questions: List[Dict[str, Any]]):
+        self.questions = list(processed_questions)
+        self.token_postings: Dict[str, List[int]] = defaultdict(list)
+        self.pattern_postings: Dict[str, List[int]] = defaultdict(list)
+        self.by_suffix: Dict[str, Dict] = {}
+        self._matchers: List[SequenceMatcher] = []
+        self._lengths: List[int] = []
+        self._file_paths: List[str] = []
+        self._domain_boosts: Dict[Tuple, Dict[int, float]] = {}
+
+        for pos, question in enumerate(self.questions):
+            text = normalize_text(question["text"])
+            matcher = SequenceMatcher(None, "", text)
+            matcher.quick_ratio()  # Prime the shared character counts of the question side
+            self._matchers.append(matcher)
+            self._lengths.append(len(text))
+            self._file_paths.append(question.get("file_path", "").lower())
+
+            for token in question.get("keywords", ()):
+                self.token_postings[token].append(pos)
+            for pattern_name, present in question.get("patterns", {}).items():
+                if present:
+                    self.pattern_postings[pattern_name].append(pos)
+
+            suffix = file_suffix(question.get("file_path", ""))
+            if suffix and suffix not in self.by_suffix:
+                self.by_suffix[suffix] = question["original"]
+
+        # Questions ordered by normalized length for similarity bounds
+        self._by_length = sorted(range(len(self.questions)), key=lambda pos: self._lengths[pos])
+        self._sorted_lengths = [self._lengths[pos] for pos in self._by_length]
+
+        # Pattern score as accumulated one match at a time
+        self._pattern_scores = [0.0]
+        for _ in QUERY_PATTERNS:
+            self._pattern_scores.append(self._pattern_scores[-1] + 0.15)
+
+    def question_for_file(self, suffix: str) -> Optional[Dict]:
+        """Return the stored question for a solution path suffix like 'GA2/tenth.py'"""
+        return self.by_suffix.get(file_suffix(suffix))
+
+    def _boosts_for(self, primary_domain, query_patterns) -> Dict[int, float]:
+        """Memoized per-question domain boosts for one domain/pattern combination"""
+        key = (primary_domain, bool(query_patterns.get("github_search")),
+               bool(query_patterns.get("github_pages")), bool(query_patterns.get("github_action")))
+        boosts = self._domain_boosts.get(key)
+        if boosts is None:
+            boosts = {}
+            if primary_domain is not None:
+                for pos, file_path in enumerate(self._file_paths):
+                    boost = domain_boost(primary_domain, query_patterns, file_path)
+                    if boost:
+                        boosts[pos] = boost
+            self._domain_boosts[key] = boosts
+        return boosts
+
+    def _length_window(self, query_length, threshold):
+        """Positions whose length alone allows BASE_WEIGHT * ratio >= threshold"""
+        if threshold <= 0:
+            return self._by_length
+        if query_length == 0 or threshold > BASE_WEIGHT:
+            return []
+        # ratio <= 2*min(la, lb) / (la + lb); solve for the admissible lb range
+        r = threshold / BASE_WEIGHT
+        low = int(query_length * r / (2 - r))
+        high = int(query_length * (2 - r) / r) + 1
+        return self._by_length[bisect_left(self._sorted_lengths, low):bisect_right(self._sorted_lengths, high)]
+
+    def rank(self, query: str, k: int = 1, min_score: float = 0.0) -> List[Dict[str, Any]]:
+        """
+        Rank stored questions against a query.
+
+        Returns the top ``k`` questions scoring at least ``min_score``, with
+        the same scores and order (earliest question wins ties) as scoring
+        every question exhaustively.
+        """
+        if not query or not self.questions:
+            return []
+
+        query_lower = query.lower()
+        normalized_query = normalize_text(query)
+        query_patterns = extract_query_patterns(query)
+        primary_domain = classify_primary_domain(query_lower)
+        query_keywords = set(KEYWORD_RE.findall(query_lower))
+
+        # Cheap score components from postings
+        keyword_overlap: Dict[int, int] = defaultdict(int)
+        for token in query_keywords:
+            for pos in self.token_postings.get(token, ()):
+                keyword_overlap[pos] += 1
+
+        pattern_hits: Dict[int, int] = defaultdict(int)
+        for pattern_name, present in query_patterns.items():
+            if present:
+                for pos in self.pattern_postings.get(pattern_name, ()):
+                    pattern_hits[pos] += 1
+
+        boosts = self._boosts_for(primary_domain, query_patterns)
+
+        candidates = set(keyword_overlap) | set(pattern_hits) | set(boosts)
+        candidates.update(self._length_window(len(normalized_query), min_score))
+
+        bounded = []
+        query_length = len(normalized_query)
+        for pos in candidates:
+            cheap = (self._pattern_scores[pattern_hits.get(pos, 0)] * PATTERN_WEIGHT,
+                     boosts.get(pos, 0) * DOMAIN_WEIGHT,
+                     min(0.1, keyword_overlap.get(pos, 0) / 20) * KEYWORD_WEIGHT)
+            total_length = query_length + self._lengths[pos]
+            ratio_bound = 2.0 * min(query_length, self._lengths[pos]) / total_length if total_length else 1.0
+            upper = ratio_bound * BASE_WEIGHT + cheap[0] + cheap[1] + cheap[2]
+            if upper >= min_score:
+                bounded.append((upper, pos, cheap))
+        bounded.sort(key=lambda item: (-item[0], item[1]))
+
+        results: List[Tuple[float, int]] = []
+        for upper, pos, cheap in bounded:
+            if len(results) >= k and upper < results[-1][0]:
+                break
+            matcher = copy.copy(self._matchers[pos])
+            matcher.set_seq1(normalized_query)
+            if len(results) >= k:
+                kth = results[-1][0]
+                if matcher.quick_ratio() * BASE_WEIGHT + cheap[0] + cheap[1] + cheap[2] < kth:
+                    continue
+            score = matcher.ratio() * BASE_WEIGHT + cheap[0] + cheap[1] + cheap[2]
+            if score < min_score:
+                continue
+            results.append((score, pos))
+            results.sort(key=lambda item: (-item[0], item[1]))
+            del results[k:]
+
+        return [
+            {
+                "question": self.questions[pos],
+                "score": score,
+                "confidence": min(100, int((score / 1.0) * 100)),
+                "primary_domain": primary_domain,
+            }
+            for score, pos in results
+        ]
+
+    def best_match(self, query: str, min_score: float = MIN_MATCH_SCORE) -> Optional[Dict[str, Any]]:
+        """Return the top-ranked question if it clears the confidence threshold"""
+        ranked = self.rank(query, k=1, min_score=min_score)
+        if ranked and ranked[0]["score"] > min_score:
+            return ranked[0]
+        return None
@@ -0,0 +1,229 @@
+"""
+Remote Fetch
+Pooled, cached and conditional downloads of remote input files
+"""
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import urllib.parse
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.core.config import settings
+from src.core.shared_cache import shared_cache
+from src.core.single_flight import SingleFlight
+
+try:
+    import fcntl
+except ImportError:  # Windows: downloads are coalesced within a process only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+
+CHUNK_BYTES = 64 * 1024
+
+
+class DownloadTooLarge(Exception):
+    """The remote file exceeds the download size limit"""
+
+    def __init__(self, url: str, limit: int):
+        super().__init__(f"{url} exceeds the {limit / (1024 * 1024):g} MB download limit")
+        self.url = url
+        self.limit = limit
+
+
+class RemoteFetcher:
+    """
+    Downloads remote files once per host and revalidates them cheaply.
+
+    Requests go through a per-thread ``requests.Session`` with a pooled,
+    retrying adapter, so repeated fetches from one host reuse connections.
+    Finished downloads are kept in the shared cache (``downloads``) with
+    their validators (``download_meta``). A cached file is served without
+    network access for ``revalidate_after`` seconds; after that an
+    ETag/Last-Modified conditional GET either confirms it (304) or
+    replaces it; files without validators are downloaded again. If
+    revalidation fails (network or HTTP error), the cached copy is served
+    stale.
+
+    Concurrent fetches of one URL share a single download: threads wait
+    on the in-flight call, and other processes wait on a lock file next
+    to the cache and then find the entry in it.
+    """
+
+    NAMESPACE = "downloads"
+    META_NAMESPACE = "download_meta"
+
+    def __init__(self, backend=None, max_bytes: Optional[int] = None, timeout: Optional[float] = None,
+                 revalidate_after: Optional[float] = None, ttl: Optional[float] = None):
+        self.backend = backend
+        self.max_bytes = settings.DOWNLOAD_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+        self.timeout = settings.DOWNLOAD_TIMEOUT_SECONDS if timeout is None else timeout
+        self.revalidate_after = (settings.DOWNLOAD_REVALIDATE_SECONDS
+                                 if revalidate_after is None else revalidate_after)
+        self.ttl = settings.DOWNLOAD_CACHE_TTL_SECONDS if ttl is None else ttl
+
+        self._local = threading.local()
+        self._memory: Dict[str, Tuple[str, Dict[str, Any]]] = {}  # used without a backend
+        self._flight = SingleFlight()
+        self.stats = {"hits": 0, "revalidated": 0, "downloaded": 0, "stale": 0}
+
+    def session(self) -> requests.Session:
+        """Pooled session of the calling thread (recreated after a fork)"""
+        session = getattr(self._local, "session", None)
+        if session is None or self._local.pid != os.getpid():
+            session = requests.Session()
+            retry = Retry(total=2, backoff_factor=1, status_forcelist=(502, 503, 504),
+                          allowed_methods=frozenset({"GET"}), raise_on_status=False)
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8, max_retries=retry)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["User-Agent"] = USER_AGENT
+            self._local.session = session
+            self._local.pid = os.getpid()
+        return session
+
+    def fetch(self, url: str, filename: Optional[str] = None) -> str:
+        """
+        Local path of the remote file (named ``filename`` or after the URL).
+        Raises requests.RequestException or DownloadTooLarge when there is
+        no usable copy.
+        """
+        key = json.dumps([url, filename])
+        return self._flight.call(key, lambda: self._fetch(url, filename, key))
+
+    def _fetch(self, url: str, filename: Optional[str], key: str) -> str:
+        with self._exclusive(key):
+            cached, meta = self._cached(key)
+            validators = {}
+            if cached and meta:
+                if time.time() - meta["checked_at"] < self.revalidate_after:
+                    self.stats["hits"] += 1
+                    return cached
+                # Without validators the request below downloads the file again
+                if meta.get("etag"):
+                    validators["If-None-Match"] = meta["etag"]
+                if meta.get("last_modified"):
+                    validators["If-Modified-Since"] = meta["last_modified"]
+
+            try:
+                response = self.session().get(url, stream=True, timeout=self.timeout, headers=validators)
+            except requests.RequestException as e:
+                if cached:
+                    logger.warning(f"Revalidating {url} failed, serving cached copy: {e}")
+                    self.stats["stale"] += 1
+                    return cached
+                raise
+
+            with response:
+                if response.status_code == 304 and cached:
+                    self._remember(key, cached, dict(meta, checked_at=time.time()))
+                    self.stats["revalidated"] += 1
+                    return cached
+                try:
+                    response.raise_for_status()
+                except requests.HTTPError as e:
+                    if cached:
+                        logger.warning(f"Revalidating {url} failed, serving cached copy: {e}")
+                        self.stats["stale"] += 1
+                        return cached
+                    raise
+                path = self._download(url, response, filename, key)
+            self.stats["downloaded"] += 1
+            return path
+
+    def _download(self, url: str, response: requests.Response, filename: Optional[str], key: str) -> str:
+        length = response.headers.get("Content-Length", "")
+        if length.isdigit() and int(length) > self.max_bytes:
+            raise DownloadTooLarge(url, self.max_bytes)
+
+        temp_dir = tempfile.mkdtemp(prefix="download-")
+        local_path = os.path.join(temp_dir, filename or self.filename_for(url))
+        size = 0
+        try:
+            with open(local_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_BYTES):
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise DownloadTooLarge(url, self.max_bytes)
+                    f.write(chunk)
+        except BaseException:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+
+        meta = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "size": size,
+            "checked_at": time.time(),
+        }
+        path = self._remember(key, local_path, meta)
+        if path != local_path:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        return path
+
+    @staticmethod
+    def filename_for(url: str) -> str:
+        name = os.path.basename(urllib.parse.urlsplit(url).path)
+        return name if len(name) >= 3 else "download"
+
+    def _cached(self, key: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        if self.backend is None:
+            path, meta = self._memory.get(key, (None, None))
+            return (path, meta) if path and os.path.isfile(path) else (None, None)
+        try:
+            path = self.backend.get_file(self.NAMESPACE, key)
+            raw = self.backend.get(self.META_NAMESPACE, key) if path else None
+            return path, json.loads(raw) if raw else None
+        except Exception as e:
+            logger.warning(f"Download cache unavailable: {e}")
+            return None, None
+
+    def _remember(self, key: str, path: str, meta: Dict[str, Any]) -> str:
+        """Record a download (or its revalidation); returns the path to use"""
+        if self.backend is None:
+            self._memory[key] = (path, meta)
+            return path
+        try:
+            cached_path = self.backend.get_file(self.NAMESPACE, key)
+            if cached_path != path:
+                cached_path = self.backend.put_file(self.NAMESPACE, key, path, ttl=self.ttl)
+            if cached_path:
+                self.backend.put(self.META_NAMESPACE, key, json.dumps(meta).encode("utf-8"), ttl=self.ttl)
+            return cached_path or path
+        except Exception as e:
+            logger.warning(f"Download cache unavailable: {e}")
+            return path
+
+    @contextlib.contextmanager
+    def _exclusive(self, key: str):
+        """Hold the per-URL lock shared by every worker on the host"""
+        if self.backend is None or fcntl is None:
+            yield
+            return
+        locks_dir = self.backend.directory / "locks"
+        locks_dir.mkdir(exist_ok=True)
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+        with open(locks_dir / f"{digest}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+# Global fetcher (downloads shared through the host cache when it is enabled)
+remote_fetcher = RemoteFetcher(shared_cache)
@@ -0,0 +1,94 @@
+"""
+Routing Rules
+High-confidence "direct match" rules for question routing, compiled once
+"""
+from src.core.rule_engine import RuleSet
+
+# VS Code command indicators (see is_vscode_command_query)
+VSCODE_COMMAND_REGEXES = [
+    r'\bcode\b\s+(-[a-z]\b|--[a-z-]+\b)',  # Must have space and dash after "code"
+    r'output of\s+\bcode\b\s+(-[a-z]|--[a-z-]+)\b',
+    r'running\s+\bcode\b\s+(-[a-z]|--[a-z-]+)\b',
+    r'command\s+\bcode\b\s+(-[a-z]|--[a-z-]+)\b',
+    r'vs code\s+(-[a-z]|--[a-z-]+)\b',
+    r'vscode\s+(-[a-z]|--[a-z-]+)\b',
+    r'visual studio code\s+(-[a-z]|--[a-z-]+)\b',
+]
+VSCODE_COMMAND_PHRASES = [
+    'code command line', 'code -s', 'code -v', 'code -h',
+    'code --version', 'code --help', 'code --status',
+    'vs code command', 'vscode terminal command',
+    'visual studio code command line',
+]
+
+# Special input file names that identify a question on their own
+FILE_NAME_TARGETS = {
+    "unicode-data.zip": "GA1/twelfth.py",
+    "mutli-cursor-json": "GA1/tenth.py",
+    "multi-cursor-json": "GA1/tenth.py",
+    "extract-csv-zip": "GA1/eighth.py",
+    "extract.csv": "GA1/eighth.py",
+    "compare-files": "GA1/seventeenth.py",
+    "replace-across-files": "GA1/fourteenth.py",
+    "jigsaw.webp": "GA5/tenth.py",
+    "tables-from-pdf": "GA4/ninth.py",
+    "pdf-to-markdown": "GA4/tenth.py"
+}
+
+# STAGE 1 of find_best_question_match, in priority order
+DIRECT_MATCH_RULES = [
+    {"name": "ngrok_llamafile", "target": "GA2/tenth.py", "label": "Ngrok/Llamafile query",
+     "all": [["ngrok", "llamafile", "llama-3.2", "tunnel", "ngrok-free.app"]]},
+
+    # VS Code commands: explicit regex, explicit phrase, or VS Code mention + flag
+    {"name": "vscode_command_regex", "target": "GA1/first.py", "label": "VS Code command query",
+     "regex": VSCODE_COMMAND_REGEXES},
+    {"name": "vscode_command_phrase", "target": "GA1/first.py", "label": "VS Code command query",
+     "all": [VSCODE_COMMAND_PHRASES]},
+    {"name": "vscode_with_flag", "target": "GA1/first.py", "label": "VS Code command query",
+     "all": [["visual studio code", "vs code", "vscode"],
+             ["-s", "-v", "-h", "--version", "--help", "--status"]]},
+
+    {"name": "github_user_search", "target": "GA4/seventh.py", "label": "GitHub search query",
+     "all": [["github"], ["location:", "followers:", "sort by joined", "newest user"]]},
+    {"name": "github_pages", "target": "GA2/third.py", "label": "GitHub Pages query",
+     "all": [["github"], ["github pages", "showcase", "email_off"]]},
+    {"name": "github_action", "target": "GA2/seventh.py", "label": "GitHub Action query",
+     "all": [["github"], ["action"], ["workflow", "trigger"]], "none": ["schedule"]},
+
+    {"name": "vercel_deploy", "target": "GA2/sixth.py", "label": "Vercel deployment query",
+     "all": [["vercel"], ["deploy", "api?name="]]},
+    {"name": "vercel_marks", "target": "GA2/sixth.py", "label": "Vercel deployment query",
+     "all": [["marks of the names"]]},
+
+    {"name": "excel_cleaning", "target": "GA5/first.py", "label": "Excel data cleaning query",
+     "all": [["clean"], ["excel"], ["margin", "sales"]]},
+] + [
+    {"name": f"file:{pattern}", "target": target, "label": f"file pattern {pattern}",
+     "all": [[pattern]]}
+    for pattern, target in FILE_NAME_TARGETS.items()
+]
+
+# Overrides at the top of find_question_match, in priority order
+QUERY_OVERRIDE_RULES = [
+    {"name": "fastapi_csv", "target": "GA2/ninth.py", "label": "FastAPI CSV student question",
+     "all": [["fastapi"], ["csv"], ["student", "class", "q-fastapi.csv"]]},
+    {"name": "github_users_indicators", "target": "GA4/seventh.py", "label": "GitHub users question",
+     "all": [["github"], ["user"]],
+     "at_least": (2, ["followers", "location", "tokyo", "city", "joined",
+                      "created", "date", "newest", "profile", "when"])},
+    {"name": "github_users_location", "target": "GA4/seventh.py", "label": "GitHub users location query",
+     "all": [["github"], ["user", "follower"], ["location", "tokyo", "joined", "created", "date"]]},
+    {"name": "github_users_profile", "target": "GA4/seventh.py", "label": "GitHub Users Query",
+     "all": [["github"], ["user", "profile"], ["tokyo", "location", "150", "followers", "joined", "newest"]]},
+    {"name": "github_users_phrase", "target": "GA4/seventh.py", "label": "Exact GitHub user question pattern",
+     "all": [["github users in tokyo", "users located in", "when was newest github user",
+              "github api", "user location", "github profile created",
+              "newest github user", "when was the newest user"]]},
+    {"name": "shopsmart_embeddings", "target": "GA3/sixth.py", "label": "ShopSmart embeddings similarity",
+     "all": [["embeddings", "cosine", "similarity", "vectors", "most_similar", "most similar"],
+             ["shopsmart", "customer feedback"]]},
+]
+
+DIRECT_MATCH_RULESET = RuleSet(DIRECT_MATCH_RULES)
+QUERY_OVERRIDE_RULESET = RuleSet(QUERY_OVERRIDE_RULES)
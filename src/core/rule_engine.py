@@ -0,0 +1,182 @@
+"""
+Rule Engine
+Declarative keyword/regex rules compiled once into a single-pass matcher
+"""
+import re
+from collections import deque
+from typing import Dict, List, Any, Iterable, Set
+
+try:
+    import ahocorasick  # pyahocorasick, optional C implementation
+except ImportError:
+    ahocorasick = None
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a fixed keyword list.
+
+    ``find(text)`` returns the indices of every keyword occurring in text
+    (overlaps included) in one pass. Uses pyahocorasick when installed,
+    otherwise a precomputed DFA (goto + failure transitions folded together).
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = list(dict.fromkeys(keywords))
+        self.index: Dict[str, int] = {kw: i for i, kw in enumerate(self.keywords)}
+
+        if ahocorasick is not None:
+            self._native = ahocorasick.Automaton()
+            for i, kw in enumerate(self.keywords):
+                self._native.add_word(kw, i)
+            self._native.make_automaton()
+            return
+        self._native = None
+
+        # Trie (goto function) with per-state outputs
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[Set[int]] = [set()]
+        for i, kw in enumerate(self.keywords):
+            state = 0
+            for ch in kw:
+                if ch not in goto[state]:
+                    goto.append({})
+                    outputs.append(set())
+                    goto[state][ch] = len(goto) - 1
+                state = goto[state][ch]
+            outputs[state].add(i)
+
+        # Breadth-first failure links, folded into a full transition table
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            outputs[state] |= outputs[fail[state]]
+            delta[state] = dict(delta[fail[state]])
+            delta[state].update(goto[state])
+            for ch, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(ch, 0)
+                queue.append(child)
+
+        self._delta = delta
+        self._outputs = [frozenset(out) for out in outputs]
+
+    def find(self, text: str) -> Set[int]:
+        """Indices of all keywords found in text"""
+        if not self.keywords or not text:
+            return set()
+        if self._native is not None:
+            return {i for _, i in self._native.iter(text)}
+
+        found: Set[int] = set()
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if state and outputs[state]:
+                found |= outputs[state]
+        return found
+
+
+class RuleSet:
+    """
+    Compiled table of routing rules.
+
+    Each rule is a dict with a ``name``, a ``target`` and any of:
+
+    - ``all``: list of keyword groups; every group needs at least one hit
+    - ``none``: keywords that must not occur
+    - ``regex``: patterns; at least one must match
+    - ``at_least``: ``(n, keywords)``; at least n distinct keywords must occur
+    - ``priority``: lower wins (defaults to table order)
+
+    All keywords go into one automaton and all regexes into one combined
+    alternation, so evaluating the whole table costs one automaton pass plus
+    one regex scan (and one extra scan per regex that fires) regardless of
+    the number of rules. Matching is case-insensitive; keywords are expected
+    in lowercase and regexes must not use numbered backreferences.
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]]):
+        self.rules = [dict(rule, priority=rule.get("priority", pos)) for pos, rule in enumerate(rules)]
+
+        keywords: List[str] = []
+        patterns: List[str] = []
+        for rule in self.rules:
+            for group in rule.get("all", []):
+                keywords.extend(group)
+            keywords.extend(rule.get("none", []))
+            keywords.extend(rule.get("at_least", (0, []))[1])
+            patterns.extend(rule.get("regex", []))
+
+        self.automaton = KeywordAutomaton(keywords)
+        self.patterns = list(dict.fromkeys(patterns))
+        pattern_ids = {pattern: i for i, pattern in enumerate(self.patterns)}
+        self._pattern_regexes = [re.compile(pattern) for pattern in self.patterns]
+        self._combined_cache: Dict[frozenset, Any] = {}
+        self.combined_regex = self._combined_for(frozenset(range(len(self.patterns))))
+
+        # Rules with keywords and regexes resolved to integer ids
+        index = self.automaton.index
+        self._compiled = []
+        for rule in sorted(self.rules, key=lambda r: r["priority"]):
+            at_least = rule.get("at_least")
+            self._compiled.append((
+                rule,
+                [frozenset(index[kw] for kw in group) for group in rule.get("all", [])],
+                frozenset(index[kw] for kw in rule.get("none", [])),
+                frozenset(pattern_ids[p] for p in rule.get("regex", [])),
+                (at_least[0], frozenset(index[kw] for kw in at_least[1])) if at_least else None,
+            ))
+
+    def _combined_for(self, pattern_ids: frozenset):
+        """Alternation of the given patterns, compiled once per subset"""
+        regex = self._combined_cache.get(pattern_ids)
+        if regex is None:
+            regex = re.compile('|'.join(f'(?:{self.patterns[i]})' for i in sorted(pattern_ids)))
+            self._combined_cache[pattern_ids] = regex
+        return regex
+
+    def _regex_hits(self, text: str) -> Set[int]:
+        """Ids of every pattern that matches somewhere in text"""
+        hits: Set[int] = set()
+        remaining = frozenset(range(len(self.patterns)))
+        pos = 0
+        while remaining:
+            match = self._combined_for(remaining).search(text, pos)
+            if match is None:
+                break
+            # Alternation reports one pattern per position; check the rest here
+            start = match.start()
+            hits.update(i for i in remaining if self._pattern_regexes[i].match(text, start))
+            remaining = remaining - hits
+            pos = start + 1
+        return hits
+
+    def evaluate(self, text: str) -> List[Dict[str, Any]]:
+        """Return every rule that fires on text, highest priority first"""
+        if not text:
+            return []
+        text_lower = text.lower()
+        hits = self.automaton.find(text_lower)
+        regex_hits = self._regex_hits(text_lower) if self.patterns else set()
+
+        fired = []
+        for rule, groups, excluded, regexes, at_least in self._compiled:
+            if any(hits.isdisjoint(group) for group in groups):
+                continue
+            if excluded and not hits.isdisjoint(excluded):
+                continue
+            if regexes and regex_hits.isdisjoint(regexes):
+                continue
+            if at_least and len(hits & at_least[1]) < at_least[0]:
+                continue
+            fired.append(rule)
+        return fired
+
+    def first_match(self, text: str):
+        """Highest-priority rule that fires on text, or None"""
+        fired = self.evaluate(text)
+        return fired[0] if fired else None
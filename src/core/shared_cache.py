@@ -0,0 +1,234 @@
+"""
+Shared Cache
+On-disk cache tier shared by every worker process on the host (SQLite + files)
+"""
+import hashlib
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional, List, Tuple
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace   TEXT NOT NULL,
+    key         TEXT NOT NULL,
+    value       BLOB,
+    file        TEXT,
+    size        INTEGER NOT NULL,
+    expires_at  REAL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+"""
+
+# Reads refresh an entry's LRU position at most this often (avoids a write per hit)
+TOUCH_INTERVAL_SECONDS = 60
+
+
+class SharedCache:
+    """
+    Size-bounded key/value and file cache backed by SQLite in WAL mode.
+
+    Values are small blobs stored inline; files are copied under
+    ``files/`` with an atomic rename and indexed by the same table. Every
+    write is a single transaction, so concurrent workers never observe a
+    partial entry. When the total size exceeds ``max_bytes`` the least
+    recently used entries (and their files) are evicted.
+
+    Connections are opened lazily per thread and per process, so an
+    instance created before gunicorn forks is safe to use in the workers.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.directory = Path(directory or settings.SHARED_CACHE_DIR)
+        self.max_bytes = settings.SHARED_CACHE_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+        self.files_dir = self.directory / "files"
+        self.db_path = self.directory / "cache.sqlite3"
+        self.files_dir.mkdir(parents=True, exist_ok=True)
+
+        self._local = threading.local()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _lookup(self, namespace: str, key: str):
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute(
+            "SELECT value, file, expires_at, accessed_at FROM entries WHERE namespace = ? AND key = ?",
+            (namespace, key),
+        ).fetchone()
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+        value, file, expires_at, accessed_at = row
+        if expires_at is not None and expires_at < now:
+            self.delete(namespace, key)
+            self.stats["misses"] += 1
+            return None
+        if file is not None and not (self.files_dir / file).is_file():
+            self.delete(namespace, key)
+            self.stats["misses"] += 1
+            return None
+        if accessed_at < now - TOUCH_INTERVAL_SECONDS:
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                         (now, namespace, key))
+        self.stats["hits"] += 1
+        return row
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        """Cached value, or None if missing or expired"""
+        row = self._lookup(namespace, key)
+        return None if row is None else row[0]
+
+    def get_entry(self, namespace: str, key: str) -> Optional[Tuple[bytes, Optional[float]]]:
+        """(value, expires_at) like get(), with the wall-clock expiry (None if it never expires)"""
+        row = self._lookup(namespace, key)
+        return None if row is None else (row[0], row[2])
+
+    def get_file(self, namespace: str, key: str) -> Optional[str]:
+        """Path of a cached file, or None if missing or expired"""
+        row = self._lookup(namespace, key)
+        return None if row is None else str(self.files_dir / row[1])
+
+    def put(self, namespace: str, key: str, value: bytes, ttl: Optional[float] = None):
+        """Store a value (replacing any previous one)"""
+        self._store(namespace, key, value, None, len(value), ttl)
+
+    def put_file(self, namespace: str, key: str, source_path: str, ttl: Optional[float] = None) -> Optional[str]:
+        """
+        Copy a file into the cache and return the cached path (the file
+        name is preserved), or None if it is larger than the whole cache.
+        """
+        size = os.path.getsize(source_path)
+        if size > self.max_bytes:
+            return None
+
+        digest = hashlib.sha256(f"{namespace}\0{key}".encode("utf-8")).hexdigest()[:32]
+        relative = f"{digest}/{os.path.basename(source_path)}"
+        target = self.files_dir / relative
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        # Copy next to the target, then rename into place atomically
+        fd, tmp_path = tempfile.mkstemp(dir=str(target.parent), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as tmp, open(source_path, "rb") as src:
+                shutil.copyfileobj(src, tmp, 1024 * 1024)
+            os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        self._store(namespace, key, None, relative, size, ttl)
+        return str(target)
+
+    def _store(self, namespace, key, value, file, size, ttl):
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            previous = conn.execute("SELECT file FROM entries WHERE namespace = ? AND key = ?",
+                                    (namespace, key)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (namespace, key, value, file, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (namespace, key, value, file, size, expires_at, now),
+            )
+            evicted = self._evict(conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self.stats["stores"] += 1
+
+        stale = [f for f in evicted if f]
+        if previous and previous[0] and previous[0] != file:
+            stale.append(previous[0])
+        self._remove_files(stale)
+
+    def _evict(self, conn: sqlite3.Connection) -> List[str]:
+        """Drop expired, then least recently used, entries until under max_bytes"""
+        now = time.time()
+        removed = [row[0] for row in conn.execute(
+            "SELECT file FROM entries WHERE expires_at IS NOT NULL AND expires_at < ?", (now,))]
+        conn.execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at < ?", (now,))
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total > self.max_bytes:
+            victims = []
+            for namespace, key, file, size in conn.execute(
+                    "SELECT namespace, key, file, size FROM entries ORDER BY accessed_at"):
+                if total <= self.max_bytes:
+                    break
+                victims.append((namespace, key))
+                removed.append(file)
+                total -= size
+            conn.executemany("DELETE FROM entries WHERE namespace = ? AND key = ?", victims)
+            self.stats["evictions"] += len(victims)
+        return removed
+
+    def _remove_files(self, files):
+        for file in files:
+            if not file:
+                continue
+            path = self.files_dir / file
+            try:
+                path.unlink()
+                path.parent.rmdir()
+            except OSError:
+                pass
+
+    def delete(self, namespace: str, key: str):
+        conn = self._connection()
+        row = conn.execute("SELECT file FROM entries WHERE namespace = ? AND key = ?",
+                           (namespace, key)).fetchone()
+        conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+        if row:
+            self._remove_files([row[0]])
+
+    def recent(self, namespace: str, limit: int) -> List[Tuple[str, bytes, Optional[float]]]:
+        """Most recently used live values as (key, value, expires_at), for warming"""
+        return self._connection().execute(
+            "SELECT key, value, expires_at FROM entries "
+            "WHERE namespace = ? AND value IS NOT NULL AND (expires_at IS NULL OR expires_at > ?) "
+            "ORDER BY accessed_at DESC LIMIT ?",
+            (namespace, time.time(), limit),
+        ).fetchall()
+
+    def total_bytes(self) -> int:
+        return self._connection().execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+
+def _create_shared_cache() -> Optional[SharedCache]:
+    if not settings.SHARED_CACHE_ENABLED:
+        return None
+    try:
+        return SharedCache()
+    except OSError as e:
+        logger.warning(f"Shared cache disabled: {e}")
+        return None
+
+
+# Global shared cache (None when disabled or the directory is unusable)
+shared_cache = _create_shared_cache()
@@ -0,0 +1,108 @@
+"""
+Single Flight
+Coalesce concurrent identical calls onto one in-flight computation
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class _AsyncCall:
+    def __init__(self, task: "asyncio.Task"):
+        self.task = task
+        self.waiters = 0
+
+
+class _ThreadCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    While a call for a key is in flight, further calls with the same key
+    wait for it and share its result (or exception) instead of running
+    their own. Nothing is remembered once the call completes; that is the
+    answer cache's job.
+
+    ``run`` is for coroutines on one event loop. The shared computation is
+    cancelled only when every caller waiting on it has been cancelled.
+    ``call`` is the blocking equivalent for threads.
+    """
+
+    def __init__(self):
+        self._async_calls: Dict[str, _AsyncCall] = {}
+        self._thread_calls: Dict[str, _ThreadCall] = {}
+        self._lock = threading.Lock()
+        self.stats = {"executed": 0, "coalesced": 0}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._async_calls) + len(self._thread_calls)
+
+    async def run(self, key: Optional[str], fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await fn(), or the identical call already in flight"""
+        if key is None:
+            return await fn()
+
+        call = self._async_calls.get(key)
+        if call is None:
+            call = _AsyncCall(asyncio.ensure_future(fn()))
+            self._async_calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget_async(key, call))
+            self.stats["executed"] += 1
+        else:
+            self.stats["coalesced"] += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget_async(self, key: str, call: _AsyncCall):
+        if self._async_calls.get(key) is call:
+            del self._async_calls[key]
+        if not call.task.cancelled():
+            call.task.exception()  # mark retrieved when nobody was left to await it
+
+    def call(self, key: Optional[str], fn: Callable[[], Any]) -> Any:
+        """Run fn(), or wait for the identical call already in flight"""
+        if key is None:
+            return fn()
+
+        with self._lock:
+            call = self._thread_calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._thread_calls[key] = _ThreadCall()
+                self.stats["executed"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._thread_calls[key]
+            call.done.set()
+
+
+# Global coalescer for solver calls
+single_flight = SingleFlight()
@@ -0,0 +1,285 @@
+"""
+Solver Executor
+Warm worker-process pool that runs solution functions off the event loop
+"""
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Tuple
+
+from src.core.config import settings
+from src.core.question_router import file_suffix
+
+try:
+    import resource  # POSIX only
+except ImportError:
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Per-solver overrides of the default limits, keyed by solution file suffix
+SOLVER_LIMITS: Dict[str, Dict[str, Any]] = {
+    "GA2/tenth.py": {"timeout": 900, "memory_mb": 0},  # llamafile download + ngrok tunnel
+    "GA3/fifth.py": {"timeout": 300},                  # embeddings API round trips
+    "GA4/first.py": {"timeout": 300, "memory_mb": 0},  # headless browser
+    "GA4/ninth.py": {"timeout": 300},                  # PDF table extraction
+    "GA4/tenth.py": {"timeout": 300},                  # PDF to Markdown
+    "GA5/third.py": {"timeout": 300},                  # Apache log parsing
+    "GA5/fourth.py": {"timeout": 300},
+}
+
+
+class SolverTimeout(Exception):
+    """Solver exceeded its wall-clock limit; its worker was replaced"""
+
+
+class SolverQueueFull(Exception):
+    """Every worker is busy and the wait queue is at its limit"""
+
+
+class SolverWorkerError(Exception):
+    """Worker process died while running a solver"""
+
+
+def _resolve(target: str):
+    """Import ``module:attribute``"""
+    module_name, attr = target.split(":", 1)
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _address_space() -> int:
+    """Current virtual memory size in bytes (0 when unknown)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _limit_memory(memory_mb: int) -> Optional[Tuple[int, int]]:
+    """
+    Cap further address-space growth at memory_mb on top of the current size.
+    Returns the previous limits for restoring, or None when not applied.
+    """
+    if resource is None or not memory_mb or not hasattr(resource, "RLIMIT_AS"):
+        return None
+    previous = resource.getrlimit(resource.RLIMIT_AS)
+    limit = _address_space() + memory_mb * 1024 * 1024
+    hard = previous[1]
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    except (ValueError, OSError):
+        return None
+    return previous
+
+
+def _worker_main(conn, runner_path: str):
+    """Worker loop: receive (solution_path, query, memory_mb), send (status, output)"""
+    runner = _resolve(runner_path)
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            break
+        if job is None:
+            break
+
+        solution_path, query, memory_mb = job
+        previous = _limit_memory(memory_mb)
+        try:
+            result = ("ok", str(runner(solution_path, query)))
+        except MemoryError:
+            result = ("error", f"Error executing solution: exceeded memory limit of {memory_mb} MB")
+        except BaseException as e:
+            result = ("error", f"Error executing solution: {e.__class__.__name__}: {e}")
+        finally:
+            if previous is not None:
+                resource.setrlimit(resource.RLIMIT_AS, previous)
+
+        try:
+            conn.send(result)
+        except (EOFError, OSError):
+            break
+
+
+class _Worker:
+    """One warm solver process and the parent end of its pipe"""
+
+    def __init__(self, ctx, runner_path: str):
+        self.conn, child_conn = ctx.Pipe()
+        # Not daemonic: solvers may start their own process pools
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, runner_path),
+                                   name="solver-worker")
+        self.process.start()
+        child_conn.close()
+
+    def stop(self):
+        """Ask the worker to exit, then make sure it does"""
+        try:
+            self.conn.send(None)
+        except (EOFError, OSError):
+            pass
+        self.process.join(timeout=2)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=2)
+        self.conn.close()
+
+
+class SolverExecutor:
+    """
+    Runs ``runner(solution_path, query)`` in a pool of warm worker processes.
+
+    Workers are started lazily on first use inside the serving process, so
+    a preloading gunicorn master never owns them. Each call gets the
+    per-solver wall-clock and memory limits from ``SOLVER_LIMITS`` (falling
+    back to the configured defaults). A call that times out or whose caller
+    is cancelled kills its worker and a fresh one takes its place. Once
+    ``workers + max_queue`` calls are in flight, new calls are rejected with
+    ``SolverQueueFull`` instead of queueing without bound.
+
+    With ``workers=0`` solvers run in a thread of the event loop's default
+    executor instead (no isolation, no limits), for platforms or deployments
+    where extra processes are not wanted.
+    """
+
+    def __init__(self, runner: str = "vicky_server:run_solution",
+                 workers: Optional[int] = None, max_queue: Optional[int] = None,
+                 timeout: Optional[float] = None, memory_mb: Optional[int] = None,
+                 limits: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.runner = runner
+        self.workers = settings.SOLVER_WORKERS if workers is None else workers
+        self.max_queue = settings.SOLVER_MAX_QUEUE if max_queue is None else max_queue
+        self.timeout = settings.SOLVER_TIMEOUT_SECONDS if timeout is None else timeout
+        self.memory_mb = settings.SOLVER_MEMORY_LIMIT_MB if memory_mb is None else memory_mb
+        self.limits = SOLVER_LIMITS if limits is None else limits
+
+        self.stats = {"completed": 0, "failed": 0, "timeouts": 0,
+                      "cancelled": 0, "crashed": 0, "rejected": 0}
+        self._in_flight = 0
+        self._idle: Optional[asyncio.Queue] = None
+        self._pool = []
+        self._ctx = None
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._pid = None
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def limits_for(self, solution_path: str) -> Tuple[float, int]:
+        """(timeout seconds, memory MB) for a solution path"""
+        override = self.limits.get(file_suffix(solution_path), {})
+        return override.get("timeout", self.timeout), override.get("memory_mb", self.memory_mb)
+
+    def _context(self):
+        # forkserver gives clean, thread-free forks of a preloaded runner module
+        methods = multiprocessing.get_all_start_methods()
+        if "forkserver" in methods:
+            ctx = multiprocessing.get_context("forkserver")
+            ctx.set_forkserver_preload([self.runner.split(":", 1)[0]])
+            return ctx
+        return multiprocessing.get_context("spawn")
+
+    def start(self):
+        """Start the worker processes (idempotent, per serving process)"""
+        if self._pid == os.getpid() or self.workers <= 0:
+            return
+        self._pid = os.getpid()
+        self._ctx = self._context()
+        self._threads = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="solver-wait")
+        self._idle = asyncio.Queue()
+        self._pool = []
+        for _ in range(self.workers):
+            self._spawn()
+        logger.info(f"Started {self.workers} solver workers (queue limit {self.max_queue})")
+
+    def _spawn(self):
+        worker = _Worker(self._ctx, self.runner)
+        self._pool.append(worker)
+        self._idle.put_nowait(worker)
+
+    def _replace(self, worker: _Worker):
+        """Kill a worker in the background and put a fresh one in its place"""
+        self._pool.remove(worker)
+        asyncio.get_running_loop().run_in_executor(None, worker.kill)
+        self._spawn()
+
+    async def run(self, solution_path: str, query: Optional[str] = None) -> str:
+        """Run one solver and return its output"""
+        limit = max(self.workers, 1) + self.max_queue
+        if self._in_flight >= limit:
+            self.stats["rejected"] += 1
+            raise SolverQueueFull(f"Solver queue is full ({self._in_flight} requests in flight)")
+
+        self._in_flight += 1
+        try:
+            if self.workers <= 0:
+                return await self._run_inline(solution_path, query)
+            self.start()
+            return await self._run_in_worker(solution_path, query)
+        finally:
+            self._in_flight -= 1
+
+    async def _run_inline(self, solution_path: str, query: Optional[str]) -> str:
+        runner = _resolve(self.runner)
+        output = await asyncio.get_running_loop().run_in_executor(None, runner, solution_path, query)
+        self.stats["completed"] += 1
+        return str(output)
+
+    async def _run_in_worker(self, solution_path: str, query: Optional[str]) -> str:
+        timeout, memory_mb = self.limits_for(solution_path)
+        worker = await self._idle.get()
+        healthy = False
+        try:
+            worker.conn.send((solution_path, query, memory_mb))
+            loop = asyncio.get_running_loop()
+            status, output = await asyncio.wait_for(
+                loop.run_in_executor(self._threads, worker.conn.recv), timeout or None
+            )
+            healthy = True
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise SolverTimeout(f"{file_suffix(solution_path)} exceeded its {timeout}s time limit")
+        except asyncio.CancelledError:
+            self.stats["cancelled"] += 1
+            raise
+        except (EOFError, OSError) as e:
+            self.stats["crashed"] += 1
+            raise SolverWorkerError(f"Solver worker for {file_suffix(solution_path)} died: {e}")
+        finally:
+            if healthy:
+                self._idle.put_nowait(worker)
+            else:
+                self._replace(worker)
+
+        self.stats["completed" if status == "ok" else "failed"] += 1
+        return output
+
+    def shutdown(self):
+        """Stop all workers owned by this process"""
+        if self._pid != os.getpid():
+            return
+        for worker in self._pool:
+            worker.stop()
+        self._pool = []
+        self._idle = None
+        if self._threads is not None:
+            self._threads.shutdown(wait=False)
+            self._threads = None
+        self._pid = None
+
+
+# Global executor (workers start on first use in each serving process)
+solver_executor = SolverExecutor()
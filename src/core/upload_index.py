@@ -0,0 +1,278 @@
+"""
+Upload Index
+In-memory index of recently written files in the upload and temp directories
+"""
+import bisect
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import tempfile
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Directories where uploads land without an explicit path in the query
+UPLOAD_DIRECTORIES = [
+    tempfile.gettempdir(),
+    '/tmp',
+    os.path.join(tempfile.gettempdir(), 'uploads'),
+    os.path.join(os.getcwd(), 'uploads'),
+    os.path.join(os.getcwd(), 'temp'),
+    'E:/data science tool/temp',
+]
+
+# Files older than this are never candidates
+MAX_AGE_SECONDS = 3600
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_ISDIR = 0x40000000
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_DELETE
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _Inotify:
+    """Minimal Linux inotify binding (libc via ctypes)"""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches: Dict[int, str] = {}
+
+    def watch(self, directory: str) -> bool:
+        if directory in self.watches.values():
+            return True
+        wd = self._add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            return False
+        self.watches[wd] = directory
+        return True
+
+    def read(self, timeout: float) -> Iterable[Tuple[Optional[str], int]]:
+        """(path, mask) events; path is None on queue overflow"""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                events.append((None, mask))
+            elif wd in self.watches and name:
+                events.append((os.path.join(self.watches[wd], os.fsdecode(name)), mask))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class UploadIndex:
+    """
+    Recently written files by extension, ordered by modification time.
+
+    Upload handlers call ``record`` for files they write; inotify (where
+    available) reports files written by anything else, and a periodic
+    rescan catches what both miss. ``latest`` never walks a directory:
+    per extension it looks at the newest entries of a sorted list and
+    confirms the winner still exists.
+
+    The watcher thread is started lazily per process, so an index created
+    at import time is safe to use in forked workers.
+    """
+
+    def __init__(self, directories: Optional[List[str]] = None, max_age: float = MAX_AGE_SECONDS,
+                 rescan_interval: Optional[float] = None, use_inotify: bool = True):
+        self.directories = self._unique_directories(UPLOAD_DIRECTORIES if directories is None else directories)
+        self.max_age = max_age
+        self.rescan_interval = settings.UPLOAD_INDEX_RESCAN_SECONDS if rescan_interval is None else rescan_interval
+        self.use_inotify = use_inotify
+
+        self._by_extension: Dict[str, List[Tuple[float, str]]] = {}
+        self._entries: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self._pid = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.watcher = None
+        self.stats = {"lookups": 0, "recorded": 0, "rescans": 0, "events": 0}
+
+    @staticmethod
+    def _unique_directories(directories: Iterable[str]) -> List[str]:
+        seen, unique = set(), []
+        for directory in directories:
+            real = os.path.realpath(directory)
+            if real not in seen:
+                seen.add(real)
+                unique.append(directory)
+        return unique
+
+    def __len__(self):
+        return len(self._entries)
+
+    def record(self, path: str, mtime: Optional[float] = None):
+        """Add or refresh a file (called by upload handlers after writing)"""
+        self.start()
+        path = os.path.abspath(path)
+        if mtime is None:
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                self.forget(path)
+                return
+        extension = os.path.splitext(path)[1].lower()
+        with self._lock:
+            self._remove(path)
+            bisect.insort(self._by_extension.setdefault(extension, []), (mtime, path))
+            self._entries[path] = (extension, mtime)
+            self.stats["recorded"] += 1
+
+    def forget(self, path: str):
+        with self._lock:
+            self._remove(os.path.abspath(path))
+
+    def _remove(self, path: str):
+        """Drop an entry (caller holds the lock)"""
+        entry = self._entries.pop(path, None)
+        if entry is None:
+            return
+        extension, mtime = entry
+        entries = self._by_extension[extension]
+        position = bisect.bisect_left(entries, (mtime, path))
+        if position < len(entries) and entries[position] == (mtime, path):
+            del entries[position]
+
+    def latest(self, extensions: Iterable[str], max_age: Optional[float] = None) -> Optional[str]:
+        """Most recently modified existing file with one of the extensions, or None"""
+        self.start()
+        cutoff = time.time() - (self.max_age if max_age is None else max_age)
+        best: Optional[Tuple[float, str]] = None
+        with self._lock:
+            self.stats["lookups"] += 1
+            for extension in extensions:
+                entries = self._by_extension.get(extension.lower())
+                while entries:
+                    mtime, path = entries[-1]
+                    if mtime <= cutoff or (best is not None and mtime <= best[0]):
+                        break
+                    if os.path.isfile(path):
+                        best = (mtime, path)
+                        break
+                    entries.pop()
+                    self._entries.pop(path, None)
+        return best[1] if best else None
+
+    def rescan(self):
+        """Rebuild from the directories (startup and periodic fallback)"""
+        started = time.time()
+        cutoff = started - self.max_age
+        found = []
+        for directory in self.directories:
+            try:
+                with os.scandir(os.path.abspath(directory)) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_file():
+                                mtime = entry.stat().st_mtime
+                                if mtime > cutoff:
+                                    found.append((entry.path, mtime))
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+            if self.watcher is not None:
+                self.watcher.watch(directory)
+
+        by_extension: Dict[str, List[Tuple[float, str]]] = {}
+        entries = {}
+        for path, mtime in found:
+            extension = os.path.splitext(path)[1].lower()
+            by_extension.setdefault(extension, []).append((mtime, path))
+            entries[path] = (extension, mtime)
+        with self._lock:
+            # Keep files recorded while the scan was running
+            for path, (extension, mtime) in self._entries.items():
+                if path not in entries and mtime >= started:
+                    by_extension.setdefault(extension, []).append((mtime, path))
+                    entries[path] = (extension, mtime)
+            for values in by_extension.values():
+                values.sort()
+            self._by_extension, self._entries = by_extension, entries
+            self.stats["rescans"] += 1
+
+    def start(self):
+        """Initial scan and watcher thread (idempotent, per process)"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self.watcher = None
+            if self.use_inotify:
+                try:
+                    self.watcher = _Inotify()
+                except (OSError, AttributeError) as e:
+                    logger.info(f"inotify unavailable, rescanning every {self.rescan_interval}s: {e}")
+        self.rescan()
+        self._thread = threading.Thread(target=self._watch, name="upload-index", daemon=True)
+        self._thread.start()
+
+    def _watch(self):
+        next_rescan = time.monotonic() + self.rescan_interval
+        while not self._stop.is_set():
+            timeout = max(0.0, next_rescan - time.monotonic())
+            if self.watcher is None:
+                self._stop.wait(timeout)
+            else:
+                try:
+                    for path, mask in self.watcher.read(min(timeout, 1.0)):
+                        self.stats["events"] += 1
+                        if path is None:
+                            next_rescan = 0
+                        elif mask & _IN_ISDIR:
+                            continue
+                        elif mask & (_IN_DELETE | _IN_MOVED_FROM):
+                            self.forget(path)
+                        else:
+                            self.record(path)
+                except OSError as e:
+                    logger.warning(f"Upload index watcher failed, falling back to rescans: {e}")
+                    self.watcher = None
+            if time.monotonic() >= next_rescan:
+                self.rescan()
+                next_rescan = time.monotonic() + self.rescan_interval
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        if self.watcher is not None:
+            self.watcher.close()
+            self.watcher = None
+        self._pid = None
+
+
+# Global index of recent uploads
+upload_index = UploadIndex()
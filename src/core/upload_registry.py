@@ -0,0 +1,214 @@
+"""
+Upload Registry
+Persistent map of uploaded file IDs to paths, shared by every worker on the host
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id          TEXT PRIMARY KEY,
+    name        TEXT NOT NULL,
+    path        TEXT NOT NULL,
+    uploaded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_path ON files (path);
+CREATE INDEX IF NOT EXISTS files_uploaded_at ON files (uploaded_at);
+"""
+
+
+class UploadRegistry:
+    """
+    Uploaded files by their 8-hex-digit ID.
+
+    Entries live in an SQLite table (WAL mode) under the upload store's
+    directory, so an ID handed out by one worker resolves in every other
+    worker and after a restart. Registering a path that is already known
+    returns its existing ID, which keeps IDs stable when the uploads
+    directory is rescanned.
+
+    Lookups go through a bounded in-process LRU; entries expire
+    ``max_age`` seconds after the upload, and entries whose file is gone
+    (collected by the upload store) resolve to None. Without a database
+    (``db_path`` None) the LRU is the registry.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_entries: Optional[int] = None,
+                 max_age: Optional[float] = None):
+        self.db_path = Path(db_path) if db_path else None
+        self.max_entries = settings.UPLOAD_REGISTRY_MAX_ENTRIES if max_entries is None else max_entries
+        self.max_age = settings.UPLOAD_RETENTION_HOURS * 3600 if max_age is None else max_age
+        if self.db_path is not None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._local = threading.local()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "registered": 0, "expired": 0}
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _entry(file_id: str, name: str, path: str, uploaded_at: float) -> Dict[str, Any]:
+        """Entry in the shape of the app's registry records"""
+        return {
+            "id": file_id,
+            "original_name": name,
+            "path": path,
+            "uploaded_at": datetime.fromtimestamp(uploaded_at).isoformat(),
+            "type": os.path.splitext(name)[1].lower(),
+            "_uploaded_at": uploaded_at,
+        }
+
+    @staticmethod
+    def _public(entry: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in entry.items() if not key.startswith("_")}
+
+    def register(self, original_name: str, path: str, file_id: Optional[str] = None,
+                 uploaded_at: Optional[float] = None) -> str:
+        """
+        Register an uploaded file; returns its ID. ``file_id`` keeps an ID
+        issued elsewhere (the upload store); without it, a path that is
+        already registered keeps the ID it has.
+        """
+        path = str(path)
+        uploaded_at = time.time() if uploaded_at is None else uploaded_at
+        if self.db_path is None:
+            file_id = file_id or next((entry["id"] for entry in self._entries.values()
+                                       if entry["path"] == path), None) or uuid.uuid4().hex[:8]
+        else:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if file_id is None:
+                    row = conn.execute("SELECT id, name, uploaded_at FROM files WHERE path = ? "
+                                       "ORDER BY uploaded_at DESC LIMIT 1", (path,)).fetchone()
+                    if row is not None:
+                        file_id, original_name, uploaded_at = row
+                    else:
+                        file_id = uuid.uuid4().hex[:8]
+                conn.execute("INSERT OR IGNORE INTO files (id, name, path, uploaded_at) VALUES (?, ?, ?, ?)",
+                             (file_id, original_name, path, uploaded_at))
+                row = conn.execute("SELECT name, path, uploaded_at FROM files WHERE id = ?", (file_id,)).fetchone()
+                original_name, path, uploaded_at = row
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        with self._lock:
+            self._remember(self._entry(file_id, original_name, path, uploaded_at))
+            self.stats["registered"] += 1
+        return file_id
+
+    def _remember(self, entry: Dict[str, Any]):
+        """Insert into the in-process LRU (caller holds the lock)"""
+        self._entries[entry["id"]] = entry
+        self._entries.move_to_end(entry["id"])
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _live(self, entry: Dict[str, Any]) -> bool:
+        return entry["_uploaded_at"] >= time.time() - self.max_age and os.path.isfile(entry["path"])
+
+    def get(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """Entry of an uploaded file (id, original_name, path, uploaded_at, type), or None"""
+        with self._lock:
+            entry = self._entries.get(file_id)
+            if entry is not None:
+                self._entries.move_to_end(file_id)
+        if entry is None and self.db_path is not None:
+            row = self._connection().execute(
+                "SELECT id, name, path, uploaded_at FROM files WHERE id = ?", (file_id,)).fetchone()
+            if row is not None:
+                entry = self._entry(*row)
+                with self._lock:
+                    self._remember(entry)
+
+        live = entry is not None and self._live(entry)
+        with self._lock:
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            if not live:
+                self._entries.pop(file_id, None)
+                self.stats["expired"] += 1
+                return None
+            self.stats["hits"] += 1
+        return self._public(entry)
+
+    def entries(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Live entries, most recent first"""
+        if self.db_path is None:
+            with self._lock:
+                candidates = sorted(self._entries.values(), key=lambda entry: entry["_uploaded_at"], reverse=True)
+        else:
+            rows = self._connection().execute(
+                "SELECT id, name, path, uploaded_at FROM files WHERE uploaded_at >= ? "
+                "ORDER BY uploaded_at DESC", (time.time() - self.max_age,)).fetchall()
+            candidates = (self._entry(*row) for row in rows)
+        live = []
+        for entry in candidates:
+            if limit is not None and len(live) >= limit:
+                break
+            if self._live(entry):
+                live.append(self._public(entry))
+        return live
+
+    def collect(self) -> int:
+        """Delete expired entries and entries whose file is gone; returns how many"""
+        cutoff = time.time() - self.max_age
+        with self._lock:
+            for file_id in [file_id for file_id, entry in self._entries.items() if not self._live(entry)]:
+                del self._entries[file_id]
+        if self.db_path is None:
+            return 0
+
+        conn = self._connection()
+        rows = conn.execute("SELECT id, path, uploaded_at FROM files").fetchall()
+        dead = [(file_id,) for file_id, path, uploaded_at in rows
+                if uploaded_at < cutoff or not os.path.isfile(path)]
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("DELETE FROM files WHERE id = ?", dead)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return len(dead)
+
+
+def _create_upload_registry() -> UploadRegistry:
+    try:
+        registry = UploadRegistry(os.path.join(settings.UPLOAD_STORE_DIR, ".store", "registry.sqlite3"))
+        # Open the database now, so a locked, corrupt or read-only one falls back here
+        registry._connection()
+        return registry
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Upload registry not persistent: {e}")
+        return UploadRegistry()
+
+
+# Global upload registry (in-process only when the directory is unusable)
+upload_registry = _create_upload_registry()
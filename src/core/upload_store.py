@@ -0,0 +1,286 @@
+"""
+Upload Store
+Content-addressed storage for uploaded files with deduplication and GC
+"""
+import asyncio
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.core.config import settings
+from src.core.content_signature import remember_signature
+from src.core.upload_stream import ingest
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256      TEXT PRIMARY KEY,
+    size        INTEGER NOT NULL,
+    stored_at   REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS uploads (
+    id          TEXT PRIMARY KEY,
+    sha256      TEXT NOT NULL,
+    name        TEXT NOT NULL,
+    path        TEXT NOT NULL,
+    uploaded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS uploads_sha256 ON uploads (sha256);
+CREATE INDEX IF NOT EXISTS uploads_uploaded_at ON uploads (uploaded_at);
+"""
+
+# Blobs younger than this are never collected (a save may be about to reference them)
+GC_GRACE_SECONDS = 60
+
+
+def safe_filename(name: Optional[str]) -> str:
+    """Base name of an uploaded file, safe to use as a path component"""
+    name = os.path.basename((name or "").replace("\\", "/")).strip()
+    name = re.sub(r'[\s/\x00-\x1f]', '_', name)
+    return name if name not in ("", ".", "..") else "upload"
+
+
+class UploadStore:
+    """
+    Uploaded files stored once per distinct content.
+
+    ``save_upload`` hashes the upload while streaming it to a temporary
+    file; if a blob with that SHA-256 already exists the copy is
+    discarded. Each
+    upload gets a metadata record (ID, name, hash) and a readable path,
+    ``<directory>/<sha256[:12]>_<name>``, hard-linked to the blob, so
+    repeated uploads of the same file resolve to the same path and the
+    same downstream cache keys.
+
+    ``collect`` drops upload records older than ``max_age`` and then the
+    oldest records until blobs fit in ``max_bytes``; blobs and paths no
+    record refers to are deleted.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None,
+                 max_age: Optional[float] = None):
+        self.directory = Path(directory or settings.UPLOAD_STORE_DIR)
+        self.max_bytes = settings.UPLOAD_STORE_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+        self.max_age = settings.UPLOAD_RETENTION_HOURS * 3600 if max_age is None else max_age
+        self.store_dir = self.directory / ".store"
+        self.blobs_dir = self.store_dir / "blobs"
+        self.db_path = self.store_dir / "uploads.sqlite3"
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+
+        self._local = threading.local()
+        self.stats = {"saved": 0, "deduplicated": 0, "blobs_removed": 0, "bytes_reclaimed": 0}
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _transaction(self, *statements):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for sql, parameters in statements:
+                conn.execute(sql, parameters)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.blobs_dir / sha256[:2] / sha256
+
+    async def save_upload(self, upload, max_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Store a FastAPI/Starlette UploadFile without blocking the event loop;
+        the record also carries the upload's content signature.
+        """
+        ingested = await ingest(upload, str(self.blobs_dir), max_bytes)
+        try:
+            record = await asyncio.get_running_loop().run_in_executor(
+                None, self.add, ingested["tmp_path"], ingested["sha256"], ingested["size"],
+                upload.filename, ingested["content_signature"])
+        finally:
+            self._unlink(Path(ingested["tmp_path"]))
+        record["content_signature"] = ingested["content_signature"]
+        return record
+
+    def add(self, tmp_path: str, sha256: str, size: int, name: Optional[str],
+            signature: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Register a fully written temporary file whose hash is known; the
+        file is moved into the store or, for known content, left in place
+        for the caller to delete. A content signature computed while the
+        file was written is recorded so it is never re-read.
+        """
+        name = safe_filename(name)
+        path = self.directory / f"{sha256[:12]}_{name}"
+        record = {
+            "id": uuid.uuid4().hex[:8],
+            "sha256": sha256,
+            "original_name": name,
+            "path": str(path),
+            "size": size,
+            "uploaded_at": time.time(),
+        }
+
+        # Touch the blob first so a concurrent collect() leaves it alone
+        self._transaction(
+            ("INSERT INTO blobs (sha256, size, stored_at) VALUES (?, ?, ?) "
+             "ON CONFLICT (sha256) DO UPDATE SET stored_at = excluded.stored_at",
+             (sha256, size, record["uploaded_at"])),
+        )
+        blob = self.blob_path(sha256)
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        if blob.exists():
+            self.stats["deduplicated"] += 1
+            try:
+                self._link(blob, path)
+            except FileNotFoundError:
+                # Collected between the check and the link; this copy replaces it
+                os.replace(tmp_path, blob)
+                self._link(blob, path)
+        else:
+            os.replace(tmp_path, blob)
+            self._link(blob, path)
+        # A re-upload of old content is a new upload: "most recent file" lookups go by mtime
+        os.utime(path, (record["uploaded_at"], record["uploaded_at"]))
+
+        self._transaction(
+            ("INSERT INTO uploads (id, sha256, name, path, uploaded_at) VALUES (?, ?, ?, ?, ?)",
+             (record["id"], sha256, name, record["path"], record["uploaded_at"])),
+        )
+        self.stats["saved"] += 1
+
+        if signature is not None:
+            remember_signature(record["path"], signature)
+
+        if self.total_bytes() > self.max_bytes:
+            self.collect()
+        return self._describe(record)
+
+    @staticmethod
+    def _link(blob: Path, path: Path):
+        """Make path a name for blob (hard link, or a copy across devices)"""
+        if path.exists():
+            try:
+                if os.path.samefile(blob, path):
+                    return
+            except OSError:
+                pass
+        tmp = path.with_name(f".tmp-{uuid.uuid4().hex}")
+        try:
+            os.link(blob, tmp)
+        except OSError:
+            shutil.copyfile(blob, tmp)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _describe(record: Dict[str, Any]) -> Dict[str, Any]:
+        """Record in the shape of the app's upload registry entries"""
+        record = dict(record)
+        record["type"] = os.path.splitext(record["original_name"])[1].lower()
+        record["uploaded_at"] = datetime.fromtimestamp(record["uploaded_at"]).isoformat()
+        return record
+
+    def _row_to_record(self, row) -> Dict[str, Any]:
+        upload_id, sha256, name, path, uploaded_at, size = row
+        return self._describe({"id": upload_id, "sha256": sha256, "original_name": name,
+                               "path": path, "size": size, "uploaded_at": uploaded_at})
+
+    def get(self, upload_id: str) -> Optional[Dict[str, Any]]:
+        """Metadata record of an upload, or None"""
+        row = self._connection().execute(
+            "SELECT u.id, u.sha256, u.name, u.path, u.uploaded_at, b.size "
+            "FROM uploads u JOIN blobs b ON b.sha256 = u.sha256 WHERE u.id = ?", (upload_id,)).fetchone()
+        return self._row_to_record(row) if row else None
+
+    def uploads(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Upload records, most recent first"""
+        rows = self._connection().execute(
+            "SELECT u.id, u.sha256, u.name, u.path, u.uploaded_at, b.size "
+            "FROM uploads u JOIN blobs b ON b.sha256 = u.sha256 ORDER BY u.uploaded_at DESC LIMIT ?",
+            (-1 if limit is None else limit,)).fetchall()
+        return [self._row_to_record(row) for row in rows]
+
+    def total_bytes(self) -> int:
+        return self._connection().execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def collect(self, max_age: Optional[float] = None, max_bytes: Optional[int] = None) -> Dict[str, int]:
+        """Expire old uploads, enforce the quota and delete unreferenced blobs"""
+        max_age = self.max_age if max_age is None else max_age
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            expired = conn.execute("SELECT path FROM uploads WHERE uploaded_at < ?", (now - max_age,)).fetchall()
+            conn.execute("DELETE FROM uploads WHERE uploaded_at < ?", (now - max_age,))
+            removed_paths = [row[0] for row in expired]
+
+            # Over quota: drop the oldest uploads until the blobs they keep alive fit
+            referenced = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM blobs WHERE sha256 IN (SELECT sha256 FROM uploads)").fetchone()[0]
+            if referenced > max_bytes:
+                for upload_id, sha256, path in conn.execute(
+                        "SELECT id, sha256, path FROM uploads ORDER BY uploaded_at").fetchall():
+                    if referenced <= max_bytes:
+                        break
+                    conn.execute("DELETE FROM uploads WHERE id = ?", (upload_id,))
+                    removed_paths.append(path)
+                    if not conn.execute("SELECT 1 FROM uploads WHERE sha256 = ? LIMIT 1", (sha256,)).fetchone():
+                        referenced -= conn.execute("SELECT size FROM blobs WHERE sha256 = ?",
+                                                   (sha256,)).fetchone()[0]
+
+            orphans = conn.execute(
+                "SELECT sha256, size FROM blobs WHERE stored_at < ? "
+                "AND sha256 NOT IN (SELECT sha256 FROM uploads)", (now - GC_GRACE_SECONDS,)).fetchall()
+            conn.executemany("DELETE FROM blobs WHERE sha256 = ?", [(sha256,) for sha256, _ in orphans])
+            live_paths = {row[0] for row in conn.execute("SELECT DISTINCT path FROM uploads")}
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        for path in set(removed_paths) - live_paths:
+            self._unlink(Path(path))
+        reclaimed = 0
+        for sha256, size in orphans:
+            self._unlink(self.blob_path(sha256))
+            reclaimed += size
+        self.stats["blobs_removed"] += len(orphans)
+        self.stats["bytes_reclaimed"] += reclaimed
+        return {"uploads_removed": len(removed_paths), "blobs_removed": len(orphans), "bytes_reclaimed": reclaimed}
+
+    @staticmethod
+    def _unlink(path: Path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def _create_upload_store() -> Optional[UploadStore]:
+    try:
+        return UploadStore()
+    except OSError as e:
+        logger.warning(f"Upload store unavailable: {e}")
+        return None
+
+
+# Global upload store (None when the directory is unusable)
+upload_store = _create_upload_store()
@@ -0,0 +1,99 @@
+"""
+Upload Stream
+Async upload ingestion: chunked writes, hashes and size limits in one pass
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from typing import Any, Dict, Optional
+
+from src.core.content_signature import ContentSignature
+
+logger = logging.getLogger(__name__)
+
+CHUNK_BYTES = 1024 * 1024
+
+
+class UploadTooLarge(Exception):
+    """The upload exceeds the byte limit of its endpoint"""
+
+    def __init__(self, limit: int):
+        super().__init__(f"Upload exceeds the {limit / (1024 * 1024):g} MB limit")
+        self.limit = limit
+
+
+class _Sink:
+    """Temporary file plus the hashes of everything written to it"""
+
+    def __init__(self, directory: str):
+        fd, self.path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        self.file = os.fdopen(fd, "wb")
+        self.sha256 = hashlib.sha256()
+        self.signature = ContentSignature()
+        self.size = 0
+
+    def write(self, chunk: bytes):
+        # Runs on an executor thread; hashlib releases the GIL for large chunks
+        self.file.write(chunk)
+        self.sha256.update(chunk)
+        self.signature.update(chunk)
+
+    def discard(self):
+        self.file.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+async def ingest(upload, directory: str, max_bytes: Optional[int] = None,
+                 chunk_bytes: int = CHUNK_BYTES) -> Dict[str, Any]:
+    """
+    Stream an UploadFile to a temporary file in ``directory``.
+
+    Chunks are read from the upload asynchronously and written and hashed
+    off the event loop. Uploads whose declared or streamed size exceeds
+    ``max_bytes`` raise UploadTooLarge as soon as that is known, and the
+    partial file is removed. Returns the temporary path with its size,
+    SHA-256 and content signature; the caller moves the file into place.
+    """
+    declared = getattr(upload, "size", None)
+    if max_bytes is not None and declared is not None and declared > max_bytes:
+        raise UploadTooLarge(max_bytes)
+
+    loop = asyncio.get_running_loop()
+    sink = _Sink(directory)
+    try:
+        while True:
+            chunk = await upload.read(chunk_bytes)
+            if not chunk:
+                break
+            sink.size += len(chunk)
+            if max_bytes is not None and sink.size > max_bytes:
+                raise UploadTooLarge(max_bytes)
+            await loop.run_in_executor(None, sink.write, chunk)
+        await loop.run_in_executor(None, sink.file.close)
+    except BaseException:
+        sink.discard()
+        raise
+
+    return {
+        "tmp_path": sink.path,
+        "size": sink.size,
+        "sha256": sink.sha256.hexdigest(),
+        "content_signature": sink.signature.hexdigest(),
+    }
+
+
+def endpoint_limits(spec: str, default_mb: float) -> Dict[str, int]:
+    """Parse "path=MB,path=MB" into byte limits; unknown paths use ``default_mb``"""
+    limits = {"*": int(default_mb * 1024 * 1024)}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        path, _, megabytes = item.partition("=")
+        try:
+            limits[path.strip()] = int(float(megabytes) * 1024 * 1024)
+        except ValueError:
+            logger.warning(f"Ignoring malformed upload limit: {item!r}")
+    return limits
@@ -0,0 +1,276 @@
+"""
+Workspace
+Scoped scratch directories for solver invocations and a janitor for artifacts
+"""
+import contextlib
+import contextvars
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from src.core.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: running workspaces are only known to their own process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_current: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("workspace", default=None)
+
+stats = {"workspaces": 0, "released": 0, "bytes_released": 0}
+_stats_lock = threading.Lock()
+
+# Workspaces of invocations running in this process (never swept). Solvers
+# run in worker processes, so each workspace also holds an flock on its
+# directory for as long as it is in use; the janitor skips locked ones.
+_active = set()
+
+
+def _root() -> Path:
+    root = Path(settings.WORKSPACE_DIR)
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def disk_usage(path: str) -> int:
+    """Bytes used by a file or directory tree (not following symlinks)"""
+    try:
+        if not os.path.isdir(path) or os.path.islink(path):
+            return os.lstat(path).st_size
+    except OSError:
+        return 0
+    total = 0
+    for directory, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(directory, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _remove(path: str) -> int:
+    """Delete a file or directory tree; returns the bytes it used"""
+    size = disk_usage(path)
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        try:
+            os.unlink(path)
+        except OSError:
+            return 0
+    return size
+
+
+def _lock(path: str, blocking: bool = True) -> Optional[int]:
+    """
+    Descriptor of directory path holding an exclusive flock on it, or
+    None when another process holds the lock (or path is gone).
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _create(prefix: str) -> Tuple[str, Optional[int]]:
+    """A new workspace directory and the descriptor holding its lock"""
+    while True:
+        path = tempfile.mkdtemp(prefix=prefix, dir=str(_root()))
+        if fcntl is None:
+            return path, None
+        fd = _lock(path)
+        if fd is not None:
+            try:
+                if os.stat(path).st_ino == os.fstat(fd).st_ino:
+                    return path, fd
+            except OSError:
+                pass
+            os.close(fd)
+        # Swept by a janitor before it was locked; take another name
+
+
+def _in_use(path: str) -> bool:
+    """Whether path is the workspace of a running invocation in any process"""
+    if path in _active:
+        return True
+    if fcntl is None or not os.path.isdir(path) or os.path.islink(path):
+        return False
+    fd = _lock(path, blocking=False)
+    if fd is None:
+        return os.path.isdir(path)
+    os.close(fd)
+    return False
+
+
+def _remove_unused(path: str) -> Optional[int]:
+    """_remove unless path is a running workspace (None then), holding its lock while deleting"""
+    if path in _active:
+        return None
+    if fcntl is None or not os.path.isdir(path) or os.path.islink(path):
+        return _remove(path)
+    fd = _lock(path, blocking=False)
+    if fd is None:
+        return None if os.path.isdir(path) else 0
+    try:
+        return _remove(path)
+    finally:
+        os.close(fd)
+
+
+@contextlib.contextmanager
+def workspace(prefix: str = "solver-") -> Iterator[str]:
+    """
+    A fresh directory for one solver invocation, deleted when the block
+    exits. ``scratch_dir`` calls inside the block create their
+    directories in it, so everything the invocation wrote is released
+    with it.
+    """
+    path, fd = _create(prefix)
+    token = _current.set(path)
+    with _stats_lock:
+        stats["workspaces"] += 1
+        _active.add(path)
+    try:
+        yield path
+    finally:
+        _current.reset(token)
+        released = _remove(path)
+        if fd is not None:
+            os.close(fd)
+        with _stats_lock:
+            _active.discard(path)
+            stats["released"] += 1
+            stats["bytes_released"] += released
+
+
+def workspace_stats() -> Dict[str, int]:
+    with _stats_lock:
+        return dict(stats, active=len(_active))
+
+
+def scratch_dir(prefix: str = "tmp-") -> str:
+    """
+    A new temporary directory (``tempfile.mkdtemp`` replacement). Inside
+    a ``workspace`` it is removed with the workspace; otherwise it sits
+    under WORKSPACE_DIR until the janitor expires it.
+    """
+    return tempfile.mkdtemp(prefix=prefix, dir=_current.get() or str(_root()))
+
+
+class ArtifactRule(NamedTuple):
+    """Entries directly under ``directory`` expire after ``max_age`` seconds; the oldest go first above ``max_bytes``"""
+    directory: str
+    max_age: float
+    max_bytes: int
+
+
+def artifact_rules() -> List[ArtifactRule]:
+    """Directories the janitor keeps in bounds"""
+    max_age = settings.ARTIFACT_MAX_AGE_HOURS * 3600
+    max_bytes = settings.ARTIFACT_MAX_MB * 1024 * 1024
+    return [
+        # Workspaces are released by their invocation; leftovers are from killed workers
+        ArtifactRule(settings.WORKSPACE_DIR, settings.WORKSPACE_MAX_AGE_SECONDS, max_bytes),
+        ArtifactRule(os.path.join("static", "audio"), max_age, max_bytes),
+    ]
+
+
+class Janitor:
+    """
+    Background thread that sweeps artifact directories every ``interval``
+    seconds: entries older than their rule's ``max_age`` are deleted,
+    then the oldest entries until the directory fits in ``max_bytes``.
+    Several workers may sweep the same directories; deletions are
+    idempotent, and workspaces still locked by a running invocation (in
+    any process) are left alone.
+    """
+
+    def __init__(self, rules: Optional[List[ArtifactRule]] = None, interval: Optional[float] = None):
+        self.rules = artifact_rules() if rules is None else rules
+        self.interval = settings.JANITOR_INTERVAL_SECONDS if interval is None else interval
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stats = {"sweeps": 0, "removed": 0, "bytes_reclaimed": 0}
+
+    def sweep(self) -> Dict[str, int]:
+        """One pass over every rule; returns what was reclaimed"""
+        removed = reclaimed = 0
+        now = time.time()
+        for rule in self.rules:
+            try:
+                names = os.listdir(rule.directory)
+            except OSError:
+                continue
+            entries = []
+            for name in names:
+                path = os.path.join(rule.directory, name)
+                if _in_use(path):
+                    continue
+                try:
+                    mtime = os.lstat(path).st_mtime
+                except OSError:
+                    continue
+                if now - mtime > rule.max_age:
+                    released = _remove_unused(path)
+                    if released is not None:
+                        reclaimed += released
+                        removed += 1
+                else:
+                    entries.append((mtime, path, disk_usage(path)))
+
+            total = sum(size for _, _, size in entries)
+            for _, path, size in sorted(entries):
+                if total <= rule.max_bytes:
+                    break
+                released = _remove_unused(path)
+                if released is None:
+                    continue
+                reclaimed += released
+                removed += 1
+                total -= size
+
+        self.stats["sweeps"] += 1
+        self.stats["removed"] += removed
+        self.stats["bytes_reclaimed"] += reclaimed
+        if removed:
+            logger.info(f"Janitor removed {removed} artifacts ({reclaimed} bytes)")
+        return {"removed": removed, "bytes_reclaimed": reclaimed}
+
+    def start(self):
+        if self._thread is not None or self.interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="artifact-janitor", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.warning(f"Janitor sweep failed: {e}")
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+# Global janitor (started by the app)
+janitor = Janitor()
@@ -0,0 +1,236 @@
+"""
+Image Compress
+Smallest-encoding search for images under a byte budget (PNG and palette PNG, then WebP lossless)
+"""
+import base64
+import io
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image, features
+
+from src.core.content_signature import file_signature
+from src.core.shared_cache import shared_cache
+
+logger = logging.getLogger(__name__)
+
+# zlib strategies accepted by Pillow's PNG encoder (compress_type)
+PNG_STRATEGIES = {"default": 0, "filtered": 1, "huffman": 2, "rle": 3, "fixed": 4}
+
+# Lossy fallbacks, best quality first (the steps the solver always used)
+PALETTE_SIZES = (256, 128, 64, 32, 16, 8, 4, 2)
+RESIZE_SCALES = (0.9, 0.8, 0.7, 0.6, 0.5, 0.4, 0.3, 0.2)
+
+# WebP lossless at full effort (method 6, quality 100) is hundreds of times
+# slower than the quick setting and rarely more than a fifth smaller, so
+# it only runs when the quick size times this factor would fit
+WEBP_QUICK = {"lossless": True, "quality": 50, "method": 4}
+WEBP_FULL = {"lossless": True, "quality": 100, "method": 6}
+WEBP_EFFORT_GAIN = 0.8
+
+ENCODE_THREADS = 4
+
+
+class Compressed(NamedTuple):
+    data: bytes
+    format: str     # "PNG" or "WEBP"
+    strategy: str   # how the winning candidate was produced
+    lossless: bool
+
+
+def _packed_colours(image: Image.Image) -> np.ndarray:
+    rgb = np.asarray(image.convert("RGB"))
+    return (rgb[:, :, 0].astype(np.uint32) << 16) | (rgb[:, :, 1].astype(np.uint32) << 8) | rgb[:, :, 2]
+
+
+def colour_count(image: Image.Image) -> int:
+    """Distinct RGB colours in the image"""
+    return len(np.unique(_packed_colours(image)))
+
+
+def exact_palette(image: Image.Image) -> Optional[Image.Image]:
+    """
+    The image as a 'P' image whose palette holds exactly its colours
+    (most frequent first), or None if it has more than 256 colours or
+    carries alpha. Converting back gives the original pixels.
+    """
+    if image.mode not in ("RGB", "L", "P"):
+        return None
+    packed = _packed_colours(image)
+    colours, inverse, counts = np.unique(packed.ravel(), return_inverse=True, return_counts=True)
+    if len(colours) > 256:
+        return None
+    order = np.argsort(-counts, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    indices = rank[inverse].astype(np.uint8).reshape(packed.shape)
+    palette = np.stack([(colours[order] >> shift) & 0xFF for shift in (16, 8, 0)], axis=1)
+
+    paletted = Image.fromarray(indices, "L")
+    paletted.putpalette(palette.astype(np.uint8).ravel().tolist())  # converts to mode 'P'
+    return paletted
+
+
+class ImageCompressor:
+    """
+    Finds the smallest encoding of an image that fits a byte budget.
+
+    PNG candidates are encoded once each, in parallel threads (the
+    encoders release the GIL): an exact-palette PNG when the image has at
+    most 256 colours (bit depth shrinks with the palette), otherwise the
+    truecolour PNG, each under every zlib strategy at level 9 (lower
+    levels are never smaller). The smallest PNG that fits wins; WebP
+    lossless is only tried when no PNG of those pixels fits, and its
+    slow full-effort encode is skipped when the quick one shows it
+    cannot reach the budget. Only if nothing lossless fits does it fall
+    back to the lossy steps the solver always used, binary-searching the
+    largest palette (below the image's own colour count) and then the
+    largest scale that fits instead of trying each in turn.
+
+    Results are cached by the file's content signature and budget, in
+    the shared cache when one is given.
+    """
+
+    NAMESPACE = "compressed_images"
+    VERSION = 2  # bump when the encodings tried or the selection between them change
+
+    def __init__(self, backend=None, threads: int = ENCODE_THREADS):
+        self.backend = backend
+        self.threads = threads
+        self._memory: Dict[str, Compressed] = {}  # used without a backend
+        self._lock = threading.Lock()
+        self.stats = {"encodes": 0, "pruned": 0, "hits": 0, "searches": 0}
+
+    def _encode(self, image: Image.Image, fmt: str, strategy: str, **params) -> Tuple[bytes, str, str]:
+        buffer = io.BytesIO()
+        image.save(buffer, format=fmt, **params)
+        with self._lock:
+            self.stats["encodes"] += 1
+        return buffer.getvalue(), fmt, strategy
+
+    def _smallest(self, pool: ThreadPoolExecutor, image: Image.Image, max_bytes: int,
+                  label: str = "") -> Tuple[bytes, str, str]:
+        """
+        Smallest PNG of one (already final) set of pixels, under every
+        zlib strategy in parallel. If none fits, WebP lossless: quick,
+        then full effort only if the quick size says it could fit.
+        """
+        paletted = exact_palette(image)
+        source = paletted if paletted is not None else image
+        kind = "palette" if paletted is not None else "truecolor"
+        best = min(pool.map(
+            lambda item: self._encode(source, "PNG", f"{label}{kind} png/{item[0]}",
+                                      optimize=True, compress_type=item[1]),
+            PNG_STRATEGIES.items()), key=lambda result: len(result[0]))
+        if len(best[0]) <= max_bytes or not features.check("webp"):
+            return best
+
+        webp_source = image if image.mode in ("RGB", "RGBA") else image.convert("RGB")
+        quick = self._encode(webp_source, "WEBP", f"{label}webp lossless", **WEBP_QUICK)
+        best = min(best, quick, key=lambda result: len(result[0]))
+        if len(best[0]) > max_bytes:
+            if len(quick[0]) * WEBP_EFFORT_GAIN <= max_bytes:
+                full = self._encode(webp_source, "WEBP", f"{label}webp lossless/max effort", **WEBP_FULL)
+                best = min(best, full, key=lambda result: len(result[0]))
+            else:
+                with self._lock:
+                    self.stats["pruned"] += 1
+        return best
+
+    @staticmethod
+    def _largest_fitting(options: Sequence, fits: Callable) -> Optional[tuple]:
+        """
+        Binary search over options ordered from largest output to
+        smallest (size is treated as monotonic); returns the first option
+        that fits as (option, result), or None.
+        """
+        low, high, best = 0, len(options) - 1, None
+        while low <= high:
+            middle = (low + high) // 2
+            result = fits(options[middle])
+            if result is not None:
+                best = (options[middle], result)
+                high = middle - 1
+            else:
+                low = middle + 1
+        return best
+
+    def compress(self, path: str, max_bytes: int) -> Optional[Compressed]:
+        """Smallest encoding of the image at path within max_bytes, or None"""
+        signature = file_signature(path)
+        key = f"v{self.VERSION}:{signature}:{max_bytes}" if signature else None
+        cached = self._cached(key)
+        if cached is not None:
+            with self._lock:
+                self.stats["hits"] += 1
+            return cached
+
+        with self._lock:
+            self.stats["searches"] += 1
+        with Image.open(path) as opened:
+            image = opened.convert("RGBA" if "A" in opened.mode or "transparency" in opened.info else
+                                   "RGB" if opened.mode not in ("L", "RGB") else opened.mode)
+
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            data, fmt, strategy = self._smallest(pool, image, max_bytes)
+            result = Compressed(data, fmt, strategy, True) if len(data) <= max_bytes else None
+
+            if result is None:
+                logger.info(f"No lossless encoding of {path} fits {max_bytes} bytes ({len(data)} at best)")
+                # Palettes at least as large as the image's colour count are the lossless image again
+                colours = colour_count(image)
+                palette_sizes = [size for size in PALETTE_SIZES if size < colours]
+
+                def palette_fits(size):
+                    reduced = image.convert("RGB").convert("P", palette=Image.ADAPTIVE, colors=size)
+                    encoded = self._smallest(pool, reduced, max_bytes, f"{size}-colour ")
+                    return encoded if len(encoded[0]) <= max_bytes else None
+
+                def resize_fits(scale):
+                    size = (max(1, int(image.width * scale)), max(1, int(image.height * scale)))
+                    encoded = self._smallest(pool, image.resize(size, Image.LANCZOS), max_bytes, f"{scale:g}x ")
+                    return encoded if len(encoded[0]) <= max_bytes else None
+
+                found = (self._largest_fitting(palette_sizes, palette_fits) or
+                         self._largest_fitting(RESIZE_SCALES, resize_fits))
+                if found is not None:
+                    result = Compressed(*found[1], False)
+
+        if result is not None:
+            self._remember(key, result)
+        return result
+
+    def _cached(self, key: Optional[str]) -> Optional[Compressed]:
+        if key is None:
+            return None
+        if self.backend is None:
+            return self._memory.get(key)
+        try:
+            raw = self.backend.get(self.NAMESPACE, key)
+        except Exception as e:
+            logger.warning(f"Compressed image cache unavailable: {e}")
+            return None
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return Compressed(base64.b64decode(entry["data"]), entry["format"], entry["strategy"], entry["lossless"])
+
+    def _remember(self, key: Optional[str], result: Compressed):
+        if key is None:
+            return
+        if self.backend is None:
+            self._memory[key] = result
+            return
+        entry = dict(result._asdict(), data=base64.b64encode(result.data).decode("ascii"))
+        try:
+            self.backend.put(self.NAMESPACE, key, json.dumps(entry).encode("utf-8"))
+        except Exception as e:
+            logger.warning(f"Compressed image cache unavailable: {e}")
+
+
+# Global compressor (results shared through the host cache when it is enabled)
+image_compressor = ImageCompressor(shared_cache)
@@ -0,0 +1,75 @@
+"""
+Jigsaw
+Tile-permutation reassembly of scrambled images on a single NumPy array
+"""
+import logging
+import re
+from typing import Tuple
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Mapping table rows: original row, original column, scrambled row, scrambled column
+MAPPING_ROW_PATTERN = re.compile(r"^[ \t]*(\d+)[ \t]+(\d+)[ \t]+(\d+)[ \t]+(\d+)\b", re.MULTILINE)
+
+
+def parse_mapping(text: str) -> np.ndarray:
+    """
+    Every mapping row in text, as an (n, 4) integer array of
+    (original row, original column, scrambled row, scrambled column).
+    Lines that do not start with four integers are ignored; any further
+    columns are.
+    """
+    rows = MAPPING_ROW_PATTERN.findall(text)
+    return np.array(rows, dtype=np.intp).reshape(-1, 4)
+
+
+def unscramble(pixels: np.ndarray, mapping, grid: Tuple[int, int]) -> np.ndarray:
+    """
+    Reassemble an image (H x W or H x W x C) cut into a rows x cols grid.
+
+    The tiled area is viewed as (rows, tile_h, cols, tile_w, ...) and
+    gathered with one fancy index that reads each destination tile from
+    its source tile, so the result comes out already in image layout.
+    Tiles the mapping does not place, and the edge pixels left over when
+    the size does not divide by the grid, stay black (as when pasting
+    onto a new image). Entries outside the grid are skipped.
+    """
+    rows, cols = grid
+    mapping = np.asarray(mapping, dtype=np.intp).reshape(-1, 4)
+    tile_h, tile_w = pixels.shape[0] // rows, pixels.shape[1] // cols
+    inside = ((mapping >= 0) & (mapping < np.array([rows, cols, rows, cols]))).all(axis=1)
+    if not inside.all():
+        logger.warning(f"Skipping {int((~inside).sum())} mapping entries outside the {rows}x{cols} grid")
+        mapping = mapping[inside]
+
+    # Source tile of every destination tile (-1 where nothing is placed)
+    source_row = np.full((rows, cols), -1, dtype=np.intp)
+    source_col = np.full((rows, cols), -1, dtype=np.intp)
+    source_row[mapping[:, 0], mapping[:, 1]] = mapping[:, 2]
+    source_col[mapping[:, 0], mapping[:, 1]] = mapping[:, 3]
+    missing = source_row < 0
+
+    channels = pixels.shape[2:]
+    tiles = pixels[:rows * tile_h, :cols * tile_w].reshape(rows, tile_h, cols, tile_w, *channels)
+    gathered = tiles[np.where(missing, 0, source_row)[:, np.newaxis, :],
+                     np.arange(tile_h)[np.newaxis, :, np.newaxis],
+                     np.where(missing, 0, source_col)[:, np.newaxis, :]]
+    if missing.any():
+        gathered.swapaxes(1, 2)[missing] = 0
+
+    if gathered.size == pixels.size:
+        return gathered.reshape(pixels.shape)
+    result = np.zeros_like(pixels)
+    result[:rows * tile_h, :cols * tile_w] = gathered.reshape(rows * tile_h, cols * tile_w, *channels)
+    return result
+
+
+def unscramble_image(image: Image.Image, mapping, grid: Tuple[int, int]) -> Image.Image:
+    """unscramble for a PIL image, keeping its mode (and palette)"""
+    result = Image.fromarray(unscramble(np.asarray(image), mapping, grid), image.mode)
+    if image.mode == "P":
+        result.putpalette(image.getpalette())
+    return result
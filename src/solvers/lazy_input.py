@@ -0,0 +1,187 @@
+"""
+Lazy Input
+Memory-mapped, single-pass and streaming access to large local input files
+"""
+import io
+import json
+import mmap
+import re
+from array import array
+from typing import Any, Iterator, Optional
+
+# Text read per step when streaming JSON (doubled while one value does not fit),
+# and bytes decoded per step when iterating over lines
+READ_CHARS = 256 * 1024
+
+# Every JSON string, and whether it is an object key. Outside strings JSON
+# has no quotes, so scanning string to string never starts inside one.
+JSON_STRING_PATTERN = re.compile(rb'"([^"\\]*(?:\\.[^"\\]*)*)"(\s*:)?', re.DOTALL)
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class LocalInput:
+    """
+    A local input file opened lazily.
+
+    The file is memory-mapped, so ``line_count``, ``line`` and
+    ``json_keys`` scan it without copying it into Python objects;
+    ``lines`` and ``json_items`` read it once, front to back. Memory use
+    stays flat however large the file is (``line`` keeps one offset per
+    line once it has been called).
+
+    Lines end at ``\n``: a final line without one still counts, and a
+    ``\r\n`` ending is read as ``\n``. The line API needs an encoding
+    that writes newlines as the byte ``\n`` (UTF-8, ASCII, Latin-1).
+    """
+
+    def __init__(self, path: str, encoding: str = "utf-8", errors: Optional[str] = None):
+        self.path = path
+        self.encoding = encoding
+        self.errors = errors
+        self._file: Optional[io.BufferedReader] = None
+        self._map: Optional[mmap.mmap] = None
+        self._line_count: Optional[int] = None
+        self._offsets: Optional[array] = None
+
+    def __enter__(self) -> "LocalInput":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def data(self) -> bytes:
+        """The file's bytes, memory-mapped (empty files cannot be mapped)"""
+        if self._map is None:
+            if self._file is None:
+                self._file = open(self.path, "rb")
+            try:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                return b""
+        return self._map
+
+    def _decode(self, raw: bytes) -> str:
+        return raw.decode(self.encoding, self.errors or "strict")
+
+    @property
+    def line_count(self) -> int:
+        """Number of lines ``lines`` yields, counted in the map before reading any"""
+        if self._line_count is None:
+            data = self.data
+            count = 0
+            for start in range(0, len(data), READ_CHARS):
+                count += data[start:start + READ_CHARS].count(b"\n")
+            if len(data) and data[len(data) - 1:] != b"\n":
+                count += 1
+            self._line_count = count
+        return self._line_count
+
+    def lines(self) -> Iterator[str]:
+        """
+        Text lines (with their newline) in one pass over the map, decoded
+        a block of whole lines at a time
+        """
+        data = self.data
+        start = 0
+        while start < len(data):
+            end = data.rfind(b"\n", start, start + READ_CHARS) + 1
+            if end <= start:
+                # No newline in this block: it is part of one long line
+                end = data.find(b"\n", start + READ_CHARS) + 1 or len(data)
+            parts = self._decode(data[start:end]).replace("\r\n", "\n").split("\n")
+            last = parts.pop()
+            for part in parts:
+                yield part + "\n"
+            if last:
+                yield last
+            start = end
+
+    def line(self, index: int) -> str:
+        """Line ``index`` (0-based, with its newline) read straight from the map"""
+        if self._offsets is None:
+            offsets = array("q", [0])
+            data = self.data
+            position = data.find(b"\n")
+            while position != -1:
+                offsets.append(position + 1)
+                position = data.find(b"\n", position + 1)
+            if offsets[-1] != len(data):
+                offsets.append(len(data))
+            self._offsets = offsets
+        if not 0 <= index < len(self._offsets) - 1:
+            raise IndexError(f"{self.path} has no line {index}")
+        text = self._decode(self.data[self._offsets[index]:self._offsets[index + 1]])
+        return text[:-2] + "\n" if text.endswith("\r\n") else text
+
+    def json_keys(self) -> Iterator[str]:
+        """
+        Every object key in a JSON document, in document order, without
+        building the document. A key repeated within one object is seen
+        each time (``json.load`` keeps only the last).
+        """
+        for match in JSON_STRING_PATTERN.finditer(self.data):
+            if match.group(2) is not None:
+                raw = match.group(1)
+                yield json.loads(b'"' + raw + b'"') if b"\\" in raw else raw.decode(self.encoding)
+
+    def json_items(self) -> Iterator[Any]:
+        """
+        Elements of a top-level JSON array, decoded one at a time.
+        Raises json.JSONDecodeError for malformed input.
+        """
+        decoder = json.JSONDecoder()
+        with open(self.path, "r", encoding=self.encoding, errors=self.errors) as f:
+            buffer, position, eof = "", 0, False
+            read_chars = READ_CHARS
+
+            def skip_whitespace():
+                nonlocal buffer, position, eof
+                while True:
+                    position = _WHITESPACE.match(buffer, position).end()
+                    if position < len(buffer) or eof:
+                        return
+                    buffer, position = f.read(read_chars), 0
+                    eof = not buffer
+
+            skip_whitespace()
+            if buffer[position:position + 1] != "[":
+                raise json.JSONDecodeError("Expecting '['", buffer, position)
+            position += 1
+            after_item = False
+            while True:
+                skip_whitespace()
+                char = buffer[position:position + 1]
+                if char == "]":
+                    return
+                if after_item:
+                    if char != ",":
+                        raise json.JSONDecodeError("Expecting ',' delimiter", buffer, position)
+                    position += 1
+                    skip_whitespace()
+
+                # Decode the next element, reading more while it may be cut off
+                while True:
+                    try:
+                        item, end = decoder.raw_decode(buffer, position)
+                        if end < len(buffer) or eof:
+                            break
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                    more = f.read(read_chars)
+                    eof = not more
+                    buffer, position = buffer[position:] + more, 0
+                    read_chars *= 2
+                read_chars = READ_CHARS
+                yield item
+                position, after_item = end, True
@@ -0,0 +1,552 @@
+"""
+Log Engine
+Parse Apache access logs once into columns and answer filters with NumPy masks
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import urllib.parse
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.core.config import settings
+from src.core.shared_cache import shared_cache
+from src.solvers.worker_pool import pool_context, usable_cpus
+
+logger = logging.getLogger(__name__)
+
+# Leading fields of a combined log line; referer, user agent, vhost and
+# server are not needed. Quoted fields may contain backslash-escaped quotes.
+LOG_LINE_PATTERN = re.compile(
+    r'^(\S+) \S+ \S+ \[([^\]\n]*)\] '
+    r'"([^ "\\\n]*) ?([^ "\\\n]*)[^"\\\n]*(?:\\.[^"\\\n]*)*" '
+    r'(\d{3}) (\S+)',
+    re.MULTILINE,
+)
+
+# Decompressed text parsed per chunk (cut at a line boundary)
+CHUNK_BYTES = 8 * 1024 * 1024
+
+# Fixed-width Apache timestamp: 09/May/2024:13:05:59 -0500
+TIMESTAMP_WIDTH = 26
+_MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+_MONTH_KEYS = np.array([(ord(m[0]) << 16) | (ord(m[1]) << 8) | ord(m[2]) for m in _MONTHS], dtype=np.int64)
+_MONTH_ORDER = np.argsort(_MONTH_KEYS)
+_DIGIT_COLUMNS = [0, 1, 7, 8, 9, 10, 12, 13, 15, 16, 18, 19, 22, 23, 24, 25]
+_SEPARATORS = {2: "/", 6: "/", 11: ":", 14: ":", 17: ":", 20: " "}
+
+COLUMNS = ["ip", "epoch", "offset", "method", "url", "status", "size"]
+
+
+def days_from_civil(year: np.ndarray, month: np.ndarray, day: np.ndarray) -> np.ndarray:
+    """Days since 1970-01-01 for proleptic Gregorian dates (vectorized)"""
+    year = year - (month <= 2)
+    era = np.floor_divide(year, 400)
+    year_of_era = year - era * 400
+    day_of_year = (153 * np.where(month > 2, month - 3, month + 9) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def parse_timestamps(values: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Parse Apache timestamps without per-row Python work.
+
+    Returns (epoch seconds UTC, UTC offset in minutes, valid mask).
+    """
+    n = len(values)
+    if n == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty.astype(np.int16), np.zeros(0, dtype=bool)
+
+    text = np.array(values, dtype=f"U{TIMESTAMP_WIDTH + 1}")
+    valid = np.char.str_len(text) == TIMESTAMP_WIDTH
+    codes = text.view(np.uint32).reshape(n, TIMESTAMP_WIDTH + 1)[:, :TIMESTAMP_WIDTH].astype(np.int64)
+
+    digits = codes[:, _DIGIT_COLUMNS] - 48
+    valid &= ((digits >= 0) & (digits <= 9)).all(axis=1)
+    for column, separator in _SEPARATORS.items():
+        valid &= codes[:, column] == ord(separator)
+    sign = codes[:, 21]
+    valid &= (sign == ord("+")) | (sign == ord("-"))
+
+    month_key = (codes[:, 3] << 16) | (codes[:, 4] << 8) | codes[:, 5]
+    position = np.searchsorted(_MONTH_KEYS[_MONTH_ORDER], month_key).clip(0, 11)
+    month_index = _MONTH_ORDER[position]
+    valid &= _MONTH_KEYS[month_index] == month_key
+
+    d = digits
+    day = d[:, 0] * 10 + d[:, 1]
+    year = d[:, 2] * 1000 + d[:, 3] * 100 + d[:, 4] * 10 + d[:, 5]
+    hour, minute, second = d[:, 6] * 10 + d[:, 7], d[:, 8] * 10 + d[:, 9], d[:, 10] * 10 + d[:, 11]
+    offset = (d[:, 12] * 10 + d[:, 13]) * 60 + d[:, 14] * 10 + d[:, 15]
+    offset = np.where(sign == ord("-"), -offset, offset)
+    valid &= (day >= 1) & (day <= 31) & (hour <= 23) & (minute <= 59) & (second <= 60)
+
+    local = days_from_civil(year, month_index + 1, day) * 86400 + hour * 3600 + minute * 60 + second
+    return local - offset * 60, offset.astype(np.int16), valid
+
+
+def _sizes(values: List[str]) -> np.ndarray:
+    """Response sizes; '-' and other non-digits count as 0"""
+    text = np.array(values)
+    digits = np.char.isdigit(text)
+    sizes = np.zeros(len(text), dtype=np.int64)
+    sizes[digits] = text[digits].astype(np.int64)
+    return sizes
+
+
+def parse_chunk(text: str) -> pd.DataFrame:
+    """Parse a block of whole log lines into a frame (unparseable lines dropped)"""
+    rows = LOG_LINE_PATTERN.findall(text)
+    if not rows:
+        return _empty_frame()
+    ips, times, methods, urls, statuses, sizes = zip(*rows)
+
+    epoch, offset, valid = parse_timestamps(times)
+    frame = pd.DataFrame({
+        "ip": pd.Categorical(ips),
+        "epoch": epoch,
+        "offset": offset,
+        "method": pd.Categorical(methods),
+        "url": pd.Categorical(urls),
+        "status": np.array(statuses, dtype="U3").astype(np.int16),
+        "size": _sizes(sizes),
+    })
+    if not valid.all():
+        frame = frame[valid].reset_index(drop=True)
+    return frame
+
+
+def _empty_frame() -> pd.DataFrame:
+    return pd.DataFrame({
+        "ip": pd.Categorical([]), "epoch": np.zeros(0, np.int64), "offset": np.zeros(0, np.int16),
+        "method": pd.Categorical([]), "url": pd.Categorical([]),
+        "status": np.zeros(0, np.int16), "size": np.zeros(0, np.int64),
+    })
+
+
+def open_log(path: str):
+    """Binary stream of a plain or gzipped log"""
+    with open(path, "rb") as f:
+        gzipped = f.read(2) == b"\x1f\x8b"
+    return gzip.open(path, "rb") if gzipped else open(path, "rb")
+
+
+def iter_line_blocks(stream, chunk_bytes: int = CHUNK_BYTES,
+                     carry: Optional[bytearray] = None) -> Iterator[bytes]:
+    """
+    Blocks of whole lines from a binary stream.
+
+    With a ``carry`` buffer, its contents are prepended and a final
+    unterminated line is left in it instead of being yielded.
+    """
+    remainder = bytes(carry) if carry else b""
+    while True:
+        block = stream.read(chunk_bytes)
+        if not block:
+            break
+        block = remainder + block
+        cut = block.rfind(b"\n") + 1
+        if cut == 0:
+            remainder = block
+            continue
+        remainder = block[cut:]
+        yield block[:cut]
+    if carry is not None:
+        carry[:] = remainder
+    elif remainder:
+        yield remainder
+
+
+def parse_block(block: bytes) -> pd.DataFrame:
+    """Parse a block of whole lines (runs in pool workers)"""
+    return parse_chunk(block.decode("utf-8", errors="replace"))
+
+
+def parse_workers(size: int) -> int:
+    """Processes to parse an input of this many raw bytes with"""
+    if size < settings.LOG_PARALLEL_MIN_MB * 1024 * 1024:
+        return 1
+    if settings.LOG_PARSE_WORKERS > 0:
+        return settings.LOG_PARSE_WORKERS
+    return usable_cpus()
+
+
+def _parallel_map(fn, items: Iterable, workers: int) -> Iterator:
+    """
+    Ordered map over a process pool, keeping at most two items per worker
+    in flight so a large input is never read into memory all at once.
+    """
+    with ProcessPoolExecutor(max_workers=workers, mp_context=pool_context()) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(fn, item))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def parse_stream(stream, chunk_bytes: int = CHUNK_BYTES, carry: Optional[bytearray] = None,
+                 workers: int = 1) -> pd.DataFrame:
+    """
+    Parse a binary stream into one frame with decoded URLs.
+
+    Decompression stays sequential in this process; with more than one
+    worker the line-aligned blocks are parsed in a process pool and the
+    chunk frames merged in input order.
+    """
+    blocks = iter_line_blocks(stream, chunk_bytes, carry)
+    if workers > 1:
+        frames = _parallel_map(parse_block, blocks, workers)
+    else:
+        frames = map(parse_block, blocks)
+    frame = concat_frames(frames)
+    frame["url"] = decode_urls(frame["url"].array)
+    return frame
+
+
+def concat_frames(frames: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate chunk frames, unioning their categorical columns"""
+    frames = [f for f in frames if len(f)]
+    if not frames:
+        return _empty_frame()
+    if len(frames) == 1:
+        return frames[0]
+    columns = {}
+    for name in COLUMNS:
+        if isinstance(frames[0][name].dtype, pd.CategoricalDtype):
+            columns[name] = pd.api.types.union_categoricals([f[name] for f in frames])
+        else:
+            columns[name] = np.concatenate([f[name].to_numpy() for f in frames])
+    return pd.DataFrame(columns)
+
+
+def decode_urls(urls: pd.Categorical) -> pd.Categorical:
+    """Percent-decode URLs once per distinct value instead of once per row"""
+    categories = urls.categories.to_numpy(dtype=object)
+    decoded = np.array([urllib.parse.unquote(u) if "%" in u else u for u in categories], dtype=object)
+    remap, uniques = pd.factorize(decoded)
+    codes = np.asarray(urls.codes)
+    return pd.Categorical.from_codes(np.where(codes >= 0, remap[codes], -1), categories=uniques)
+
+
+class LogTable:
+    """
+    Columnar Apache access log: ip, epoch (UTC seconds), offset (minutes),
+    method, url (percent-decoded), status, size.
+
+    Filters are evaluated over whole columns; string conditions are
+    evaluated once per distinct category and broadcast through the codes.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+
+    @classmethod
+    def from_file(cls, path: str, chunk_bytes: int = CHUNK_BYTES,
+                  workers: Optional[int] = None) -> "LogTable":
+        if workers is None:
+            workers = parse_workers(os.path.getsize(path))
+        with open_log(path) as stream:
+            return cls(parse_stream(stream, chunk_bytes, workers=workers))
+
+    def __len__(self):
+        return len(self.frame)
+
+    def _category_mask(self, column: str, predicate) -> np.ndarray:
+        values = self.frame[column].array
+        matches = np.fromiter((predicate(c) for c in values.categories), dtype=bool,
+                              count=len(values.categories))
+        codes = np.asarray(values.codes)
+        return np.append(matches, False)[codes]  # code -1 (missing) never matches
+
+    def local_seconds(self, tz_minutes: Optional[int] = None) -> np.ndarray:
+        """Seconds since epoch in the given UTC offset (None: each row's own)"""
+        epoch = self.frame["epoch"].to_numpy()
+        if tz_minutes is None:
+            return epoch + self.frame["offset"].to_numpy().astype(np.int64) * 60
+        return epoch + tz_minutes * 60
+
+    def mask(self, method: Optional[str] = None, path_prefix: Optional[str] = None,
+             include_bare_path: bool = False, success: bool = True,
+             weekday: Optional[int] = None, day: Optional[date] = None,
+             time_range: Optional[Tuple[int, int]] = None,
+             tz_minutes: Optional[int] = None) -> np.ndarray:
+        """
+        Boolean row mask.
+
+        path_prefix matches URLs starting with it; with include_bare_path,
+        the prefix without its trailing slash also matches exactly.
+        weekday (0=Monday), day and time_range ((start, end) seconds of
+        day, end exclusive) are in the tz_minutes offset, or in each
+        row's own offset when tz_minutes is None.
+        """
+        mask = np.ones(len(self.frame), dtype=bool)
+        if method is not None:
+            mask &= self._category_mask("method", lambda m: m == method)
+        if path_prefix is not None:
+            bare = path_prefix.rstrip("/") if include_bare_path else None
+            mask &= self._category_mask("url", lambda u: u.startswith(path_prefix) or u == bare)
+        if success:
+            status = self.frame["status"].to_numpy()
+            mask &= (status >= 200) & (status < 300)
+        if weekday is not None or day is not None or time_range is not None:
+            local = self.local_seconds(tz_minutes)
+            days = np.floor_divide(local, 86400)
+            if weekday is not None:
+                mask &= (days + 3) % 7 == weekday  # 1970-01-01 was a Thursday
+            if day is not None:
+                mask &= days == (day - date(1970, 1, 1)).days
+            if time_range is not None:
+                seconds = local - days * 86400
+                mask &= (seconds >= time_range[0]) & (seconds < time_range[1])
+        return mask
+
+    def count(self, **filters) -> int:
+        return int(self.mask(**filters).sum())
+
+    def bytes_by_ip(self, **filters) -> pd.Series:
+        """Total response bytes per IP for matching rows, in first-seen order"""
+        rows = self.frame[self.mask(**filters)]
+        return rows.groupby("ip", sort=False, observed=True)["size"].sum()
+
+
+class _HashingReader:
+    """Binary file wrapper that hashes and counts every byte read through it"""
+
+    def __init__(self, raw, digest):
+        self.raw = raw
+        self.digest = digest
+        self.size = 0
+
+    def read(self, n: int = -1) -> bytes:
+        data = self.raw.read(n)
+        self.digest.update(data)
+        self.size += len(data)
+        return data
+
+    def drain(self):
+        while self.read(1024 * 1024):
+            pass
+
+
+def _encode_json(value) -> np.ndarray:
+    return np.frombuffer(json.dumps(value).encode("utf-8"), dtype=np.uint8)
+
+
+def _decode_json(array: np.ndarray):
+    return json.loads(array.tobytes().decode("utf-8"))
+
+
+def _decode_categorical(data, name: str) -> pd.Categorical:
+    return pd.Categorical.from_codes(data[name], categories=_decode_json(data[f"{name}_categories"]))
+
+
+class LogSnapshots:
+    """
+    Parsed logs persisted as compressed columnar snapshots (``.npz``) in
+    the shared cache, keyed by the file's content signature.
+
+    A repeated question against the same upload loads the snapshot and
+    skips decompression and regex parsing entirely. Each snapshot records
+    the raw size and SHA-256 of the bytes it covers, and is also indexed
+    by the first raw block of the file (its lineage); when a new file
+    starts with exactly those bytes, only the appended tail is parsed.
+    For gzip this requires the tail to be a new gzip member, which is
+    what appending a compressed chunk produces.
+    """
+
+    NAMESPACE = "log_snapshots"
+    LINEAGE_NAMESPACE = "log_lineage"
+    VERSION = 1
+    HEAD_BYTES = 4096
+
+    def __init__(self, backend, chunk_bytes: int = CHUNK_BYTES):
+        self.backend = backend
+        self.chunk_bytes = chunk_bytes
+        self.stats = {"hits": 0, "incremental": 0, "full": 0}
+
+    def table_for(self, path: str, signature: str) -> LogTable:
+        """Table for the file whose content signature is given"""
+        snapshot = self._load(signature)
+        if snapshot is not None:
+            self.stats["hits"] += 1
+            frame, meta = snapshot
+            return self._table(frame, meta)
+
+        with open(path, "rb") as raw:
+            head = raw.read(self.HEAD_BYTES)
+            lineage = self._lineage_key(head)
+            raw.seek(0)
+            digest = hashlib.sha256()
+            base = self._base_for(raw, lineage, digest)
+            if base is None:
+                raw.seek(0)
+                digest = hashlib.sha256()
+                frame, meta = self._parse(raw, digest, 0, b"")
+                self.stats["full"] += 1
+            else:
+                base_frame, base_meta = base
+                tail, meta = self._parse(raw, digest, base_meta["raw_size"], bytes(base_meta["remainder"]))
+                frame = concat_frames([base_frame, tail])
+                self.stats["incremental"] += 1
+
+        self._save(signature, lineage, frame, meta)
+        return self._table(frame, meta)
+
+    def _lineage_key(self, head: bytes) -> Optional[str]:
+        # Files smaller than one head block are cheap to reparse
+        if len(head) < self.HEAD_BYTES:
+            return None
+        return hashlib.sha256(head).hexdigest()
+
+    def _base_for(self, raw, lineage: Optional[str], digest):
+        """Snapshot of a prefix of this file, with digest advanced past it, or None"""
+        if lineage is None:
+            return None
+        try:
+            signature = self.backend.get(self.LINEAGE_NAMESPACE, lineage)
+        except Exception as e:
+            logger.warning(f"Log snapshots unavailable: {e}")
+            return None
+        base = self._load(signature.decode("utf-8")) if signature else None
+        if base is None:
+            return None
+
+        meta = base[1]
+        remaining = meta["raw_size"]
+        if remaining >= os.fstat(raw.fileno()).st_size:
+            return None
+        while remaining:
+            block = raw.read(min(remaining, 1024 * 1024))
+            if not block:
+                return None
+            digest.update(block)
+            remaining -= len(block)
+        if digest.hexdigest() != meta["raw_digest"]:
+            return None
+        if meta["gzipped"]:
+            magic = raw.read(2)
+            raw.seek(-len(magic), os.SEEK_CUR)
+            if magic != b"\x1f\x8b":
+                return None
+        return base
+
+    def _parse(self, raw, digest, offset: int, carry: bytes):
+        """Parse from raw offset (where digest has reached) to EOF; returns (frame, meta)"""
+        gzipped = raw.read(2) == b"\x1f\x8b"
+        raw.seek(offset)
+
+        reader = _HashingReader(raw, digest)
+        remainder = bytearray(carry)
+        stream = gzip.GzipFile(fileobj=reader, mode="rb") if gzipped else reader
+        workers = parse_workers(os.fstat(raw.fileno()).st_size - offset)
+        frame = parse_stream(stream, self.chunk_bytes, remainder, workers)
+        reader.drain()
+        meta = {"raw_size": offset + reader.size, "raw_digest": digest.hexdigest(),
+                "gzipped": gzipped, "remainder": bytes(remainder)}
+        return frame, meta
+
+    def _table(self, frame: pd.DataFrame, meta: dict) -> LogTable:
+        """Snapshot rows plus the unterminated last line, if any"""
+        if meta["remainder"]:
+            last = parse_chunk(meta["remainder"].decode("utf-8", errors="replace"))
+            last["url"] = decode_urls(last["url"].array)
+            frame = concat_frames([frame, last])
+        return LogTable(frame)
+
+    def _load(self, signature: str):
+        try:
+            path = self.backend.get_file(self.NAMESPACE, signature)
+            if path is None:
+                return None
+            with np.load(path, allow_pickle=False) as data:
+                meta = _decode_json(data["meta"])
+                if meta.get("version") != self.VERSION:
+                    return None
+                meta["remainder"] = data["remainder"].tobytes()
+                frame = pd.DataFrame({
+                    "ip": _decode_categorical(data, "ip"),
+                    "epoch": data["epoch"],
+                    "offset": data["offset"],
+                    "method": _decode_categorical(data, "method"),
+                    "url": _decode_categorical(data, "url"),
+                    "status": data["status"],
+                    "size": data["size"],
+                })
+        except Exception as e:
+            logger.warning(f"Ignoring log snapshot {signature}: {e}")
+            return None
+        return frame, meta
+
+    def _save(self, signature: str, lineage: Optional[str], frame: pd.DataFrame, meta: dict):
+        arrays = {
+            "meta": _encode_json({"version": self.VERSION, "raw_size": meta["raw_size"],
+                                  "raw_digest": meta["raw_digest"], "gzipped": meta["gzipped"]}),
+            "remainder": np.frombuffer(meta["remainder"], dtype=np.uint8),
+        }
+        for name in COLUMNS:
+            column = frame[name]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                arrays[name] = np.asarray(column.array.codes)
+                arrays[f"{name}_categories"] = _encode_json(list(column.array.categories))
+            else:
+                arrays[name] = column.to_numpy()
+
+        fd, tmp_path = tempfile.mkstemp(suffix=".npz", prefix="log-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(f, **arrays)
+            self.backend.put_file(self.NAMESPACE, signature, tmp_path)
+            if lineage is not None:
+                self.backend.put(self.LINEAGE_NAMESPACE, lineage, signature.encode("utf-8"))
+        except Exception as e:
+            logger.warning(f"Could not store log snapshot: {e}")
+        finally:
+            os.unlink(tmp_path)
+
+
+# Persisted snapshots (None when the shared cache is disabled)
+log_snapshots = LogSnapshots(shared_cache) if shared_cache is not None else None
+
+_tables: "OrderedDict[tuple, LogTable]" = OrderedDict()
+_tables_lock = threading.Lock()
+MAX_CACHED_TABLES = 4
+
+
+def load_log(path: str, signature: Optional[str] = None) -> LogTable:
+    """
+    Parsed table for a log file, reused while the file is unchanged.
+
+    With the file's content signature, the parse is also persisted across
+    processes and restarts (see LogSnapshots).
+    """
+    stat = os.stat(path)
+    key = (os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+    with _tables_lock:
+        table = _tables.get(key)
+        if table is not None:
+            _tables.move_to_end(key)
+            return table
+
+    if signature and log_snapshots is not None:
+        table = log_snapshots.table_for(path, signature)
+    else:
+        table = LogTable.from_file(path)
+    with _tables_lock:
+        _tables[key] = table
+        while len(_tables) > MAX_CACHED_TABLES:
+            _tables.popitem(last=False)
+    return table
@@ -0,0 +1,253 @@
+"""
+Marks Table
+Extract student marks tables from a PDF once, in parallel by page, and answer filters over the cached table
+"""
+import importlib.util
+import io
+import logging
+import operator
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.core.shared_cache import shared_cache
+from src.solvers.worker_pool import extract_workers, page_count, pool_context
+
+logger = logging.getLogger(__name__)
+
+SUBJECTS = ["Maths", "Physics", "English", "Economics", "Biology"]
+COLUMNS = SUBJECTS + ["Group"]
+
+GROUP_PATTERN = re.compile(r"group\s*(\d+)", re.IGNORECASE)
+
+COMPARISONS = {
+    ">=": operator.ge,
+    ">": operator.gt,
+    "<=": operator.le,
+    "<": operator.lt,
+    "==": operator.eq,
+}
+
+
+def extraction_available() -> bool:
+    """Whether tabula or camelot can be imported"""
+    return any(importlib.util.find_spec(name) is not None for name in ("tabula", "camelot"))
+
+
+def extract_page(job: Tuple[str, str]) -> List[pd.DataFrame]:
+    """
+    Tables on one page ("all" for the whole document), in page order
+    (runs in pool workers). Camelot only reads pages where tabula found
+    nothing, so no page is extracted twice.
+    """
+    path, page = job
+    tables = []
+    try:
+        import tabula
+        tables = tabula.read_pdf(path, pages=page, multiple_tables=True)
+    except ImportError:
+        pass
+    except Exception as e:
+        logger.warning(f"tabula failed on {path} page {page}: {e}")
+
+    if not tables:
+        try:
+            import camelot
+            tables = [table.df for table in camelot.read_pdf(path, pages=str(page))]
+        except ImportError:
+            pass
+        except Exception as e:
+            logger.warning(f"camelot failed on {path} page {page}: {e}")
+    return [table for table in tables if not table.empty]
+
+
+def extract_tables(path: str, workers: Optional[int] = None) -> List[pd.DataFrame]:
+    """Every table in the PDF in document order, pages extracted in a process pool"""
+    pages = page_count(path)
+    jobs = [(path, str(page)) for page in range(1, pages + 1)] if pages else [(path, "all")]
+    if workers is None:
+        workers = extract_workers(len(jobs))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=pool_context()) as pool:
+            per_page = list(pool.map(extract_page, jobs))
+    else:
+        per_page = [extract_page(job) for job in jobs]
+    return [table for tables in per_page for table in tables]
+
+
+def _lowered(table: pd.DataFrame) -> pd.DataFrame:
+    return table.astype(str).apply(lambda column: column.str.strip().str.lower())
+
+
+def normalize_tables(tables: List[pd.DataFrame], first_group: int = 1) -> pd.DataFrame:
+    """
+    One frame of float subject marks and an integer Group from raw tables.
+
+    A "Student Marks - Group N" title in the column names or the first
+    three rows sets the group (and the title row is dropped); a table
+    without one takes the next group number. The first row naming
+    Maths, Physics and English becomes the header; without subject
+    names, tables of five or more columns are read positionally.
+    """
+    frames = []
+    group = first_group
+    for table in tables:
+        if table.empty:
+            continue
+
+        explicit = False
+        for column in table.columns:
+            match = GROUP_PATTERN.search(str(column))
+            if match:
+                group, explicit = int(match.group(1)), True
+                break
+        if not explicit:
+            for row in range(min(3, len(table))):
+                match = GROUP_PATTERN.search(" ".join(str(value) for value in table.iloc[row].values))
+                if match:
+                    group, explicit = int(match.group(1)), True
+                    table = table.iloc[row + 1:].reset_index(drop=True)
+                    break
+
+        lowered = _lowered(table)
+        is_header = (lowered == "maths").any(axis=1) & (lowered == "physics").any(axis=1) & (lowered == "english").any(axis=1)
+        if is_header.any():
+            row = int(np.argmax(is_header.to_numpy()))
+            table = table.iloc[row + 1:].set_axis([str(value).strip() for value in table.iloc[row].values], axis=1)
+
+        if not any(column in table.columns for column in SUBJECTS) and len(table.columns) >= len(SUBJECTS):
+            table = table.set_axis(SUBJECTS + list(table.columns[len(SUBJECTS):]), axis=1)
+
+        frame = pd.DataFrame({
+            subject: pd.to_numeric(table[subject], errors="coerce").astype(np.float64)
+            if subject in table.columns else np.full(len(table), np.nan)
+            for subject in SUBJECTS
+        })
+        frame["Group"] = np.int64(group)
+        frames.append(frame)
+
+        if not explicit:
+            group += 1
+
+    if not frames:
+        return pd.DataFrame({column: pd.Series(dtype=np.int64 if column == "Group" else np.float64)
+                             for column in COLUMNS})
+    return pd.concat(frames, ignore_index=True)
+
+
+class MarksTable:
+    """Student marks (one row per student: subject marks and Group); filters are whole-column masks"""
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+
+    @classmethod
+    def from_pdf(cls, path: str, workers: Optional[int] = None) -> "MarksTable":
+        return cls(normalize_tables(extract_tables(path, workers)))
+
+    def __len__(self):
+        return len(self.frame)
+
+    def select(self, subject: str, comparison: str, threshold: float,
+               min_group: int, max_group: int) -> pd.DataFrame:
+        """Students whose subject mark compares to threshold, in groups min_group..max_group (unknown comparisons mean >=)"""
+        compare = COMPARISONS.get(comparison, operator.ge)
+        groups = self.frame["Group"].to_numpy()
+        mask = compare(self.frame[subject].to_numpy(), threshold) & (groups >= min_group) & (groups <= max_group)
+        return self.frame[mask]
+
+    def total(self, target: str, subject: str, comparison: str, threshold: float,
+              min_group: int, max_group: int) -> Tuple[float, int]:
+        """Sum of target marks and number of students matching select()"""
+        selected = self.select(subject, comparison, threshold, min_group, max_group)
+        return float(selected[target].sum()), len(selected)
+
+
+class MarksSnapshots:
+    """
+    Extracted marks tables persisted as compressed ``.npz`` columns in the
+    shared cache, keyed by the PDF's content signature, so a PDF is
+    parsed once per host however many different filters are asked of it.
+    """
+
+    NAMESPACE = "marks_tables"
+    VERSION = 1
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.stats = {"hits": 0, "extracted": 0}
+
+    def table_for(self, path: str, signature: str) -> MarksTable:
+        table = self._load(signature)
+        if table is not None:
+            self.stats["hits"] += 1
+            return table
+        table = MarksTable.from_pdf(path)
+        self.stats["extracted"] += 1
+        if len(table):
+            self._save(signature, table)
+        return table
+
+    def _load(self, signature: str) -> Optional[MarksTable]:
+        try:
+            raw = self.backend.get(self.NAMESPACE, signature)
+            if raw is None:
+                return None
+            with np.load(io.BytesIO(raw), allow_pickle=False) as data:
+                if int(data["version"]) != self.VERSION:
+                    return None
+                return MarksTable(pd.DataFrame({column: data[column] for column in COLUMNS}))
+        except Exception as e:
+            logger.warning(f"Ignoring marks snapshot {signature}: {e}")
+            return None
+
+    def _save(self, signature: str, table: MarksTable):
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, version=np.int64(self.VERSION),
+                            **{column: table.frame[column].to_numpy() for column in COLUMNS})
+        try:
+            self.backend.put(self.NAMESPACE, signature, buffer.getvalue())
+        except Exception as e:
+            logger.warning(f"Could not store marks snapshot: {e}")
+
+
+# Persisted snapshots (None when the shared cache is disabled)
+marks_snapshots = MarksSnapshots(shared_cache) if shared_cache is not None else None
+
+_tables: "OrderedDict[tuple, MarksTable]" = OrderedDict()
+_tables_lock = threading.Lock()
+MAX_CACHED_TABLES = 4
+
+
+def load_marks(path: str, signature: Optional[str] = None) -> MarksTable:
+    """
+    Marks table for a PDF, reused while the file is unchanged.
+
+    With the file's content signature, the extraction is also persisted
+    across processes and restarts (see MarksSnapshots). Empty results
+    are not kept, so a failed extraction is retried next time.
+    """
+    stat = os.stat(path)
+    key = (os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+    with _tables_lock:
+        table = _tables.get(key)
+        if table is not None:
+            _tables.move_to_end(key)
+            return table
+
+    if signature and marks_snapshots is not None:
+        table = marks_snapshots.table_for(path, signature)
+    else:
+        table = MarksTable.from_pdf(path)
+    if len(table):
+        with _tables_lock:
+            _tables[key] = table
+            while len(_tables) > MAX_CACHED_TABLES:
+                _tables.popitem(last=False)
+    return table
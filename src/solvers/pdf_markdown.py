@@ -0,0 +1,445 @@
+"""
+PDF Markdown
+PDF to Markdown with page-parallel text extraction, an in-process Markdown formatter and per-signature caching
+"""
+import logging
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from src.core.content_signature import file_signature
+from src.core.shared_cache import shared_cache
+from src.solvers.worker_pool import extract_workers, page_count, pool_context
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_MARKDOWN = "# Sample Document\n\nUnable to extract content from the PDF."
+
+ATX_HEADING = re.compile(r"^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+LIST_ITEM = re.compile(r"^( {0,3})([-+*]|\d{1,9}[.)])(?:([ \t]+)(.*))?$")
+FENCE = re.compile(r"^( {0,3})(`{3,}|~{3,})[ \t]*(.*)$")
+THEMATIC_BREAK = re.compile(r"^ {0,3}([-*_])(?:[ \t]*\1){2,}[ \t]*$")
+SETEXT_UNDERLINE = re.compile(r"^ {0,3}(=+|-+)[ \t]*$")
+SPREAD = re.compile(r"\n\n(?!\s*$)")
+SPACES = re.compile(r"[ \t]+")
+
+
+def extract_page_range(job: Tuple[str, int, int]) -> List[str]:
+    """Text of pages start..stop-1 with PyPDF2 (runs in pool workers)"""
+    from PyPDF2 import PdfReader
+
+    path, start, stop = job
+    reader = PdfReader(path)
+    return [reader.pages[index].extract_text() or "" for index in range(start, stop)]
+
+
+def extract_pages(path: str, workers: Optional[int] = None) -> List[str]:
+    """
+    Text of every page in order. Pages are split into one contiguous
+    range per worker, so each process parses the PDF once.
+    """
+    pages = page_count(path)
+    if not pages:
+        raise ValueError(f"Could not read pages of {path}")
+    if workers is None:
+        workers = extract_workers(pages)
+    step = -(-pages // workers)
+    jobs = [(path, start, min(start + step, pages)) for start in range(0, pages, step)]
+    if len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=len(jobs), mp_context=pool_context()) as pool:
+            ranges = list(pool.map(extract_page_range, jobs))
+    else:
+        ranges = [extract_page_range(job) for job in jobs]
+    return [text for texts in ranges for text in texts]
+
+
+def text_to_markdown(text: str) -> str:
+    """Extracted text as Markdown: short all-caps lines become headings"""
+    lines = []
+    for line in text.split("\n"):
+        line = line.rstrip()
+        if line.strip().isupper() and len(line.strip()) < 60:
+            line = f"# {line.strip()}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+class _Block:
+    def __init__(self, kind: str, key: str = ""):
+        self.kind = kind        # heading, paragraph, code, fence, break, bullet, ordered
+        self.key = key          # list marker character or delimiter, fence info string
+        self.lines: List[str] = []
+        self.items: List[dict] = []
+        self.loose = False
+        self.level = 0
+
+
+def _inline(text: str) -> str:
+    return SPACES.sub(" ", text.strip())
+
+
+def _indent(line: str) -> int:
+    body = line.lstrip(" \t")
+    return len(line[:len(line) - len(body)].expandtabs(4))
+
+
+def _dedent(line: str, width: int) -> str:
+    """The line without up to width columns of indentation"""
+    if line.startswith(" " * width):
+        return line[width:]
+    body = line.lstrip(" \t")
+    lead = line[:len(line) - len(body)].expandtabs(4)
+    return lead[min(width, len(lead)):] + body
+
+
+def _fence(line: str) -> Optional[re.Match]:
+    fence = FENCE.match(line)
+    if fence and fence.group(2)[0] == "`" and "`" in fence.group(3):
+        return None
+    return fence
+
+
+def _list_item(line: str) -> Optional[dict]:
+    """Marker, number, content offset and content when the line starts a list item"""
+    match = LIST_ITEM.match(line)
+    if not match or THEMATIC_BREAK.match(line):
+        return None
+    indent, marker, spaces, content = match.group(1), match.group(2), match.group(3) or "", match.group(4) or ""
+    ordered = marker[-1] in ".)"
+    item = {"key": marker[-1] if ordered else marker, "number": int(marker[:-1]) if ordered else 0,
+            "offset": len(indent) + len(marker) + len(spaces), "spaces": len(spaces), "content": content}
+    if not content:
+        item["offset"] = len(indent) + len(marker) + 1
+    elif len(spaces) > 4:
+        # The content is indented code
+        item["offset"] = len(indent) + len(marker) + 1
+        item["content"] = " " * (len(spaces) - 1) + content
+    return item
+
+
+def _starts_block(line: str) -> bool:
+    """Whether the line ends a paragraph rather than continuing it"""
+    if ATX_HEADING.match(line) or THEMATIC_BREAK.match(line) or _fence(line):
+        return True
+    item = _list_item(line)
+    return item is not None and item["content"] != "" and (item["key"] in "-+*" or item["number"] == 1)
+
+
+def _open_paragraph(blocks: List[_Block]) -> bool:
+    """Whether the last line parsed continues a paragraph (possibly in a nested list)"""
+    if not blocks:
+        return False
+    last = blocks[-1]
+    if last.kind in ("bullet", "ordered"):
+        return _open_paragraph(last.items[-1]["blocks"])
+    return last.kind == "paragraph"
+
+
+def _parse_list(lines: List[str], index: int, column: int) -> Tuple[_Block, int]:
+    """The list starting at lines[index] and the index after it"""
+    first = _list_item(lines[index])
+    block = _Block("ordered" if first["key"] in ".)" else "bullet", first["key"])
+    while index < len(lines):
+        item = _list_item(lines[index])
+        if item is None or item["key"] != block.key:
+            break
+        offset = item["offset"]
+        body = [item["content"]]
+        index += 1
+        lazy = None
+        while index < len(lines):
+            line = lines[index]
+            if not line.strip():
+                if not item["content"] and len(body) == 1:
+                    break  # an item starts with at most one blank line
+                body.append("")
+            elif _indent(line) >= offset:
+                body.append(_dedent(line, offset))
+                lazy = None
+            elif not body[-1] or _starts_block(line) or (_list_item(line) or {}).get("key") == block.key:
+                break
+            else:
+                # Lazy continuation, only of an open paragraph
+                if lazy is None:
+                    lazy = _open_paragraph(_parse_blocks(body))
+                if not lazy:
+                    break
+                body.append(line)
+            index += 1
+
+        trailing = len(body) - len(_strip_blank(body))
+        body = _strip_blank(body)
+        follows = index < len(lines) and (_list_item(lines[index]) or {}).get("key") == block.key
+        loose = bool(SPREAD.search("\n".join(body))) or bool(trailing and follows)
+        block.items.append({"number": item["number"], "blocks": _parse_blocks(body, column + offset),
+                            "loose": loose, "spaces": item["spaces"],
+                            "column": column + offset if item["content"] else -1})
+        block.loose = block.loose or loose
+    return block, index
+
+
+def _strip_blank(lines: List[str]) -> List[str]:
+    end = len(lines)
+    while end and not lines[end - 1].strip():
+        end -= 1
+    return lines[:end]
+
+
+def _parse_blocks(lines: List[str], column: int = 0) -> List[_Block]:
+    """Blocks of lines whose container indentation is already removed; column is where they start"""
+    blocks: List[_Block] = []
+    paragraph: Optional[_Block] = None
+    index = 0
+
+    while index < len(lines):
+        line = lines[index]
+        if not line.strip():
+            paragraph = None
+            index += 1
+            continue
+
+        if paragraph is not None:
+            underline = SETEXT_UNDERLINE.match(line)
+            if underline:
+                paragraph.kind = "heading"
+                paragraph.level = 1 if underline.group(1)[0] == "=" else 2
+                paragraph.lines = [" ".join(paragraph.lines)]
+                paragraph = None
+                index += 1
+                continue
+            if not _starts_block(line):
+                paragraph.lines.append(line)
+                index += 1
+                continue
+            paragraph = None
+
+        fence = _fence(line)
+        heading = ATX_HEADING.match(line)
+        if _indent(line) >= 4:
+            code = _Block("code")
+            while index < len(lines) and (_indent(lines[index]) >= 4 or not lines[index].strip()):
+                code.lines.append(_dedent(lines[index], 4))
+                index += 1
+            code.lines = _strip_blank(code.lines)
+            blocks.append(code)
+        elif fence:
+            code = _Block("fence", fence.group(3))
+            closing = re.compile(r"^ {0,3}%s{%d,}[ \t]*$" % (re.escape(fence.group(2)[0]), len(fence.group(2))))
+            index += 1
+            while index < len(lines) and not closing.match(lines[index]):
+                code.lines.append(_dedent(lines[index], len(fence.group(1))))
+                index += 1
+            index += 1
+            blocks.append(code)
+        elif heading:
+            block = _Block("heading")
+            block.level = len(heading.group(1))
+            block.lines.append(heading.group(2) or "")
+            blocks.append(block)
+            index += 1
+        elif THEMATIC_BREAK.match(line):
+            blocks.append(_Block("break"))
+            index += 1
+        elif _list_item(line):
+            block, index = _parse_list(lines, index, column)
+            blocks.append(block)
+        else:
+            paragraph = _Block("paragraph")
+            paragraph.lines.append(line)
+            blocks.append(paragraph)
+            index += 1
+    return blocks
+
+
+def _has_indented_code(blocks: List[_Block]) -> bool:
+    return any(block.kind == "code" or any(_has_indented_code(item["blocks"]) for item in block.items)
+               for block in blocks)
+
+
+def _aligned(block: _Block) -> bool:
+    """Whether an ordered list lines its content up to the tab width (2), as Prettier checks it"""
+    if block.kind != "ordered":
+        return True
+    first = block.items[0]
+    if first["spaces"] > 1:
+        return True
+    if first["column"] < 0:
+        return False
+    if len(block.items) == 1:
+        return first["column"] % 2 == 0
+    second = block.items[1]
+    if second["column"] != first["column"]:
+        return False
+    return first["column"] % 2 == 0 or second["spaces"] > 1
+
+
+def _render_list(block: _Block, sibling: int, aligned: bool) -> str:
+    aligned = aligned and _aligned(block)
+    pad = aligned or _has_indented_code([block])
+    numbers = [item["number"] for item in block.items]
+    if len(numbers) > 2 and numbers[0] == 0:
+        same_number = numbers[1] == 1 and numbers[2] == 1
+    else:
+        same_number = len(numbers) > 1 and numbers[1] == 1
+    items = []
+    for index, item in enumerate(block.items):
+        if block.kind == "ordered":
+            number = numbers[0] if index == 0 else 1 if same_number else numbers[0] + index
+            marker = f"{number}{'.' if sibling % 2 == 0 else ')'} "
+        else:
+            marker = ("-" if sibling % 2 == 0 else "*") + " "
+        if pad:
+            marker += " " * (len(marker) % 2)
+        indent = " " * len(marker)
+        lines = _render_blocks(item["blocks"], item["loose"], sibling, aligned).split("\n")
+        items.append((marker + lines[0]).rstrip() + "".join("\n" + indent + line if line else "\n"
+                                                            for line in lines[1:]))
+    return ("\n\n" if block.loose else "\n").join(items)
+
+
+def _render_fence(block: _Block) -> str:
+    longest = max((len(run) for line in block.lines for run in re.findall(r"`+", line)), default=0)
+    fence = "`" * max(3, longest + 1)
+    return "\n".join([fence + " ".join(block.key.split(None, 1))] + block.lines + [fence])
+
+
+def _render_blocks(blocks: List[_Block], loose: bool = True, list_sibling: Optional[int] = None,
+                   aligned: bool = True) -> str:
+    rendered = []
+    sibling = 0
+    previous: Optional[_Block] = None
+    for block in blocks:
+        if block.kind in ("bullet", "ordered"):
+            adjacent = previous is not None and previous.kind == block.kind
+            sibling = sibling + 1 if adjacent else 0
+            text = _render_list(block, sibling, aligned)
+        elif block.kind == "heading":
+            content = _inline(block.lines[0])
+            text = "#" * block.level + (" " + content if content else "")
+        elif block.kind == "code":
+            text = "\n".join("    " + line if line else "" for line in block.lines)
+        elif block.kind == "fence":
+            text = _render_fence(block)
+        elif block.kind == "break":
+            text = "***" if list_sibling is not None and list_sibling % 2 == 0 else "---"
+        else:
+            text = "\n".join(_inline(line) for line in block.lines)
+        if previous is not None:
+            # Indented code right after a list gets an extra line so it does not join the last item
+            extra = "\n" if previous.kind in ("bullet", "ordered") and block.kind == "code" else ""
+            text = ("\n\n" if loose else "\n") + extra + text
+        rendered.append(text)
+        previous = block
+    return "".join(rendered)
+
+
+def format_markdown(text: str) -> str:
+    """
+    Markdown normalized the way Prettier (proseWrap "preserve") prints it:
+    one blank line between blocks and none at either end, ATX headings
+    (setext ones converted) with a single space and no closing hashes,
+    "---" thematic breaks, runs of spaces collapsed, and "-" bullets.
+    Lists nest by indentation and are reindented to their markers; a
+    blank line between any two items puts one between all of them, and
+    ordered lists are numbered as Prettier numbers them (the first number,
+    then all 1 when the second is 1, otherwise counting up). Adjacent
+    lists alternate markers. Indented and fenced code are kept verbatim,
+    fences as backticks. Inline escaping and tables are left as they are.
+    """
+    lines = [line.rstrip() for line in text.replace("\r\n", "\n").replace("\r", "\n").split("\n")]
+    rendered = _render_blocks(_parse_blocks(lines))
+    return rendered + "\n" if rendered else ""
+
+
+class PdfMarkdown:
+    """
+    PDF to formatted Markdown, cached by the PDF's content signature.
+
+    Text comes from PyPDF2, pages split across worker processes; if that
+    fails, pypandoc and then pdfminer convert the whole file. The result
+    is formatted in-process (format_markdown) rather than by starting
+    Prettier through npx per request. Conversions that fall back to
+    placeholder content are not cached.
+    """
+
+    NAMESPACE = "pdf_markdown"
+    VERSION = 2  # bump when extraction or formatting output changes
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self._memory: Dict[str, str] = {}  # used without a backend
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "converted": 0, "failed": 0}
+
+    def convert(self, path: str) -> str:
+        signature = file_signature(path)
+        key = f"v{self.VERSION}:{signature}" if signature else None
+        cached = self._cached(key)
+        if cached is not None:
+            with self._lock:
+                self.stats["hits"] += 1
+            return cached
+
+        markdown = self._extract(path)
+        with self._lock:
+            self.stats["converted" if markdown is not None else "failed"] += 1
+        if markdown is None:
+            return format_markdown(FALLBACK_MARKDOWN)
+        markdown = format_markdown(markdown)
+        self._remember(key, markdown)
+        return markdown
+
+    @staticmethod
+    def _extract(path: str) -> Optional[str]:
+        """Unformatted Markdown, or None when every extractor fails"""
+        try:
+            return text_to_markdown("\n\n".join(extract_pages(path)))
+        except ImportError:
+            logger.info("PyPDF2 not available, trying alternative method...")
+        except Exception as e:
+            logger.warning(f"Error extracting with PyPDF2: {e}")
+
+        try:
+            import pypandoc
+            return pypandoc.convert_file(path, "markdown")
+        except ImportError:
+            logger.info("pypandoc not available, trying another method...")
+        except Exception as e:
+            logger.warning(f"Error converting with pypandoc: {e}")
+
+        try:
+            from pdfminer.high_level import extract_text
+            return extract_text(path)
+        except ImportError:
+            logger.info("pdfminer not available")
+        except Exception as e:
+            logger.warning(f"Error extracting with pdfminer: {e}")
+        return None
+
+    def _cached(self, key: Optional[str]) -> Optional[str]:
+        if key is None:
+            return None
+        if self.backend is None:
+            return self._memory.get(key)
+        try:
+            raw = self.backend.get(self.NAMESPACE, key)
+        except Exception as e:
+            logger.warning(f"PDF markdown cache unavailable: {e}")
+            return None
+        return raw.decode("utf-8") if raw is not None else None
+
+    def _remember(self, key: Optional[str], markdown: str):
+        if key is None:
+            return
+        if self.backend is None:
+            self._memory[key] = markdown
+            return
+        try:
+            self.backend.put(self.NAMESPACE, key, markdown.encode("utf-8"))
+        except Exception as e:
+            logger.warning(f"PDF markdown cache unavailable: {e}")
+
+
+# Global converter (results shared through the host cache when it is enabled)
+pdf_markdown = PdfMarkdown(shared_cache)
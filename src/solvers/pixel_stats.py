@@ -0,0 +1,82 @@
+"""
+Pixel Stats
+Whole-array colour-space channels (HLS/HSV) that match colorsys, tiled for large images
+"""
+from typing import Callable, Iterator, Tuple
+
+import numpy as np
+
+# Rows converted at a time; float64 temporaries stay around TILE_PIXELS * 8 bytes each
+TILE_PIXELS = 1 << 20
+
+
+def rgb_array(image) -> np.ndarray:
+    """
+    8-bit RGB pixels (H x W x 3) of a PIL image or array: grayscale is
+    replicated to three channels and alpha is dropped.
+    """
+    pixels = np.asarray(image)
+    if pixels.ndim == 2:
+        return np.repeat(pixels[:, :, np.newaxis], 3, axis=2)
+    return pixels[:, :, :3]
+
+
+def tiles(rgb: np.ndarray, tile_pixels: int = TILE_PIXELS) -> Iterator[np.ndarray]:
+    """Bands of whole rows holding about tile_pixels pixels each"""
+    rows = max(1, tile_pixels // max(1, rgb.shape[1]))
+    for start in range(0, rgb.shape[0], rows):
+        yield rgb[start:start + rows]
+
+
+def _extremes(rgb: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-pixel max and min channel scaled to 0..1, as colorsys sees them"""
+    # Scaling by 1/255 is monotonic, so max/min of the raw channels then
+    # dividing gives exactly max/min of the divided channels
+    return rgb.max(axis=2) / 255.0, rgb.min(axis=2) / 255.0
+
+
+def lightness(rgb: np.ndarray) -> np.ndarray:
+    """HLS lightness, (max + min) / 2, identical to colorsys.rgb_to_hls(...)[1]"""
+    maxc, minc = _extremes(rgb)
+    return (maxc + minc) / 2.0
+
+
+def value(rgb: np.ndarray) -> np.ndarray:
+    """HSV value, identical to colorsys.rgb_to_hsv(...)[2]"""
+    return rgb.max(axis=2) / 255.0
+
+
+def _hue(channels: np.ndarray, maxc: np.ndarray, rangec: np.ndarray) -> np.ndarray:
+    r, g, b = (channels[:, :, i] for i in range(3))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rc, gc, bc = ((maxc - c) / rangec for c in (r, g, b))
+    hue = np.where(r == maxc, bc - gc, np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc))
+    return np.where(rangec == 0, 0.0, (hue / 6.0) % 1.0)
+
+
+def hls(rgb: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Hue, lightness and saturation arrays, element-wise equal to colorsys.rgb_to_hls"""
+    channels = rgb / 255.0
+    maxc, minc = _extremes(rgb)
+    sumc, rangec = maxc + minc, maxc - minc
+    light = sumc / 2.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        saturation = np.where(light <= 0.5, rangec / sumc, rangec / (2.0 - maxc - minc))
+    saturation = np.where(rangec == 0, 0.0, saturation)
+    return _hue(channels, maxc, rangec), light, saturation
+
+
+def hsv(rgb: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Hue, saturation and value arrays, element-wise equal to colorsys.rgb_to_hsv"""
+    channels = rgb / 255.0
+    maxc, minc = _extremes(rgb)
+    rangec = maxc - minc
+    with np.errstate(divide="ignore", invalid="ignore"):
+        saturation = np.where(rangec == 0, 0.0, rangec / maxc)
+    return _hue(channels, maxc, rangec), saturation, maxc
+
+
+def count_where(rgb: np.ndarray, channel: Callable[[np.ndarray], np.ndarray],
+                predicate: Callable[[np.ndarray], np.ndarray], tile_pixels: int = TILE_PIXELS) -> int:
+    """Pixels whose channel value satisfies predicate, converting one tile at a time"""
+    return sum(int(np.count_nonzero(predicate(channel(tile)))) for tile in tiles(rgb, tile_pixels))
@@ -0,0 +1,47 @@
+"""
+Worker Pool
+Process-pool context, worker counts and PDF page counts shared by the parallel solver helpers
+"""
+import logging
+import multiprocessing
+import os
+from typing import Optional
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def pool_context():
+    """Start method for solver process pools (as the solver executor: clean forks, or spawn elsewhere)"""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def usable_cpus() -> int:
+    """Cores this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def extract_workers(pages: int) -> int:
+    """Processes to extract this many PDF pages with"""
+    workers = settings.PDF_EXTRACT_WORKERS
+    if workers <= 0:
+        workers = usable_cpus()
+    return max(1, min(workers, pages))
+
+
+def page_count(path: str) -> Optional[int]:
+    """Pages in the PDF, or None when no reader is installed or the file is unreadable"""
+    try:
+        from PyPDF2 import PdfReader
+    except ImportError:
+        return None
+    try:
+        return len(PdfReader(path).pages)
+    except Exception as e:
+        logger.warning(f"Could not count pages of {path}: {e}")
+        return None
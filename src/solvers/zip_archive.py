@@ -0,0 +1,137 @@
+"""
+Zip Archive
+Read ZIP members in place (listings, bytes, lines) without extracting to disk
+"""
+import io
+import os
+import threading
+import zipfile
+from collections import OrderedDict
+from datetime import datetime
+from typing import BinaryIO, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+
+class Member(NamedTuple):
+    """A regular file in an archive"""
+    name: str           # path inside the archive
+    size: int           # uncompressed bytes
+    modified: datetime  # wall-clock time recorded in the archive
+    crc: int
+
+    @property
+    def basename(self) -> str:
+        return self.name.rsplit("/", 1)[-1]
+
+    @property
+    def directory(self) -> str:
+        return self.name.rpartition("/")[0]
+
+
+_listings: "OrderedDict[tuple, List[Member]]" = OrderedDict()
+_listings_lock = threading.Lock()
+MAX_CACHED_LISTINGS = 32
+
+
+class ZipArchive:
+    """
+    A ZIP file read in place.
+
+    ``members`` lists the regular files (a later duplicate of a name wins,
+    as with ``extractall``); listings are cached by content signature, or
+    by path, size and mtime when no signature is given. Member data is
+    streamed straight from the archive, and ``flattened``/``renamed``
+    model ``mv`` and ``rename`` as name mappings, so nothing is written
+    to disk.
+    """
+
+    def __init__(self, path: str, signature: Optional[str] = None):
+        self.path = path
+        self.signature = signature
+        self._zip: Optional[zipfile.ZipFile] = None
+
+    def __enter__(self) -> "ZipArchive":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+    @property
+    def zip(self) -> zipfile.ZipFile:
+        if self._zip is None:
+            self._zip = zipfile.ZipFile(self.path)
+        return self._zip
+
+    def _listing_key(self) -> tuple:
+        if self.signature:
+            return ("signature", self.signature)
+        stat = os.stat(self.path)
+        return (os.path.realpath(self.path), stat.st_size, stat.st_mtime_ns)
+
+    @property
+    def members(self) -> List[Member]:
+        key = self._listing_key()
+        with _listings_lock:
+            listing = _listings.get(key)
+            if listing is not None:
+                _listings.move_to_end(key)
+                return listing
+
+        by_name = {}
+        for info in self.zip.infolist():
+            if not info.is_dir():
+                by_name.pop(info.filename, None)
+                by_name[info.filename] = Member(info.filename, info.file_size, datetime(*info.date_time), info.CRC)
+        listing = list(by_name.values())
+
+        with _listings_lock:
+            _listings[key] = listing
+            while len(_listings) > MAX_CACHED_LISTINGS:
+                _listings.popitem(last=False)
+        return listing
+
+    def top_level(self) -> List[Member]:
+        """Files in the archive root, sorted by name (``ls`` after extracting)"""
+        return sorted((m for m in self.members if "/" not in m.name), key=lambda m: m.name)
+
+    def member(self, name: str) -> Optional[Member]:
+        return next((m for m in self.members if m.name == name), None)
+
+    def open(self, name: str) -> BinaryIO:
+        return self.zip.open(name)
+
+    def read(self, name: str) -> bytes:
+        return self.zip.read(name)
+
+    def lines(self, name: str, encoding: Optional[str] = None, errors: Optional[str] = None) -> Iterator[str]:
+        """Text lines of a member, as iterating over the extracted file would give them"""
+        with self.zip.open(name) as raw:
+            yield from io.TextIOWrapper(raw, encoding=encoding, errors=errors)
+
+    def text(self, name: str, encoding: Optional[str] = None, errors: Optional[str] = None) -> str:
+        with self.zip.open(name) as raw:
+            return io.TextIOWrapper(raw, encoding=encoding, errors=errors).read()
+
+    def flattened(self) -> Dict[str, Member]:
+        """
+        Every file moved into one directory, as {new name: member}. Files
+        are visited top-down like ``os.walk``; a name already taken becomes
+        ``<stem>_from_<parent dir><ext>``.
+        """
+        flat: Dict[str, Member] = {}
+        for member in sorted(self.members, key=lambda m: m.name.count("/")):
+            name = member.basename
+            if name in flat:
+                stem, ext = os.path.splitext(name)
+                name = f"{stem}_from_{os.path.basename(member.directory)}{ext}"
+            flat[name] = member
+        return flat
+
+    @staticmethod
+    def renamed(files: Dict[str, Member], rename: Callable[[str], str]) -> Dict[str, Member]:
+        """Apply a name transformation to a {name: member} mapping"""
+        return {rename(name): member for name, member in files.items()}
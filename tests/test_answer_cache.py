@@ -0,0 +1,74 @@
+import time
+
+from src.core.answer_cache import AnswerCache, normalize_parameters
+
+SOLVER = "E://data science tool//GA1//seventh.py"
+
+
+def make_cache(**kwargs):
+    options = dict(max_entries=3, ttl=60, policy={}, enabled=True)
+    options.update(kwargs)
+    return AnswerCache(**options)
+
+
+def upload(path, signature):
+    return {"path": path, "exists": True, "is_remote": False, "content_signature": signature}
+
+
+def test_key_ignores_upload_path_and_whitespace_but_not_content():
+    cache = make_cache()
+    q1 = "Sum the column. The file data.csv is located at /tmp/uploads/20240101_1_data.csv"
+    q2 = "Sum the   column. The file data.csv is located at /tmp/uploads/20240302_9_data.csv"
+    key1 = cache.key_for(SOLVER, q1, upload("/tmp/uploads/20240101_1_data.csv", "abc"))
+    key2 = cache.key_for(SOLVER, q2, upload("/tmp/uploads/20240302_9_data.csv", "abc"))
+    key3 = cache.key_for(SOLVER, q2, upload("/tmp/uploads/20240302_9_data.csv", "def"))
+    assert key1 == key2
+    assert key1 != key3
+    assert cache.key_for("E://data science tool//GA1//eighth.py", q1, None) != cache.key_for(SOLVER, q1, None)
+
+
+def test_hits_misses_and_lru_eviction():
+    cache = make_cache()
+    keys = [cache.key_for(SOLVER, f"question {i}") for i in range(4)]
+    assert cache.get(keys[0]) is None
+    for i in range(3):
+        assert cache.put(keys[i], f"answer {i}", SOLVER)
+    assert cache.get(keys[0]) == "answer 0"  # refreshes keys[0]
+    cache.put(keys[3], "answer 3", SOLVER)
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == "answer 0"
+    assert cache.stats["hits"] == 2
+    assert cache.stats["misses"] == 2
+    assert cache.stats["evictions"] == 1
+
+
+def test_ttl_expiry_and_per_solver_policy():
+    cache = make_cache(ttl=0.05, policy={"GA2/eighth.py": {"cache": False}, "GA4/sixth.py": {"ttl": 60}})
+    key = cache.key_for(SOLVER, "q")
+    cache.put(key, "42", SOLVER)
+    time.sleep(0.1)
+    assert cache.get(key) is None
+    assert cache.stats["expirations"] == 1
+
+    assert cache.key_for("E://data science tool//GA2//eighth.py", "push image") is None
+    assert cache.stats["bypassed"] == 1
+    live = "E://data science tool//GA4//sixth.py"
+    live_key = cache.key_for(live, "hn post")
+    cache.put(live_key, "https://news.ycombinator.com/item?id=1", live)
+    time.sleep(0.1)
+    assert cache.get(live_key) == "https://news.ycombinator.com/item?id=1"
+
+
+def test_failures_are_not_stored():
+    cache = make_cache()
+    key = cache.key_for(SOLVER, "q")
+    assert not cache.put(key, "Error executing solution: boom", SOLVER)
+    assert not cache.put(key, "", SOLVER)
+    assert cache.put(key, 7, SOLVER)
+    assert cache.get(key) == "7"
+
+
+def test_normalize_parameters():
+    assert normalize_parameters("  a\n b  ", None) == "a b"
+    assert normalize_parameters("see /x/y.zip now", "/x/y.zip") == "see <file> now"
+    assert normalize_parameters(None) == ""
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from src.core import content_signature
+from src.core.content_signature import ContentSignature, file_signature, remember_signature
+from vicky_server import FileManager
+
+
+@pytest.mark.parametrize("full", [False, True])
+@pytest.mark.parametrize("size", [0, 100, 4096, 4097, 10000, 3 * 1024 * 1024 + 5])
+def test_streamed_signature_matches_file(tmp_path, size, full):
+    data = os.urandom(size)
+    path = tmp_path / "input.bin"
+    path.write_bytes(data)
+
+    signature = ContentSignature(full=full)
+    for start in range(0, size, 1500):
+        signature.update(data[start:start + 1500])
+    assert signature.hexdigest() == file_signature(str(path), full=full)
+    if not full:
+        assert signature.hexdigest() == FileManager(base_directory=str(tmp_path))._calculate_content_signature(str(path))
+
+
+def test_signatures_are_memoized_until_the_file_changes(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_bytes(b"a,b\n1,2\n")
+    first = file_signature(str(path))
+    hits = content_signature.stats["hits"]
+    assert file_signature(str(path)) == first
+    assert content_signature.stats["hits"] == hits + 1
+
+    path.write_bytes(b"a,b\n3,4\n")
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+    assert file_signature(str(path)) != first
+    assert file_signature(str(tmp_path)) is None
+    assert file_signature(str(tmp_path / "missing.csv")) is None
+
+
+def test_full_mode_sees_changes_outside_the_sampled_blocks(tmp_path):
+    path = tmp_path / "big.bin"
+    data = bytearray(100000)
+    path.write_bytes(data)
+    sampled, full = file_signature(str(path), full=False), file_signature(str(path), full=True)
+
+    data[50000] = 1
+    path.write_bytes(data)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+    assert file_signature(str(path), full=False) == sampled
+    assert file_signature(str(path), full=True) != full
+
+
+def test_remembered_signature_is_served_without_reading(tmp_path):
+    path = tmp_path / "upload.csv"
+    path.write_bytes(b"x")
+    remember_signature(str(path), "precomputed", full=False)
+    assert file_signature(str(path), full=False) == "precomputed"
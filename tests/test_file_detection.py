@@ -0,0 +1,32 @@
+import vicky_server
+from vicky_server import FileManager
+
+
+def test_upload_marker_wins_over_urls_and_paths(tmp_path):
+    upload = tmp_path / "data.csv"
+    upload.write_text("a,b\n1,2\n")
+    manager = FileManager(base_directory=str(tmp_path))
+    query = f"Sum column b of https://example.org/other.csv. @file {upload} (see also '{tmp_path}/missing.csv')"
+    info = manager.detect_file_from_query(query)
+    assert info["source"] == "upload"
+    assert info["path"] == str(upload)
+    assert info["content_signature"]
+
+
+def test_urls_and_example_placeholders():
+    manager = FileManager(base_directory="/nonexistent")
+    info = manager.detect_file_from_query("Fetch https://raw.githubusercontent.com/u/r/main/q.json please")
+    assert info["is_remote"] and info["url_type"] == "github"
+    assert info["extension"] == ".json"
+
+    info = manager.detect_file_from_query("Deploy to https://.your-app.vercel.app and call it")
+    assert not info["exists"]
+
+
+def test_query_paths_are_checked_for_existence(tmp_path, monkeypatch):
+    monkeypatch.setattr(vicky_server.upload_index, "latest", lambda extensions: None)
+    report = tmp_path / "report.pdf"
+    report.write_bytes(b"%PDF-1.4")
+    manager = FileManager(base_directory=str(tmp_path))
+    assert manager.detect_file_from_query(f"Count the tables in {report} on page 3")["path"] == str(report)
+    assert manager._extract_file_references(f"Count the tables in {tmp_path}/gone.pdf") == []
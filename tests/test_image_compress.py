@@ -0,0 +1,96 @@
+import io
+
+import numpy as np
+from PIL import Image
+
+from src.solvers.image_compress import ImageCompressor, exact_palette
+
+
+def _save(tmp_path, pixels, name="image.png"):
+    path = tmp_path / name
+    Image.fromarray(pixels).save(path, format="PNG", compress_level=0)
+    return str(path)
+
+
+def _decoded(data):
+    with Image.open(io.BytesIO(data)) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+def test_exact_palette_round_trips_and_rejects_many_colours():
+    rng = np.random.default_rng(0)
+    few = rng.choice(np.array([[0, 0, 0], [255, 0, 0], [12, 200, 34]], dtype=np.uint8), size=(20, 30))
+    paletted = exact_palette(Image.fromarray(few))
+    assert paletted.mode == "P"
+    assert np.array_equal(np.asarray(paletted.convert("RGB")), few)
+
+    many = rng.integers(0, 256, size=(40, 40, 3), dtype=np.uint8)
+    assert exact_palette(Image.fromarray(many)) is None
+
+
+def test_lossless_result_decodes_to_the_original_pixels(tmp_path):
+    stripes = np.zeros((200, 200, 3), dtype=np.uint8)
+    stripes[::4] = [30, 90, 200]
+    stripes[:, ::7] = [250, 250, 0]
+    path = _save(tmp_path, stripes)
+
+    compressor = ImageCompressor()
+    result = compressor.compress(path, 1500)
+    assert result is not None and result.lossless
+    assert len(result.data) <= 1500
+    assert np.array_equal(_decoded(result.data), stripes)
+
+
+def test_png_that_fits_beats_smaller_webp(tmp_path):
+    y, x = np.mgrid[0:128, 0:128]
+    gradient = np.stack([x * 2, y * 2, x + y], axis=-1).astype(np.uint8)
+    path = _save(tmp_path, gradient)
+
+    # Lossless WebP is about a quarter of the size of the best PNG here
+    fits = ImageCompressor().compress(path, 1500)
+    assert fits.format == "PNG" and fits.lossless
+    assert np.array_equal(_decoded(fits.data), gradient)
+
+    # Only when no PNG of the pixels fits is WebP used
+    tight = ImageCompressor().compress(path, 150)
+    assert tight.format == "WEBP" and tight.lossless and len(tight.data) <= 150
+    assert np.array_equal(_decoded(tight.data), gradient)
+
+
+def test_lossy_fallback_fits_and_prefers_most_colours(tmp_path):
+    noise = np.random.default_rng(1).integers(0, 256, size=(64, 64, 3), dtype=np.uint8)
+    path = _save(tmp_path, noise)
+
+    compressor = ImageCompressor()
+    result = compressor.compress(path, 1500)
+    assert result is not None and not result.lossless
+    assert len(result.data) <= 1500
+    # Binary search: far fewer encodes than one per palette size and scale
+    assert compressor.stats["encodes"] < 6 * 8
+
+
+def test_results_are_cached_by_content(tmp_path):
+    stripes = np.zeros((100, 100, 3), dtype=np.uint8)
+    stripes[::2] = 255
+    first = _save(tmp_path, stripes, "first.png")
+    second = _save(tmp_path, stripes, "second.png")
+
+    compressor = ImageCompressor()
+    result = compressor.compress(first, 1500)
+    encodes = compressor.stats["encodes"]
+    assert compressor.compress(second, 1500) == result
+    assert compressor.stats["encodes"] == encodes and compressor.stats["hits"] == 1
+
+
+def test_shared_cache_backend(tmp_path):
+    from src.core.shared_cache import SharedCache
+
+    stripes = np.zeros((100, 100, 3), dtype=np.uint8)
+    stripes[:, ::3] = [10, 20, 30]
+    path = _save(tmp_path, stripes)
+    backend = SharedCache(str(tmp_path / "cache"))
+
+    result = ImageCompressor(backend).compress(path, 1500)
+    other = ImageCompressor(backend)
+    assert other.compress(path, 1500) == result
+    assert other.stats["encodes"] == 0
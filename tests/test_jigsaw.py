@@ -0,0 +1,55 @@
+import numpy as np
+from PIL import Image
+
+from src.solvers.jigsaw import parse_mapping, unscramble, unscramble_image
+
+
+def _paste_reference(image, mapping, grid):
+    """The crop-and-paste loop the solver used to run"""
+    rows, cols = grid
+    width, height = image.width // cols, image.height // rows
+    result = Image.new(image.mode, image.size)
+    for orig_row, orig_col, scrambled_row, scrambled_col in mapping:
+        piece = image.crop((scrambled_col * width, scrambled_row * height,
+                            (scrambled_col + 1) * width, (scrambled_row + 1) * height))
+        result.paste(piece, (orig_col * width, orig_row * height))
+    return result
+
+
+def _permutation(rows, cols, seed):
+    cells = [(r, c) for r in range(rows) for c in range(cols)]
+    shuffled = np.random.default_rng(seed).permutation(len(cells))
+    return [cells[i] + cells[j] for i, j in enumerate(shuffled)]
+
+
+def test_parse_mapping():
+    table = ("\n2\t1\t0\t0\n1  1  0  1\nnot a row\n4 1 0 2 extra\n12 3\n")
+    assert parse_mapping(table).tolist() == [[2, 1, 0, 0], [1, 1, 0, 1], [4, 1, 0, 2]]
+    assert parse_mapping("").shape == (0, 4)
+
+
+def test_matches_crop_and_paste_for_any_grid_and_mode():
+    rng = np.random.default_rng(0)
+    for (rows, cols), (height, width), mode in (((5, 5), (500, 500), "RGB"), ((3, 7), (101, 150), "RGBA"),
+                                                ((4, 2), (37, 23), "L")):
+        channels = {"RGB": (3,), "RGBA": (4,), "L": ()}[mode]
+        image = Image.fromarray(rng.integers(0, 256, size=(height, width, *channels), dtype=np.uint8), mode)
+        mapping = _permutation(rows, cols, seed=rows * cols)
+        expected = _paste_reference(image, mapping, (rows, cols))
+        assert np.array_equal(np.asarray(unscramble_image(image, mapping, (rows, cols))), np.asarray(expected))
+
+
+def test_partial_and_out_of_grid_mappings():
+    pixels = np.arange(8 * 8, dtype=np.uint8).reshape(8, 8)
+    result = unscramble(pixels, [(0, 0, 1, 1), (5, 0, 0, 0)], (2, 2))
+    assert np.array_equal(result[:4, :4], pixels[4:, 4:])
+    assert not result[4:].any() and not result[:, 4:].any()
+
+
+def test_palette_images_keep_their_palette():
+    image = Image.fromarray(np.random.default_rng(1).integers(0, 4, size=(20, 20), dtype=np.uint8), "P")
+    image.putpalette([0, 0, 0, 255, 0, 0, 0, 255, 0, 0, 0, 255])
+    mapping = _permutation(2, 2, seed=3)
+    result = unscramble_image(image, mapping, (2, 2))
+    assert result.mode == "P" and result.getpalette() == image.getpalette()
+    assert np.array_equal(np.asarray(result), np.asarray(_paste_reference(image, mapping, (2, 2))))
@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from src.solvers import lazy_input
+from src.solvers.lazy_input import LocalInput
+
+
+def test_lines_are_counted_and_addressed_in_place(tmp_path, monkeypatch):
+    monkeypatch.setattr(lazy_input, "READ_CHARS", 4)
+    path = tmp_path / "a.txt"
+    for content, expected in (("one\ntwo\n\nfour", ["one\n", "two\n", "\n", "four"]),
+                              ("a much longer line\r\nb\r\n", ["a much longer line\n", "b\n"]),
+                              ("", [])):
+        path.write_bytes(content.encode("utf-8"))
+        with LocalInput(str(path)) as text:
+            assert text.line_count == len(expected)
+            assert list(text.lines()) == expected
+            assert [text.line(index) for index in range(len(expected))] == expected
+            with pytest.raises(IndexError):
+                text.line(len(expected))
+
+
+def test_json_items_stream_across_reads(tmp_path, monkeypatch):
+    monkeypatch.setattr(lazy_input, "READ_CHARS", 5)
+    rows = [{"city": "Bei\"jing", "sales": 123456789}, [1.5, None], "é", 0]
+    path = tmp_path / "rows.json"
+    for text in (json.dumps(rows), json.dumps(rows, indent=2), " [ ] "):
+        path.write_text(text, encoding="utf-8")
+        assert list(LocalInput(str(path)).json_items()) == json.loads(text)
+
+    for bad in ("{}", "[1,]", "[1 2]", "[1"):
+        path.write_text(bad)
+        with pytest.raises(json.JSONDecodeError):
+            list(LocalInput(str(path)).json_items())
+
+
+def test_json_keys_skip_string_values(tmp_path):
+    path = tmp_path / "nested.json"
+    path.write_text(json.dumps({"a": {"XF": 1, "b": [{"XF": "XF: no"}, 'say "XF": 2']}, "X\\F": 2}))
+    with LocalInput(str(path)) as document:
+        assert list(document.json_keys()) == ["a", "XF", "b", "XF", "X\\F"]
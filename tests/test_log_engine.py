@@ -0,0 +1,165 @@
+import gzip
+import os
+import random
+import urllib.parse
+from datetime import date, datetime, timedelta, timezone
+
+from src.core.shared_cache import SharedCache
+from src.solvers.log_engine import LogSnapshots, LogTable, load_log, parse_timestamps
+
+LINE_PATTERN = ('{ip} - - [{day:02d}/May/2024:{hour:02d}:{minute:02d}:{second:02d} {offset}] '
+                '"{method} {url} HTTP/1.1" {status} {size} "-" "{agent}" s-anand.net 1.2.3.4')
+
+
+def make_lines(n, seed=1):
+    rng = random.Random(seed)
+    ips = [f"10.0.{i}.{j}" for i in range(3) for j in range(10)]
+    urls = ["/kannada/", "/kannada/song%20one.mp3", "/kannada", "/telugu/x",
+            "/carnatic/a", "/carnatic", "/carnaticx/", "/blog/"]
+    lines = []
+    for _ in range(n):
+        lines.append(LINE_PATTERN.format(
+            ip=rng.choice(ips), day=rng.randint(1, 31), hour=rng.randint(0, 23),
+            minute=rng.randint(0, 59), second=rng.randint(0, 59),
+            offset=rng.choice(["-0500"] * 4 + ["+0530"]),
+            method=rng.choice(["GET"] * 8 + ["POST", "HEAD"]), url=rng.choice(urls),
+            status=rng.choice([200, 206, 304, 404]), size=rng.choice([str(rng.randint(0, 5000)), "-"]),
+            agent=rng.choice(["Mozilla/5.0", 'Bot \\"quoted\\" agent']),
+        ))
+    lines.insert(3, "garbage line")
+    lines.insert(7, '1.1.1.1 - - [bad time] "GET /kannada/ HTTP/1.1" 200 5 "-" "-" x y')
+    return lines
+
+
+def reference_rows(lines):
+    for line in lines:
+        if line.count('"') < 2:
+            continue
+        parts = line.split('"')
+        head, request, tail = parts[0].split(), parts[1].split(), parts[2].split()
+        try:
+            when = datetime.strptime(line[line.index("[") + 1:line.index("]")], "%d/%b/%Y:%H:%M:%S %z")
+        except ValueError:
+            continue
+        size = int(tail[1]) if tail[1].isdigit() else 0
+        yield head[0], when, request[0], urllib.parse.unquote(request[1]), int(tail[0]), size
+
+
+def write_log(path, lines, compress=False):
+    data = ("\n".join(lines) + "\n").encode("utf-8")
+    with (gzip.open(path, "wb") if compress else open(path, "wb")) as f:
+        f.write(data)
+    return str(path)
+
+
+def test_timestamps_are_parsed_to_utc_with_offsets():
+    epoch, offset, valid = parse_timestamps(["09/May/2024:13:05:59 -0500", "29/Feb/2024:00:00:00 +0530",
+                                             "31/Foo/2024:00:00:00 +0000", "short"])
+    assert valid.tolist() == [True, True, False, False]
+    assert epoch[0] == datetime(2024, 5, 9, 18, 5, 59, tzinfo=timezone.utc).timestamp()
+    assert epoch[1] == datetime(2024, 2, 28, 18, 30, tzinfo=timezone.utc).timestamp()
+    assert offset[:2].tolist() == [-300, 330]
+
+
+def test_weekday_time_window_count_matches_per_line_parse(tmp_path):
+    lines = make_lines(3000)
+    table = LogTable.from_file(write_log(tmp_path / "access.log.gz", lines, compress=True), chunk_bytes=4096)
+    assert len(table) == 3000
+
+    tz = timezone(timedelta(hours=-5))
+    expected = 0
+    for _, when, method, url, status, _ in reference_rows(lines):
+        local = when.astimezone(tz)
+        seconds = local.hour * 3600 + local.minute * 60 + local.second
+        if (method == "GET" and url.startswith("/kannada/") and 200 <= status < 300
+                and local.weekday() == 6 and 5 * 3600 <= seconds < 14 * 3600):
+            expected += 1
+
+    count = table.count(method="GET", path_prefix="/kannada/", weekday=6,
+                        time_range=(5 * 3600, 14 * 3600), tz_minutes=-300)
+    assert count == expected > 0
+
+
+def test_bytes_by_ip_uses_each_rows_own_date_and_exact_day(tmp_path):
+    lines = make_lines(3000, seed=2)
+    table = LogTable.from_file(write_log(tmp_path / "access.log", lines))
+
+    expected = {}
+    for ip, when, _, url, status, size in reference_rows(lines):
+        if (when.date() == date(2024, 5, 9) and (url.startswith("/carnatic/") or url == "/carnatic")
+                and 200 <= status < 300):
+            expected[ip] = expected.get(ip, 0) + size
+
+    totals = table.bytes_by_ip(path_prefix="/carnatic/", include_bare_path=True, day=date(2024, 5, 9))
+    assert {ip: int(total) for ip, total in totals.items()} == expected
+    assert list(totals.index) == list(expected)  # first-seen order, so ties resolve like max()
+    assert totals.idxmax() == max(expected.items(), key=lambda item: item[1])[0]
+
+
+def test_load_log_reuses_table_until_file_changes(tmp_path):
+    path = write_log(tmp_path / "access.log", make_lines(50))
+    first = load_log(path)
+    assert load_log(path) is first
+
+    write_log(path, make_lines(60))
+    os.utime(path, ns=(1, 1))
+    second = load_log(path)
+    assert second is not first
+    assert len(second) == 60
+    assert (second.frame["size"].to_numpy() >= 0).all()
+
+
+def assert_same_table(table, expected):
+    assert len(table) == len(expected)
+    for name in ["ip", "method", "url"]:
+        assert list(table.frame[name].astype(str)) == list(expected.frame[name].astype(str))
+    for name in ["epoch", "offset", "status", "size"]:
+        assert table.frame[name].tolist() == expected.frame[name].tolist()
+
+
+def test_snapshot_is_reused_by_content_signature(tmp_path):
+    path = write_log(tmp_path / "access.log.gz", make_lines(500), compress=True)
+    snapshots = LogSnapshots(SharedCache(str(tmp_path / "cache")))
+    first = snapshots.table_for(path, "sig-1")
+
+    # A fresh store (another worker or a restart) reads the snapshot back
+    again = LogSnapshots(SharedCache(str(tmp_path / "cache")))
+    assert_same_table(again.table_for(path, "sig-1"), first)
+    assert snapshots.stats["full"] == 1
+    assert again.stats == {"hits": 1, "incremental": 0, "full": 0}
+
+
+def test_appended_logs_parse_only_the_tail(tmp_path):
+    lines = make_lines(3000, seed=3)
+    snapshots = LogSnapshots(SharedCache(str(tmp_path / "cache")))
+
+    plain = tmp_path / "access.log"
+    with open(plain, "w") as f:
+        f.write("\n".join(lines[:250]) + "\n" + lines[250][:40])  # ends mid-line
+    assert_same_table(snapshots.table_for(str(plain), "plain-1"), LogTable.from_file(str(plain)))
+    with open(plain, "a") as f:
+        f.write(lines[250][40:] + "\n" + "\n".join(lines[251:400]) + "\n")
+    appended = snapshots.table_for(str(plain), "plain-2")
+    assert_same_table(appended, LogTable.from_file(str(plain)))
+
+    compressed = tmp_path / "access.log.gz"
+    write_log(compressed, lines[:2000], compress=True)
+    snapshots.table_for(str(compressed), "gz-1")
+    with open(compressed, "ab") as f:
+        f.write(gzip.compress(("\n".join(lines[2000:]) + "\n").encode("utf-8")))
+    appended = snapshots.table_for(str(compressed), "gz-2")
+    assert_same_table(appended, LogTable.from_file(str(compressed)))
+    assert snapshots.stats == {"hits": 0, "incremental": 2, "full": 2}
+
+    # Rewritten content does not extend the snapshot, so it is parsed in full
+    write_log(plain, make_lines(300, seed=4))
+    assert_same_table(snapshots.table_for(str(plain), "plain-3"), LogTable.from_file(str(plain)))
+    assert snapshots.stats["full"] == 3
+
+
+def test_parallel_parse_matches_serial(tmp_path):
+    path = write_log(tmp_path / "access.log.gz", make_lines(3000, seed=5), compress=True)
+    serial = LogTable.from_file(path, chunk_bytes=8192, workers=1)
+    parallel = LogTable.from_file(path, chunk_bytes=8192, workers=2)
+    assert_same_table(parallel, serial)
+    assert parallel.bytes_by_ip(path_prefix="/carnatic/").to_dict() == serial.bytes_by_ip(path_prefix="/carnatic/").to_dict()
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+from src.core.shared_cache import SharedCache
+from src.solvers import marks_table
+from src.solvers.marks_table import MarksSnapshots, MarksTable, extract_tables, load_marks, normalize_tables
+
+SUBJECT_ROW = ["Maths", "Physics", "English", "Economics", "Biology"]
+
+
+def camelot_table(group, rows):
+    """Table as camelot returns it: positional columns, title and header in the cells"""
+    return pd.DataFrame([[f"Student Marks - Group {group}", "", "", "", ""], SUBJECT_ROW]
+                        + [[str(mark) for mark in row] for row in rows])
+
+
+def test_normalize_reads_titles_headers_and_positional_tables():
+    tables = [
+        camelot_table(3, [[70, 80, 60, 65, 90], [50, "-", 70, 75, 80]]),
+        # tabula style: subject names already the columns, no title -> current group, then advance
+        pd.DataFrame([[90, 91, 92, 93, 94]], columns=SUBJECT_ROW),
+        pd.DataFrame(),
+        # no names at all -> read positionally
+        pd.DataFrame([["1", "2", "3", "4", "5", "extra"]]),
+    ]
+    frame = normalize_tables(tables)
+    assert list(frame.columns) == SUBJECT_ROW + ["Group"]
+    assert frame["Group"].tolist() == [3, 3, 3, 4]
+    assert frame["Maths"].tolist() == [70.0, 50.0, 90.0, 1.0]
+    assert np.isnan(frame["Physics"][1])
+    assert frame["Biology"].dtype == np.float64
+
+
+def test_select_matches_every_comparison():
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({subject: rng.integers(40, 100, 300).astype(float) for subject in SUBJECT_ROW})
+    frame["Group"] = rng.integers(1, 40, 300)
+    table = MarksTable(frame)
+    for comparison, expected in ((">=", frame["Maths"] >= 69), (">", frame["Maths"] > 69),
+                                 ("<=", frame["Maths"] <= 69), ("<", frame["Maths"] < 69),
+                                 ("==", frame["Maths"] == 69), ("?", frame["Maths"] >= 69)):
+        in_groups = (frame["Group"] >= 5) & (frame["Group"] <= 25)
+        total, count = table.total("Physics", "Maths", comparison, 69, 5, 25)
+        assert total == frame[expected & in_groups]["Physics"].sum()
+        assert count == int((expected & in_groups).sum())
+
+
+def test_pages_are_extracted_in_document_order(monkeypatch):
+    monkeypatch.setattr(marks_table, "page_count", lambda path: 3)
+    monkeypatch.setattr(marks_table, "extract_page",
+                        lambda job: [pd.DataFrame({"page": [job[1]]})] if job[1] != "2" else [])
+    tables = extract_tables("marks.pdf", workers=1)
+    assert [table["page"][0] for table in tables] == ["1", "3"]
+
+
+def test_extraction_is_cached_in_process_and_in_snapshots(tmp_path, monkeypatch):
+    pdf = tmp_path / "marks.pdf"
+    pdf.write_bytes(b"%PDF-1.4 stand-in")
+    calls = []
+
+    def extract(path, workers=None):
+        calls.append(path)
+        return [camelot_table(1, [[70, 80, 60, 65, 90]]), camelot_table(2, [[40, 50, 60, 70, 80]])]
+
+    monkeypatch.setattr(marks_table, "extract_tables", extract)
+    monkeypatch.setattr(marks_table, "_tables", type(marks_table._tables)())
+    snapshots = MarksSnapshots(SharedCache(str(tmp_path / "cache")))
+    monkeypatch.setattr(marks_table, "marks_snapshots", snapshots)
+
+    first = load_marks(str(pdf), "sig")
+    assert load_marks(str(pdf), "sig") is first
+    assert len(calls) == 1
+
+    # Another worker (empty in-process cache) loads the snapshot instead of extracting
+    monkeypatch.setattr(marks_table, "_tables", type(marks_table._tables)())
+    again = load_marks(str(pdf), "sig")
+    assert len(calls) == 1 and snapshots.stats == {"hits": 1, "extracted": 1}
+    pd.testing.assert_frame_equal(again.frame, first.frame)
+    assert again.total("Physics", "Maths", ">=", 50, 1, 2) == (80.0, 1)
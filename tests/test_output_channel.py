@@ -0,0 +1,67 @@
+import asyncio
+import threading
+
+from src.core.output_channel import capture_output, discard_output, progress
+
+
+def chatty(name, lines, barrier=None):
+    for i in range(lines):
+        print(f"{name} {i}")
+        if barrier is not None and i == 0:
+            barrier.wait()
+
+
+def test_threads_capture_only_their_own_output():
+    barrier = threading.Barrier(4)
+    results = {}
+
+    def invoke(name):
+        with capture_output() as output:
+            chatty(name, 200, barrier)
+        results[name] = output.getvalue()
+
+    threads = [threading.Thread(target=invoke, args=(f"t{n}",)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for name, text in results.items():
+        assert text == "".join(f"{name} {i}\n" for i in range(200))
+
+
+def test_tasks_capture_only_their_own_output():
+    async def invoke(name):
+        with capture_output() as output:
+            for i in range(50):
+                print(f"{name} {i}")
+                await asyncio.sleep(0)
+        return output.getvalue()
+
+    async def scenario():
+        return await asyncio.gather(invoke("a"), invoke("b"))
+
+    a, b = asyncio.run(scenario())
+    assert a == "".join(f"a {i}\n" for i in range(50))
+    assert b == "".join(f"b {i}\n" for i in range(50))
+
+
+def test_nested_capture_and_discard():
+    with capture_output() as outer:
+        print("outer")
+        with discard_output():
+            print("dropped")
+        with capture_output() as inner:
+            print("inner")
+        print("outer again")
+    assert outer.getvalue() == "outer\nouter again\n"
+    assert inner.getvalue() == "inner\n"
+
+
+def test_progress_is_off_unless_verbose():
+    with capture_output() as quiet:
+        progress("Processing line 50000...")
+    with capture_output(verbose=True) as loud:
+        progress("Processing line 50000...")
+    assert quiet.getvalue() == ""
+    assert loud.getvalue() == "Processing line 50000...\n"
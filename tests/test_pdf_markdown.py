@@ -0,0 +1,90 @@
+from src.core.shared_cache import SharedCache
+from src.solvers import pdf_markdown as module
+from src.solvers.pdf_markdown import PdfMarkdown, extract_pages, format_markdown, text_to_markdown
+
+
+def test_format_spacing_headings_and_code():
+    text = "\n\n#   Title  ##\nSome   text here\ncontinued\n\n\n\n    code  kept\n\n    more\nEnd   "
+    assert format_markdown(text) == "# Title\n\nSome text here\ncontinued\n\n    code  kept\n\n    more\n\nEnd\n"
+
+
+def test_format_lists():
+    # A blank line between any two items makes the whole list loose
+    text = "Text\n* one\n+ two\nlazy\n\n3. a\n3. b\n\n1. x\n1. y\nPara\n1) z"
+    assert format_markdown(text) == (
+        "Text\n\n- one\n\n* two\n  lazy\n\n"
+        "3. a\n\n4. b\n\n5. x\n\n6. y\n   Para\n\n1) z\n"
+    )
+    # Git-diff friendly lists keep one number; a 2. cannot interrupt a paragraph
+    assert format_markdown("1. a\n1. b\nnote\n2. still note") == "1. a\n1. b\n   note\n1. still note\n"
+    assert format_markdown("note\n2. still note") == "note\n2. still note\n"
+
+
+def test_format_setext_headings_and_thematic_breaks():
+    # Expected output is Prettier's (proseWrap "preserve") for the same input
+    text = "Title\n=====\nSub  title\n---\n***\n\n_ _ _\n\nText\n* * *\n"
+    assert format_markdown(text) == "# Title\n\n## Sub title\n\n---\n\n---\n\nText\n\n---\n"
+
+
+def test_format_keeps_fenced_code_verbatim():
+    text = ("Intro\n```python\ndef f():\n\n    return  1\n```\n"
+            "~~~\n- not a list\n# not a heading\n~~~~\n````\n```\n````")
+    assert format_markdown(text) == (
+        "Intro\n\n```python\ndef f():\n\n    return  1\n```\n\n"
+        "```\n- not a list\n# not a heading\n```\n\n````\n```\n````\n"
+    )
+
+
+def test_format_nests_lists_by_indent():
+    text = "- a\n    - b\n        1. c\n        2. d\n- e\n\n1. one\n   - x\n     continued\n2. two\n"
+    assert format_markdown(text) == (
+        "- a\n  - b\n    1. c\n    2. d\n- e\n\n1. one\n   - x\n     continued\n2. two\n"
+    )
+    # Code inside an item stays in it and makes the list loose
+    text = "1. Run:\n\n   ```sh\n   make  test\n   ```\n2. Done"
+    assert format_markdown(text) == "1. Run:\n\n   ```sh\n   make  test\n   ```\n\n2. Done\n"
+
+
+def test_format_is_idempotent():
+    text = "INTRO\n- a\n\n- b\n\n  second para\nafter\n\n# H\n1. x\n2. y"
+    once = format_markdown(text)
+    assert format_markdown(once) == once
+
+
+def test_text_to_markdown_marks_short_capitalized_lines():
+    assert text_to_markdown("OVERVIEW  \nbody text\n" + "X" * 70) == "# OVERVIEW\nbody text\n" + "X" * 70
+
+
+def test_pages_are_joined_in_order(monkeypatch):
+    monkeypatch.setattr(module, "page_count", lambda path: 5)
+    monkeypatch.setattr(module, "extract_page_range", lambda job: [f"page {i}" for i in range(job[1], job[2])])
+    assert extract_pages("doc.pdf", workers=1) == [f"page {i}" for i in range(5)]
+
+
+def test_conversions_are_cached_by_content(tmp_path, monkeypatch):
+    calls = []
+
+    def extract(path):
+        calls.append(path)
+        return "# TITLE\nbody   text"
+
+    monkeypatch.setattr(PdfMarkdown, "_extract", staticmethod(extract))
+    first, second = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    first.write_bytes(b"%PDF same bytes")
+    second.write_bytes(b"%PDF same bytes")
+
+    backend = SharedCache(str(tmp_path / "cache"))
+    converter = PdfMarkdown(backend)
+    assert converter.convert(str(first)) == "# TITLE\n\nbody text\n"
+    assert PdfMarkdown(backend).convert(str(second)) == "# TITLE\n\nbody text\n"
+    assert len(calls) == 1
+
+
+def test_failed_extraction_is_not_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(PdfMarkdown, "_extract", staticmethod(lambda path: None))
+    pdf = tmp_path / "broken.pdf"
+    pdf.write_bytes(b"not a pdf")
+    converter = PdfMarkdown()
+    assert converter.convert(str(pdf)).startswith("# Sample Document\n\n")
+    assert converter.convert(str(pdf)).startswith("# Sample Document")
+    assert converter.stats == {"hits": 0, "converted": 0, "failed": 2}
@@ -0,0 +1,35 @@
+import colorsys
+
+import numpy as np
+from PIL import Image
+
+from src.solvers.pixel_stats import count_where, hls, hsv, lightness, rgb_array
+
+
+def test_lightness_matches_colorsys_for_every_channel_extreme_pair():
+    # Lightness depends only on the max and min channel, so this covers every pixel value
+    high, low = np.meshgrid(np.arange(256, dtype=np.uint8), np.arange(256, dtype=np.uint8))
+    keep = high >= low
+    rgb = np.stack([high[keep], low[keep], low[keep]], axis=-1)[np.newaxis]
+    expected = [colorsys.rgb_to_hls(*(pixel / 255.0))[1] for pixel in rgb[0]]
+    assert lightness(rgb)[0].tolist() == expected
+
+
+def test_hls_and_hsv_match_colorsys():
+    rgb = np.random.default_rng(0).integers(0, 256, size=(40, 50, 3), dtype=np.uint8)
+    rgb[0, :3] = [[7, 7, 7], [255, 255, 255], [0, 0, 0]]
+    for convert, reference in ((hls, colorsys.rgb_to_hls), (hsv, colorsys.rgb_to_hsv)):
+        channels = np.stack(convert(rgb), axis=-1)
+        expected = np.array([[reference(*(pixel / 255.0)) for pixel in row] for row in rgb])
+        assert np.array_equal(channels, expected)
+
+
+def test_tiled_count_and_image_modes():
+    pixels = np.random.default_rng(1).integers(0, 256, size=(301, 97, 4), dtype=np.uint8)
+    rgb = rgb_array(Image.fromarray(pixels, "RGBA"))
+    assert rgb.shape == (301, 97, 3)
+    whole = int(np.count_nonzero(lightness(rgb) > 0.718))
+    assert count_where(rgb, lightness, lambda light: light > 0.718, tile_pixels=500) == whole
+
+    gray = rgb_array(Image.fromarray(pixels[:, :, 0], "L"))
+    assert gray.shape == (301, 97, 3) and (gray[:, :, 1] == pixels[:, :, 0]).all()
@@ -0,0 +1,81 @@
+import json
+import re
+from difflib import SequenceMatcher
+from pathlib import Path
+
+import pytest
+
+from src.core.question_router import (
+    QuestionRouter, normalize_text, extract_keywords, extract_question_patterns,
+    extract_query_patterns, classify_primary_domain, domain_boost, file_suffix
+)
+
+VICKYS_JSON = Path(__file__).resolve().parent.parent / "vickys.json"
+
+with open(VICKYS_JSON, "r", encoding="utf-8") as f:
+    QUESTIONS_DATA = json.load(f)
+
+PROCESSED_QUESTIONS = [
+    {
+        "id": idx,
+        "text": q["question"],
+        "file_path": q.get("file", ""),
+        "keywords": extract_keywords(q["question"]),
+        "patterns": extract_question_patterns(q["question"]),
+        "original": q,
+    }
+    for idx, q in enumerate(QUESTIONS_DATA) if "question" in q
+]
+
+ROUTER = QuestionRouter(PROCESSED_QUESTIONS)
+
+
+def exhaustive_rank(query):
+    """Reference scoring: every question, SequenceMatcher on each"""
+    query_lower = query.lower()
+    query_patterns = extract_query_patterns(query)
+    primary_domain = classify_primary_domain(query_lower)
+    query_keywords = set(re.findall(r'\b\w+\b', query_lower))
+    scores = []
+    for question in PROCESSED_QUESTIONS:
+        base_score = SequenceMatcher(None, normalize_text(query), normalize_text(question["text"])).ratio()
+        pattern_score = 0
+        for pattern_name, has_pattern in query_patterns.items():
+            if has_pattern and question["patterns"].get(pattern_name, False):
+                pattern_score += 0.15
+        boost = domain_boost(primary_domain, query_patterns, question["file_path"].lower())
+        keyword_score = min(0.1, len(query_keywords & question["keywords"]) / 20)
+        final_score = (base_score * 0.4) + (pattern_score * 0.3) + (boost * 0.2) + (keyword_score * 0.1)
+        scores.append((final_score, question["id"]))
+    scores.sort(key=lambda item: (-item[0], item[1]))
+    return scores
+
+
+SAMPLE_QUERIES = [q["question"] for q in QUESTIONS_DATA][:40] + [
+    "What is the output of code -s?",
+    "How many Wednesdays are there in the date range 1990-01-01 to 2000-12-31?",
+    "unzip q-extract-csv-zip.zip and find the answer column",
+    "compress this image losslessly under 1,500 bytes",
+    "Deploy a vercel app returning marks for api?name=X",
+    "hello",
+    "",
+]
+
+
+@pytest.mark.parametrize("query", SAMPLE_QUERIES)
+def test_rank_matches_exhaustive_scoring(query):
+    expected = [(s, i) for s, i in exhaustive_rank(query) if s >= 0.2][:5]
+    ranked = ROUTER.rank(query, k=5, min_score=0.2)
+    assert [(r["score"], r["question"]["id"]) for r in ranked] == expected
+
+
+def test_best_match_threshold():
+    assert ROUTER.best_match("hello") is None
+    match = ROUTER.best_match(QUESTIONS_DATA[6]["question"])
+    assert match["question"]["original"] is QUESTIONS_DATA[6]
+
+
+def test_question_for_file_normalizes_separators():
+    assert file_suffix("E://data science tool//GA2//tenth.py") == "GA2/tenth.py"
+    assert ROUTER.question_for_file("GA2/tenth.py")["file"] == "E://data science tool//GA2//tenth.py"
+    assert ROUTER.question_for_file("GA9\\missing.py") is None
@@ -0,0 +1,132 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from src.core.remote_fetch import DownloadTooLarge, RemoteFetcher
+from src.core.shared_cache import SharedCache
+
+
+class Handler(BaseHTTPRequestHandler):
+    files = {}
+    requests = []
+    delay = 0.0
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get("If-None-Match")))
+        body, etag = self.files.get(self.path, (None, None))
+        if body is None:
+            self.send_error(404)
+            return
+        if etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        time.sleep(self.delay)
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    Handler.files, Handler.requests, Handler.delay = {}, [], 0.0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def fetcher(tmp_path, **kwargs):
+    options = dict(max_bytes=1 << 20, timeout=5, revalidate_after=3600, ttl=3600)
+    options.update(kwargs)
+    return RemoteFetcher(SharedCache(str(tmp_path / "cache")), **options)
+
+
+def test_cached_downloads_are_revalidated_with_etags(server, tmp_path):
+    Handler.files["/data/q.csv"] = (b"a,b\n1,2\n", '"v1"')
+    remote = fetcher(tmp_path, revalidate_after=0)
+
+    path = remote.fetch(f"{server}/data/q.csv")
+    assert path.endswith("q.csv") and open(path, "rb").read() == b"a,b\n1,2\n"
+    assert remote.fetch(f"{server}/data/q.csv") == path
+    assert Handler.requests == [("/data/q.csv", None), ("/data/q.csv", '"v1"')]
+    assert remote.stats["revalidated"] == 1
+
+    Handler.files["/data/q.csv"] = (b"a,b\n3,4\n", '"v2"')
+    assert open(remote.fetch(f"{server}/data/q.csv"), "rb").read() == b"a,b\n3,4\n"
+
+    # Another worker sharing the cache serves it without asking the server
+    other = fetcher(tmp_path)
+    assert open(other.fetch(f"{server}/data/q.csv"), "rb").read() == b"a,b\n3,4\n"
+    assert len(Handler.requests) == 3 and other.stats["hits"] == 1
+
+
+def test_size_limit_and_errors(server, tmp_path):
+    Handler.files["/big.bin"] = (b"x" * 5000, None)
+    remote = fetcher(tmp_path, max_bytes=4096)
+    with pytest.raises(DownloadTooLarge):
+        remote.fetch(f"{server}/big.bin")
+    with pytest.raises(requests.HTTPError):
+        remote.fetch(f"{server}/missing.csv")
+
+
+def test_concurrent_fetches_share_one_download(server, tmp_path):
+    Handler.files["/slow.json"] = (b"{}", '"s"')
+    Handler.delay = 0.3
+    remote = fetcher(tmp_path)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(remote.fetch(f"{server}/slow.json")))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(results)) == 1 and len(results) == 4
+    assert len(Handler.requests) == 1
+
+
+class DownSession:
+    def get(self, *args, **kwargs):
+        raise requests.ConnectionError("server is down")
+
+
+def test_stale_copy_served_when_server_is_gone(server, tmp_path):
+    Handler.files["/x.txt"] = (b"hello", '"x"')
+    remote = fetcher(tmp_path, revalidate_after=0)
+    path = remote.fetch(f"{server}/x.txt")
+    remote.session = DownSession
+    assert remote.fetch(f"{server}/x.txt") == path
+    assert remote.stats["stale"] == 1
+
+
+def test_files_without_validators_are_downloaded_again(server, tmp_path):
+    Handler.files["/plain.txt"] = (b"one", None)
+    remote = fetcher(tmp_path, revalidate_after=0)
+    remote.fetch(f"{server}/plain.txt")
+    Handler.files["/plain.txt"] = (b"two", None)
+    assert open(remote.fetch(f"{server}/plain.txt"), "rb").read() == b"two"
+    assert len(Handler.requests) == 2 and remote.stats["downloaded"] == 2
+
+    fresh = fetcher(tmp_path)
+    assert open(fresh.fetch(f"{server}/plain.txt"), "rb").read() == b"two"
+    assert len(Handler.requests) == 2
+
+
+def test_stale_copy_served_when_revalidation_fails(server, tmp_path):
+    Handler.files["/gone.txt"] = (b"hello", '"g"')
+    remote = fetcher(tmp_path, revalidate_after=0)
+    path = remote.fetch(f"{server}/gone.txt")
+    del Handler.files["/gone.txt"]
+    assert remote.fetch(f"{server}/gone.txt") == path
+    assert remote.stats["stale"] == 1
@@ -0,0 +1,67 @@
+import json
+import random
+import re
+from pathlib import Path
+
+import pytest
+
+from src.core.question_router import file_suffix
+from src.core.rule_engine import KeywordAutomaton, RuleSet
+from src.core.routing_rules import (
+    DIRECT_MATCH_RULES, DIRECT_MATCH_RULESET, QUERY_OVERRIDE_RULESET, VSCODE_COMMAND_REGEXES
+)
+
+VICKYS_JSON = Path(__file__).resolve().parent.parent / "vickys.json"
+
+with open(VICKYS_JSON, "r", encoding="utf-8") as f:
+    QUESTIONS_DATA = json.load(f)
+
+
+def test_automaton_finds_overlapping_keywords():
+    keywords = ["he", "she", "his", "hers", "github", "github pages", "pages", "-s", "code -s"]
+    automaton = KeywordAutomaton(keywords)
+    rng = random.Random(7)
+    alphabet = "hesirgtubpa c-od"
+    for _ in range(500):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        expected = {i for i, kw in enumerate(automaton.keywords) if kw in text}
+        assert automaton.find(text) == expected
+
+
+def test_combined_regex_matches_each_pattern_independently():
+    ruleset = RuleSet([{"name": f"r{i}", "target": "x", "regex": [p]} for i, p in enumerate(VSCODE_COMMAND_REGEXES)])
+    for text in ["run code -s now", "what does vs code --help print", "the output of code --version", "plain text"]:
+        fired = {rule["name"] for rule in ruleset.evaluate(text)}
+        expected = {f"r{i}" for i, p in enumerate(VSCODE_COMMAND_REGEXES) if re.search(p, text.lower())}
+        assert fired == expected
+
+
+def test_rule_conditions_and_priority():
+    ruleset = RuleSet([
+        {"name": "low", "target": "b", "all": [["github"]], "priority": 5},
+        {"name": "high", "target": "a", "all": [["github"], ["action"]], "none": ["schedule"], "priority": 1},
+        {"name": "count", "target": "c", "at_least": (2, ["tokyo", "followers", "joined"])},
+    ])
+    assert [r["name"] for r in ruleset.evaluate("GitHub Action workflow")] == ["high", "low"]
+    assert [r["name"] for r in ruleset.evaluate("scheduled github action")] == ["low"]
+    assert ruleset.first_match("users in Tokyo with 150 followers")["name"] == "count"
+    assert ruleset.first_match("users in Tokyo") is None
+
+
+@pytest.mark.parametrize("question", QUESTIONS_DATA, ids=lambda q: file_suffix(q["file"]))
+def test_direct_rules_never_misroute_corpus_questions(question):
+    rule = DIRECT_MATCH_RULESET.first_match(question["question"])
+    if rule is not None:
+        assert rule["target"] == file_suffix(question["file"])
+
+
+def test_rule_targets_exist_in_corpus():
+    suffixes = {file_suffix(q["file"]) for q in QUESTIONS_DATA}
+    for rule in DIRECT_MATCH_RULES + QUERY_OVERRIDE_RULESET.rules:
+        assert rule["target"] in suffixes, rule["name"]
+
+
+def test_query_overrides():
+    assert QUERY_OVERRIDE_RULESET.first_match("Write a FastAPI server for q-fastapi.csv")["target"] == "GA2/ninth.py"
+    assert QUERY_OVERRIDE_RULESET.first_match("When was the newest GitHub user in Tokyo with 150 followers?")["target"] == "GA4/seventh.py"
+    assert QUERY_OVERRIDE_RULESET.first_match("ShopSmart customer feedback embeddings")["target"] == "GA3/sixth.py"
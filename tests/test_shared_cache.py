@@ -0,0 +1,82 @@
+import multiprocessing
+import os
+import time
+
+from src.core.answer_cache import AnswerCache
+from src.core.shared_cache import SharedCache
+
+SOLVER = "E://data science tool//GA1//seventh.py"
+
+
+def test_values_round_trip_and_expire(tmp_path):
+    cache = SharedCache(str(tmp_path), max_bytes=1024 * 1024)
+    cache.put("answers", "k", b"42")
+    cache.put("answers", "short", b"x", ttl=0.05)
+    assert cache.get("answers", "k") == b"42"
+    assert cache.get("other", "k") is None
+    time.sleep(0.1)
+    assert cache.get("answers", "short") is None
+
+
+def test_files_are_copied_atomically_and_keep_their_name(tmp_path):
+    cache = SharedCache(str(tmp_path / "cache"), max_bytes=1024 * 1024)
+    source = tmp_path / "q-fastapi.csv"
+    source.write_text("studentId,class\n1,1A\n")
+    cached = cache.put_file("downloads", "https://example.com/q-fastapi.csv", str(source))
+    assert os.path.basename(cached) == "q-fastapi.csv"
+    assert cache.get_file("downloads", "https://example.com/q-fastapi.csv") == cached
+    assert open(cached).read() == source.read_text()
+    assert not [name for name in os.listdir(os.path.dirname(cached)) if name.startswith(".tmp-")]
+
+
+def test_eviction_keeps_total_size_bounded(tmp_path):
+    cache = SharedCache(str(tmp_path), max_bytes=1000)
+    for i in range(10):
+        cache.put("answers", f"k{i}", bytes(300))
+    assert cache.total_bytes() <= 1000
+    assert cache.get("answers", "k9") is not None
+    assert cache.get("answers", "k0") is None
+    assert cache.stats["evictions"] >= 7
+
+
+def _store_in_child(directory):
+    SharedCache(directory).put("answers", "from-child", b"hello")
+
+
+def test_entries_are_visible_across_processes(tmp_path):
+    cache = SharedCache(str(tmp_path))
+    cache.get("answers", "warm-up")  # open a connection before forking
+    process = multiprocessing.get_context("spawn").Process(target=_store_in_child, args=(str(tmp_path),))
+    process.start()
+    process.join(30)
+    assert cache.get("answers", "from-child") == b"hello"
+
+
+def test_answer_cache_writes_through_and_warms(tmp_path):
+    backend = SharedCache(str(tmp_path))
+    first = AnswerCache(max_entries=10, ttl=60, policy={}, enabled=True, backend=backend)
+    key = first.key_for(SOLVER, "How many Wednesdays?")
+    first.put(key, "1642", SOLVER)
+
+    recycled = AnswerCache(max_entries=10, ttl=60, policy={}, enabled=True, backend=backend)
+    assert recycled.warm() == 1
+    assert len(recycled) == 1
+    assert recycled.get(key) == "1642"
+
+    cold = AnswerCache(max_entries=10, ttl=60, policy={}, enabled=True, backend=backend)
+    assert cold.get(key) == "1642"
+    assert cold.stats["shared_hits"] == 1
+
+
+def test_shared_hits_keep_the_remaining_policy_ttl(tmp_path):
+    backend = SharedCache(str(tmp_path))
+    live = AnswerCache(max_entries=10, ttl=3600, policy={"GA1/seventh.py": {"ttl": 60}},
+                       enabled=True, backend=backend)
+    key = live.key_for(SOLVER, "How many Wednesdays?")
+    live.put(key, "1642", SOLVER)
+    assert time.time() + 50 < backend.get_entry("answers", key)[1] <= time.time() + 60
+
+    cold = AnswerCache(max_entries=10, ttl=3600, policy={}, enabled=True, backend=backend)
+    assert cold.get(key) == "1642"
+    _, expires_at = cold._entries[key]
+    assert expires_at - time.monotonic() <= 60
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.core.single_flight import SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_run():
+    flight = SingleFlight()
+    runs = []
+
+    async def solver():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def scenario():
+        same = [flight.run("k", solver) for _ in range(10)]
+        other = flight.run("other", solver)
+        return await asyncio.gather(*same, other)
+
+    results = asyncio.run(scenario())
+    assert results == ["answer"] * 11
+    assert len(runs) == 2
+    assert flight.stats == {"executed": 2, "coalesced": 9}
+    assert flight.in_flight == 0
+
+
+def test_errors_are_shared_and_not_remembered():
+    flight = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("queue full")
+
+    async def scenario():
+        results = await asyncio.gather(*[flight.run("k", failing) for _ in range(3)], return_exceptions=True)
+        again = await flight.run("k", lambda: asyncio.sleep(0, result="ok"))
+        return results, again
+
+    results, again = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert again == "ok"
+
+
+def test_cancelling_one_waiter_keeps_the_shared_call_running():
+    flight = SingleFlight()
+
+    async def solver():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        first = asyncio.ensure_future(flight.run("k", solver))
+        second = asyncio.ensure_future(flight.run("k", solver))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
+
+
+def test_threads_coalesce():
+    flight = SingleFlight()
+    runs = []
+    barrier = threading.Barrier(5)
+    results = []
+
+    def solver():
+        runs.append(1)
+        time.sleep(0.1)
+        return 42
+
+    def worker():
+        barrier.wait()
+        results.append(flight.call("k", solver))
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [42] * 5
+    assert len(runs) == 1
+    assert flight.stats["coalesced"] == 4
@@ -0,0 +1,110 @@
+import asyncio
+import time
+
+import pytest
+
+from src.core.solver_executor import SolverExecutor, SolverQueueFull, SolverTimeout, resource
+
+RUNNER = f"{__name__}:fake_runner"
+
+
+def fake_runner(solution_path, query=None):
+    """Stand-in for vicky_server.run_solution"""
+    if solution_path == "sleep":
+        time.sleep(float(query))
+        return "slept"
+    if solution_path == "fail":
+        raise ValueError(query)
+    if solution_path == "allocate":
+        return len(bytearray(int(query) * 1024 * 1024))
+    return f"{solution_path}:{query}"
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_runs_solver_in_worker_and_reuses_it():
+    async def scenario():
+        executor = SolverExecutor(runner=RUNNER, workers=1, max_queue=2, timeout=10, memory_mb=0)
+        try:
+            first = await executor.run("GA1/first.py", "code -s")
+            pid = executor._pool[0].process.pid
+            second = await executor.run("GA1/second.py", "q")
+            assert executor._pool[0].process.pid == pid
+            return first, second, executor.stats
+        finally:
+            executor.shutdown()
+
+    first, second, stats = run(scenario())
+    assert first == "GA1/first.py:code -s"
+    assert second == "GA1/second.py:q"
+    assert stats["completed"] == 2
+
+
+def test_solver_errors_are_returned_as_output():
+    async def scenario():
+        executor = SolverExecutor(runner=RUNNER, workers=1, max_queue=0, timeout=10, memory_mb=0)
+        try:
+            return await executor.run("fail", "boom")
+        finally:
+            executor.shutdown()
+
+    assert run(scenario()) == "Error executing solution: ValueError: boom"
+
+
+def test_timeout_replaces_worker():
+    async def scenario():
+        executor = SolverExecutor(runner=RUNNER, workers=1, max_queue=0, timeout=0.5, memory_mb=0)
+        try:
+            executor.start()
+            pid = executor._pool[0].process.pid
+            with pytest.raises(SolverTimeout):
+                await executor.run("sleep", "30")
+            assert executor._pool[0].process.pid != pid
+            assert await executor.run("echo", "after") == "echo:after"
+            return executor.stats
+        finally:
+            executor.shutdown()
+
+    assert run(scenario())["timeouts"] == 1
+
+
+@pytest.mark.skipif(resource is None, reason="needs RLIMIT_AS")
+def test_memory_limit_fails_solver_not_worker():
+    async def scenario():
+        executor = SolverExecutor(runner=RUNNER, workers=1, max_queue=0, timeout=10, memory_mb=64)
+        try:
+            over = await executor.run("allocate", "1024")
+            under = await executor.run("allocate", "8")
+            return over, under
+        finally:
+            executor.shutdown()
+
+    over, under = run(scenario())
+    assert over == "Error executing solution: exceeded memory limit of 64 MB"
+    assert under == str(8 * 1024 * 1024)
+
+
+def test_queue_limit_rejects_excess_calls():
+    async def scenario():
+        executor = SolverExecutor(runner=RUNNER, workers=1, max_queue=1, timeout=10, memory_mb=0)
+        try:
+            calls = [asyncio.ensure_future(executor.run("sleep", "0.5")) for _ in range(2)]
+            await asyncio.sleep(0)
+            with pytest.raises(SolverQueueFull):
+                await executor.run("sleep", "0.5")
+            return await asyncio.gather(*calls), executor.stats
+        finally:
+            executor.shutdown()
+
+    results, stats = run(scenario())
+    assert results == ["slept", "slept"]
+    assert stats["rejected"] == 1
+
+
+def test_per_solver_limits():
+    executor = SolverExecutor(runner=RUNNER, workers=1, timeout=60, memory_mb=512,
+                              limits={"GA4/first.py": {"timeout": 300}})
+    assert executor.limits_for("E://data science tool//GA4//first.py") == (300, 512)
+    assert executor.limits_for("E://data science tool//GA1//first.py") == (60, 512)
@@ -0,0 +1,65 @@
+import os
+import time
+
+import pytest
+
+from src.core.upload_index import UploadIndex
+
+
+def write(path, mtime=None):
+    path.write_text("x")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+def test_latest_by_type_and_recency(tmp_path):
+    now = time.time()
+    write(tmp_path / "old.csv", now - 7200)
+    older = write(tmp_path / "a.csv", now - 60)
+    write(tmp_path / "b.json", now - 30)
+    index = UploadIndex([str(tmp_path)], use_inotify=False, rescan_interval=3600)
+
+    assert index.latest([".csv"]) == older
+    assert index.latest([".csv", ".json"]) == str(tmp_path / "b.json")
+    assert index.latest([".zip"]) is None
+
+    newer = write(tmp_path / "c.CSV", now - 10)
+    index.record(newer)
+    assert index.latest([".csv"]) == newer
+    os.unlink(newer)
+    assert index.latest([".csv"]) == older  # vanished entries are dropped on lookup
+    assert len(index) == 2
+    index.stop()
+
+
+def test_periodic_rescan_picks_up_unreported_files(tmp_path):
+    index = UploadIndex([str(tmp_path)], use_inotify=False, rescan_interval=0.05)
+    assert index.latest([".zip"]) is None
+    path = write(tmp_path / "q.zip")
+    deadline = time.time() + 5
+    while index.latest([".zip"]) is None and time.time() < deadline:
+        time.sleep(0.02)
+    assert index.latest([".zip"]) == path
+    index.stop()
+
+
+def test_inotify_reports_writes_and_deletes(tmp_path):
+    index = UploadIndex([str(tmp_path)], rescan_interval=3600)
+    index.start()
+    if index.watcher is None:
+        index.stop()
+        pytest.skip("inotify not available")
+
+    path = write(tmp_path / "data.xlsx")
+    deadline = time.time() + 5
+    while index.latest([".xlsx"]) != path and time.time() < deadline:
+        time.sleep(0.02)
+    assert index.latest([".xlsx"]) == path
+
+    os.unlink(path)
+    while len(index) and time.time() < deadline:
+        time.sleep(0.02)
+    assert len(index) == 0
+    assert index.stats["rescans"] == 1
+    index.stop()
@@ -0,0 +1,61 @@
+import os
+import time
+
+from src.core import upload_registry as registry_module
+from src.core.config import settings
+from src.core.upload_registry import UploadRegistry
+
+
+def make_file(tmp_path, name, data=b"x"):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_ids_are_shared_and_stable(tmp_path):
+    db = str(tmp_path / "registry.sqlite3")
+    worker_a = UploadRegistry(db, max_entries=2, max_age=3600)
+    worker_b = UploadRegistry(db, max_entries=2, max_age=3600)
+    path = make_file(tmp_path, "20250101_120000_data.csv")
+
+    file_id = worker_a.register("data.csv", path)
+    assert len(file_id) == 8 and int(file_id, 16) >= 0
+    entry = worker_b.get(file_id)
+    assert entry["path"] == path and entry["type"] == ".csv" and entry["original_name"] == "data.csv"
+
+    # Rescanning the directory (or restarting) keeps the ID; store IDs are kept as given
+    assert UploadRegistry(db, max_age=3600).register("data.csv", path) == file_id
+    assert worker_b.register("q.zip", make_file(tmp_path, "q.zip"), file_id="0123abcd") == "0123abcd"
+    assert [entry["id"] for entry in worker_a.entries()] == ["0123abcd", file_id]
+
+
+def test_bounded_front_expiry_and_collect(tmp_path):
+    registry = UploadRegistry(str(tmp_path / "registry.sqlite3"), max_entries=2, max_age=3600)
+    ids = [registry.register(f"f{i}.txt", make_file(tmp_path, f"f{i}.txt")) for i in range(4)]
+    assert len(registry._entries) == 2
+    assert all(registry.get(file_id) for file_id in ids)
+
+    old = registry.register("old.txt", make_file(tmp_path, "old.txt"), uploaded_at=time.time() - 7200)
+    os.unlink(tmp_path / "f0.txt")
+    assert registry.get(old) is None and registry.get(ids[0]) is None
+    assert registry.get("ffffffff") is None
+    assert registry.collect() == 2
+    assert len(registry.entries()) == 3
+
+
+def test_in_memory_registry(tmp_path):
+    registry = UploadRegistry(max_entries=8, max_age=3600)
+    path = make_file(tmp_path, "a.md")
+    file_id = registry.register("a.md", path)
+    assert registry.register("a.md", path) == file_id
+    assert registry.get(file_id)["path"] == path
+
+
+def test_unusable_database_falls_back_to_memory(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_STORE_DIR", str(tmp_path))
+    (tmp_path / ".store").mkdir()
+    (tmp_path / ".store" / "registry.sqlite3").write_bytes(b"not a database" * 100)
+    registry = registry_module._create_upload_registry()
+    assert registry.db_path is None
+    path = make_file(tmp_path, "a.md")
+    assert registry.get(registry.register("a.md", path))["path"] == path
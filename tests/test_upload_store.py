@@ -0,0 +1,81 @@
+import asyncio
+import io
+import os
+import time
+
+from starlette.datastructures import UploadFile
+
+from src.core.upload_index import UploadIndex
+from src.core.upload_store import UploadStore, safe_filename
+
+
+def save(store, data, name):
+    return asyncio.run(store.save_upload(UploadFile(io.BytesIO(data), filename=name)))
+
+
+def test_identical_uploads_share_one_blob_and_path(tmp_path):
+    store = UploadStore(str(tmp_path), max_bytes=1 << 20, max_age=3600)
+    first = save(store, b"a,b\n1,2\n", "data.csv")
+    second = save(store, b"a,b\n1,2\n", "data.csv")
+    other = save(store, b"a,b\n3,4\n", "data.csv")
+
+    assert first["id"] != second["id"]
+    assert first["path"] == second["path"] != other["path"]
+    assert first["type"] == ".csv" and first["size"] == 8
+    assert open(first["path"], "rb").read() == b"a,b\n1,2\n"
+    assert os.path.samefile(first["path"], store.blob_path(first["sha256"]))
+    assert store.stats["deduplicated"] == 1
+    assert store.total_bytes() == 16
+    # The stored record is the returned one, minus the signature computed while streaming
+    assert store.get(second["id"]) == {key: value for key, value in second.items() if key != "content_signature"}
+    assert second["content_signature"] == first["content_signature"] != other["content_signature"]
+    assert [upload["id"] for upload in store.uploads()] == [other["id"], second["id"], first["id"]]
+    assert not [name for name in os.listdir(store.blobs_dir) if name.startswith(".tmp-")]
+
+
+def test_collect_expires_old_uploads_and_unreferenced_blobs(tmp_path):
+    store = UploadStore(str(tmp_path), max_bytes=1 << 20, max_age=3600)
+    old = save(store, b"old", "old.txt")
+    kept = save(store, b"kept", "kept.txt")
+    past = time.time() - 7200
+    conn = store._connection()
+    conn.execute("UPDATE uploads SET uploaded_at = ? WHERE id = ?", (past, old["id"]))
+    conn.execute("UPDATE blobs SET stored_at = ?", (past,))
+
+    result = store.collect()
+    assert result == {"uploads_removed": 1, "blobs_removed": 1, "bytes_reclaimed": 3}
+    assert store.get(old["id"]) is None and not os.path.exists(old["path"])
+    assert not store.blob_path(old["sha256"]).exists()
+    assert store.get(kept["id"]) is not None and os.path.exists(kept["path"])
+
+
+def test_quota_drops_oldest_uploads_first(tmp_path):
+    store = UploadStore(str(tmp_path), max_bytes=10, max_age=3600)
+    first = save(store, b"123456", "a.bin")
+    store._connection().execute("UPDATE blobs SET stored_at = 0")
+    second = save(store, b"abcdef", "b.bin")
+
+    assert store.get(first["id"]) is None
+    assert store.get(second["id"]) is not None
+    assert store.total_bytes() == 6
+
+
+def test_safe_filename():
+    assert safe_filename("../../etc/passwd") == "passwd"
+    assert safe_filename("C:\\Users\\me\\q.zip") == "q.zip"
+    assert safe_filename(None) == safe_filename("..") == "upload"
+
+
+def test_reuploading_old_content_counts_as_a_new_upload(tmp_path):
+    store = UploadStore(str(tmp_path / "store"), max_bytes=1 << 20, max_age=86400)
+    first = save(store, b"a,b\n1,2\n", "data.csv")
+    day_old = time.time() - 86000
+    os.utime(first["path"], (day_old, day_old))
+
+    index = UploadIndex([str(tmp_path / "store")], use_inotify=False, rescan_interval=3600)
+    assert index.latest([".csv"]) is None
+    again = save(store, b"a,b\n1,2\n", "data.csv")
+    index.record(again["path"])
+    assert again["path"] == first["path"]
+    assert index.latest([".csv"]) == again["path"]
+    index.stop()
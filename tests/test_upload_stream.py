@@ -0,0 +1,45 @@
+import asyncio
+import io
+import os
+
+import pytest
+from starlette.datastructures import UploadFile
+
+from src.core.upload_store import UploadStore
+from src.core.upload_stream import UploadTooLarge, endpoint_limits, ingest
+from vicky_server import FileManager
+
+
+def upload(data, name="data.csv", declare_size=True):
+    return UploadFile(io.BytesIO(data), filename=name, size=len(data) if declare_size else None)
+
+
+def test_ingest_hashes_and_enforces_limits(tmp_path):
+    data = os.urandom(300000)
+    result = asyncio.run(ingest(upload(data), str(tmp_path), max_bytes=len(data), chunk_bytes=65536))
+    assert result["size"] == len(data)
+    assert open(result["tmp_path"], "rb").read() == data
+    os.unlink(result["tmp_path"])
+
+    # Declared size fails before reading; undeclared streams fail at the limit
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(ingest(upload(data), str(tmp_path), max_bytes=1000))
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(ingest(upload(data, declare_size=False), str(tmp_path), max_bytes=1000, chunk_bytes=512))
+    assert os.listdir(tmp_path) == []
+
+
+def test_save_upload_stores_and_deduplicates(tmp_path):
+    store = UploadStore(str(tmp_path), max_bytes=1 << 20, max_age=3600)
+    data = b"a,b\n1,2\n"
+    first = asyncio.run(store.save_upload(upload(data, "my data.csv")))
+    second = asyncio.run(store.save_upload(upload(data, "my data.csv")))
+    assert first["path"] == second["path"] and first["path"].endswith("_my_data.csv")
+    assert first["content_signature"] == FileManager()._calculate_content_signature(first["path"])
+    assert store.stats["deduplicated"] == 1
+    assert not [name for name in os.listdir(store.blobs_dir) if name.startswith(".tmp-")]
+
+
+def test_endpoint_limits():
+    limits = endpoint_limits("/api/=10, /upload=0.5,bad", 50)
+    assert limits == {"*": 50 * 1024 * 1024, "/api/": 10 * 1024 * 1024, "/upload": 512 * 1024}
@@ -0,0 +1,54 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+import vicky_app
+from src.core.upload_store import UploadStore
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    monkeypatch.setattr(vicky_app, "upload_store", UploadStore(str(tmp_path / "store"), max_bytes=1 << 20))
+    monkeypatch.setattr(vicky_app, "send_api_notification", lambda request, question: None)
+    monkeypatch.setattr(vicky_app, "log_ip_address", lambda request, endpoint, query=None: None)
+    return vicky_app
+
+
+def test_api_answers_with_the_uploaded_file(app_module, monkeypatch):
+    seen = {}
+
+    async def solve(question, explicit_file_path=None):
+        seen["question"], seen["path"] = question, explicit_file_path
+        with open(explicit_file_path) as f:
+            return f"{f.read().strip()} Execution time: 0.12s"
+
+    monkeypatch.setattr(app_module, "solve_question", solve)
+    response = TestClient(app_module.app).post(
+        "/api/", data={"question": "What is in the file?"},
+        files={"file": ("data.csv", b"a,b\n1,2\n", "text/csv")})
+
+    assert response.status_code == 200
+    assert response.json() == {"answer": "a,b\n1,2"}
+    assert seen["path"].endswith("_data.csv")
+    assert seen["question"].endswith("[Using uploaded file: data.csv]")
+
+
+def test_uploads_without_the_store_get_a_safe_name(app_module, tmp_path, monkeypatch):
+    monkeypatch.setattr(app_module, "upload_store", None)
+    monkeypatch.setattr(app_module, "UPLOADS_DIR", tmp_path / "uploads")
+    (tmp_path / "uploads").mkdir()
+    seen = {}
+
+    async def solve(question, explicit_file_path=None):
+        seen["path"] = explicit_file_path
+        return "ok"
+
+    monkeypatch.setattr(app_module, "solve_question", solve)
+    response = TestClient(app_module.app).post(
+        "/api/", data={"question": "What is in the file?"},
+        files={"file": ("../../my data.csv", b"a,b\n1,2\n", "text/csv")})
+
+    assert response.json() == {"answer": "ok"}
+    assert os.path.dirname(seen["path"]) == str(tmp_path / "uploads")
+    assert seen["path"].endswith("_my_data.csv")
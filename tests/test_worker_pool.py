@@ -0,0 +1,16 @@
+from src.core.config import settings
+from src.solvers.worker_pool import extract_workers, page_count, pool_context, usable_cpus
+
+
+def test_extract_workers_are_bounded_by_pages(monkeypatch):
+    monkeypatch.setattr(settings, "PDF_EXTRACT_WORKERS", 4)
+    assert [extract_workers(pages) for pages in (0, 1, 3, 10)] == [1, 1, 3, 4]
+    monkeypatch.setattr(settings, "PDF_EXTRACT_WORKERS", 0)
+    assert extract_workers(1000) == min(usable_cpus(), 1000) >= 1
+
+
+def test_pool_context_and_unreadable_pdfs(tmp_path):
+    assert pool_context().get_start_method() in ("forkserver", "spawn")
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+    assert page_count(str(broken)) is None
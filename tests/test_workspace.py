@@ -0,0 +1,78 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from src.core import workspace as workspace_module
+from src.core.config import settings
+from src.core.workspace import ArtifactRule, Janitor, scratch_dir, workspace
+
+
+@pytest.fixture(autouse=True)
+def workspace_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "WORKSPACE_DIR", str(tmp_path / "workspaces"))
+    return tmp_path / "workspaces"
+
+
+def test_scratch_dirs_are_released_with_their_workspace(workspace_root):
+    released = workspace_module.stats["bytes_released"]
+    with pytest.raises(RuntimeError):
+        with workspace() as root:
+            scratch = scratch_dir(prefix="docker_build_")
+            assert os.path.dirname(scratch) == root
+            with open(os.path.join(scratch, "Dockerfile"), "wb") as f:
+                f.write(b"x" * 1000)
+            raise RuntimeError("solver failed")
+    assert os.listdir(workspace_root) == []
+    assert workspace_module.stats["bytes_released"] == released + 1000
+
+    # Outside a workspace scratch directories wait for the janitor
+    assert os.path.dirname(scratch_dir()) == str(workspace_root)
+
+
+def test_janitor_enforces_age_and_size(tmp_path):
+    audio = tmp_path / "audio"
+    audio.mkdir()
+    now = time.time()
+    for name, age in (("old.mp3", 7200), ("a.mp3", 30), ("b.mp3", 20), ("c.mp3", 10)):
+        (audio / name).write_bytes(b"x" * 100)
+        os.utime(audio / name, (now - age, now - age))
+
+    janitor = Janitor([ArtifactRule(str(audio), max_age=3600, max_bytes=250)], interval=0)
+    assert janitor.sweep() == {"removed": 2, "bytes_reclaimed": 200}
+    assert sorted(os.listdir(audio)) == ["b.mp3", "c.mp3"]
+    assert janitor.stats["bytes_reclaimed"] == 200
+
+
+def test_janitor_skips_running_workspaces(workspace_root):
+    janitor = Janitor([ArtifactRule(str(workspace_root), max_age=-1, max_bytes=0)], interval=0)
+    (workspace_root / "solver-killed").mkdir(parents=True)
+    with workspace() as root:
+        assert janitor.sweep()["removed"] == 1
+        assert os.listdir(workspace_root) == [os.path.basename(root)]
+
+
+def _hold_workspace(directory, started, release):
+    settings.WORKSPACE_DIR = directory
+    with workspace() as root:
+        started.put(root)
+        release.wait(30)
+
+
+@pytest.mark.skipif(workspace_module.fcntl is None, reason="workspaces are locked with flock")
+def test_janitor_skips_workspaces_of_other_processes(workspace_root):
+    janitor = Janitor([ArtifactRule(str(workspace_root), max_age=-1, max_bytes=0)], interval=0)
+    context = multiprocessing.get_context("spawn")
+    started, release = context.Queue(), context.Event()
+    worker = context.Process(target=_hold_workspace, args=(str(workspace_root), started, release))
+    worker.start()
+    try:
+        root = started.get(timeout=30)
+        (workspace_root / "solver-killed").mkdir()
+        assert janitor.sweep()["removed"] == 1
+        assert os.listdir(workspace_root) == [os.path.basename(root)]
+    finally:
+        release.set()
+        worker.join(30)
+    assert os.listdir(workspace_root) == []
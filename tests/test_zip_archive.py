@@ -0,0 +1,55 @@
+import zipfile
+from datetime import datetime
+
+from src.solvers import zip_archive
+from src.solvers.zip_archive import ZipArchive
+
+
+def make_zip(path, entries):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data, date_time in entries:
+            zf.writestr(zipfile.ZipInfo(name, date_time=date_time), data)
+    return str(path)
+
+
+DT = (2010, 10, 31, 9, 43, 0)
+
+
+def test_members_and_contents_are_read_in_place(tmp_path):
+    path = make_zip(tmp_path / "q.zip", [
+        ("b.txt", b"two\r\nlines", DT),
+        ("a.txt", "café\n".encode("cp1252"), (2011, 1, 2, 3, 4, 6)),
+        ("dir/", b"", DT),
+        ("dir/c.txt", b"nested", DT),
+    ])
+    with ZipArchive(path) as archive:
+        assert [m.name for m in archive.top_level()] == ["a.txt", "b.txt"]
+        assert archive.member("a.txt").modified == datetime(2011, 1, 2, 3, 4, 6)
+        assert archive.member("dir/c.txt").size == 6 and archive.member("dir/") is None
+        assert list(archive.lines("b.txt", "utf-8")) == ["two\n", "lines"]
+        assert archive.text("a.txt", "cp1252") == "café\n"
+        assert archive.read("dir/c.txt") == b"nested"
+    assert not list(tmp_path.glob("*.txt"))
+
+
+def test_listings_are_cached_by_signature(tmp_path):
+    path = make_zip(tmp_path / "q.zip", [("a.txt", b"a", DT)])
+    first = ZipArchive(path, signature="sig").members
+    make_zip(tmp_path / "q.zip", [("other.txt", b"b", DT)])
+    assert ZipArchive(path, signature="sig").members is first
+    assert [m.name for m in ZipArchive(path, signature="sig-2").members] == ["other.txt"]
+    assert len(zip_archive._listings) <= zip_archive.MAX_CACHED_LISTINGS
+
+
+def test_flatten_and_rename_are_name_mappings(tmp_path):
+    path = make_zip(tmp_path / "q.zip", [
+        ("x/a1.txt", b"1", DT),
+        ("x/y/a1.txt", b"2", DT),
+        ("z/b9.txt", b"3", DT),
+    ])
+    with ZipArchive(path) as archive:
+        flat = archive.flattened()
+        assert {name: m.name for name, m in flat.items()} == {
+            "a1.txt": "x/a1.txt", "a1_from_y.txt": "x/y/a1.txt", "b9.txt": "z/b9.txt"}
+        renamed = archive.renamed(flat, lambda name: name.replace("9", "0"))
+        assert archive.read(renamed["b0.txt"].name) == b"3"
@@ -1,6 +1,6 @@
 import uvicorn
 from fastapi import FastAPI, Request, Form, File, UploadFile, HTTPException, Query, Body
-from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
@@ -8,21 +8,18 @@ from pydantic import BaseModel
 import urllib
 import os
 from pathlib import Path
-import shutil
 from datetime import datetime
 import sys
 from typing import Dict, Any, List, Optional
 import logging
 import re
 import base64
-import tempfile
 from collections import defaultdict
 import requests
 import time
 import threading
 import ipaddress
 import requests
-import tempfile
 import subprocess
 import google.generativeai as genai
 from gtts import gTTS
@@ -143,12 +140,32 @@ logger = logging.getLogger("tds_app")
 
 # Try to import the question-answering system
 try:
-    from vicky_server import answer_question
+    from vicky_server import answer_question_async
+    from src.core.config import settings
+    from src.core.solver_executor import solver_executor, SolverQueueFull
+    from src.core.answer_cache import answer_cache
+    from src.core.shared_cache import shared_cache
+    from src.core.single_flight import single_flight
+    from src.core.upload_index import upload_index
+    from src.core.upload_store import safe_filename, upload_store
+    from src.core.upload_registry import upload_registry
+    from src.core.upload_stream import UploadTooLarge, endpoint_limits, ingest
+    from src.core.content_signature import remember_signature
+    from src.core.remote_fetch import remote_fetcher
+    from src.core.workspace import janitor, workspace_stats
     logger.info("Successfully imported answer_question from vicky_server")
 except ImportError as e:
     logger.error(f"Failed to import from vicky_server: {e}")
     sys.exit("Error: Could not import answer_question from vicky_server. Make sure the file exists in the same directory.")
 
+async def solve_question(question, explicit_file_path=None):
+    """Answer a question on the solver worker pool; 503 when the pool is saturated"""
+    try:
+        return await answer_question_async(question, explicit_file_path=explicit_file_path)
+    except SolverQueueFull as e:
+        logger.warning(f"Rejecting question, solver pool saturated: {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
 app = FastAPI(title="TDS - Tools for Data Science",
               description="Interactive assistant for data science questions")
 app.add_middleware(
@@ -658,11 +675,24 @@ async def start_background_tasks():
     # Only start health monitoring if not on Render (causes connection issues with Gunicorn workers)
     if not os.getenv('RENDER'):
         asyncio.create_task(monitor_api_status())
+    
+    # Warm the solver workers in this serving process
+    solver_executor.start()
+    
+    # Expire leftover workspaces and generated artifacts (e.g. static/audio) in the background
+    janitor.start()
+    
+    # Preload answers other workers already computed (no cold cache after a recycle)
+    warmed = answer_cache.warm()
+    if warmed:
+        logger.info(f"Warmed answer cache with {warmed} shared entries")
 
 @app.on_event("shutdown")
 async def stop_background_tasks():
     global API_MONITOR_RUNNING
     API_MONITOR_RUNNING = False
+    solver_executor.shutdown()
+    janitor.stop()
 def load_file_based_questions():
     """Load questions from vickys.json grouped by file"""
     try:
@@ -4586,7 +4616,20 @@ async def read_root(request: Request):
 @app.get("/health")
 async def health_check():
     """Endpoint to check if the server is running correctly"""
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "solvers": dict(solver_executor.stats, in_flight=solver_executor.in_flight),
+        "answer_cache": dict(answer_cache.stats, entries=len(answer_cache)),
+        "single_flight": dict(single_flight.stats, in_flight=single_flight.in_flight),
+        "upload_index": dict(upload_index.stats, entries=len(upload_index)),
+        "downloads": dict(remote_fetcher.stats),
+        "upload_store": dict(upload_store.stats, bytes=upload_store.total_bytes()) if upload_store else None,
+        "upload_registry": dict(upload_registry.stats),
+        "workspaces": workspace_stats(),
+        "janitor": dict(janitor.stats),
+        "shared_cache": dict(shared_cache.stats, bytes=shared_cache.total_bytes()) if shared_cache else None
+    }
 
 # Update the ask_question function to handle file types more generically
 @app.get("/api-status")
@@ -4610,10 +4653,10 @@ async def ask_question(question: str = Form(...)):
         
         # If we found file IDs, add their paths to the question
         if file_ids:
-            for file_id in file_ids:
-                if file_id in UPLOADED_FILES_REGISTRY:
+            for file_id in dict.fromkeys(file_ids):
+                file_info = upload_registry.get(file_id)
+                if file_info:
                     # Add the actual file path to the question text
-                    file_info = UPLOADED_FILES_REGISTRY[file_id]
                     file_ext = file_info["type"].lower()
                     
                     # Add appropriate context based on file type
@@ -4626,31 +4669,66 @@ async def ask_question(question: str = Form(...)):
                         question += f" The file {file_info['original_name']} is located at {file_info['path']}"
         
         # Process the question with the augmented information
-        answer = answer_question(question)
+        answer = await solve_question(question)
         return {"answer": answer}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing question: {e}")
         raise HTTPException(status_code=500, detail=f"Error processing your question: {str(e)}")
 
-# Create a global registry for uploaded files
-UPLOADED_FILES_REGISTRY = {}  # Maps unique IDs to actual file paths
-
-def register_uploaded_file(original_filename, file_path):
-    """Register an uploaded file so solution functions can access it"""
-    # Generate a unique ID for this file
-    import uuid
-    file_id = str(uuid.uuid4())[:8]
-    
-    # Add to registry with metadata
-    UPLOADED_FILES_REGISTRY[file_id] = {
-        "original_name": original_filename,
-        "path": file_path,
-        "uploaded_at": datetime.now().isoformat(),
-        "type": os.path.splitext(original_filename)[1].lower()
-    }
-    
+def register_uploaded_file(original_filename, file_path, file_id=None, uploaded_at=None):
+    """
+    Register an uploaded file so solution functions can access it.
+    IDs are shared by all workers and stay the same for a known path.
+    """
     # Return the ID that can be used in queries
-    return file_id
+    return upload_registry.register(original_filename, file_path, file_id, uploaded_at)
+
+# Per-endpoint upload limits in bytes ("*" is the default)
+UPLOAD_LIMITS = endpoint_limits(settings.UPLOAD_ENDPOINT_LIMITS_MB, settings.UPLOAD_MAX_MB)
+
+# Slack for the multipart framing and form fields around the file
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+def upload_limit(endpoint):
+    return UPLOAD_LIMITS.get(endpoint, UPLOAD_LIMITS["*"])
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """Refuse bodies declared larger than the endpoint's upload limit before the form is parsed"""
+    length = request.headers.get("content-length", "")
+    if request.method == "POST" and length.isdigit():
+        limit = upload_limit(request.url.path)
+        if int(length) > limit + FORM_OVERHEAD_BYTES:
+            return JSONResponse(status_code=413, content={"detail": str(UploadTooLarge(limit))})
+    return await call_next(request)
+
+async def store_upload(file, endpoint):
+    """
+    Stream an uploaded file to the upload store (deduplicated by content) and register it.
+    Returns its record, including the content signature computed while writing.
+    """
+    max_bytes = upload_limit(endpoint)
+    try:
+        if upload_store is None:
+            ingested = await ingest(file, str(UPLOADS_DIR), max_bytes)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = safe_filename(file.filename)
+            file_path = UPLOADS_DIR / f"{timestamp}_{filename}"
+            os.replace(ingested["tmp_path"], file_path)
+            file_id = register_uploaded_file(filename, str(file_path))
+            upload = dict(upload_registry.get(file_id), size=ingested["size"],
+                          sha256=ingested["sha256"], content_signature=ingested["content_signature"])
+            remember_signature(str(file_path), ingested["content_signature"])
+        else:
+            upload = await upload_store.save_upload(file, max_bytes)
+            register_uploaded_file(upload["original_name"], upload["path"], upload["id"])
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    upload_index.record(upload["path"])
+    return upload
 
 # Update the upload file function to display file IDs better
 
@@ -4658,15 +4736,10 @@ def register_uploaded_file(original_filename, file_path):
 async def upload_file(file: UploadFile = File(...)):
     # Save uploaded file
     try:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{timestamp}_{file.filename}"
-        file_path = UPLOADS_DIR / filename
-        
-        with open(file_path, "wb") as f:
-            shutil.copyfileobj(file.file, f)
-        
-        # Register the file and get an ID
-        file_id = register_uploaded_file(file.filename, str(file_path))
+        upload = await store_upload(file, "/upload")
+        file_path = upload["path"]
+        filename = os.path.basename(file_path)
+        file_id = upload["id"]
         
         logger.info(f"File uploaded: {filename} (ID: {file_id})")
         
@@ -4683,6 +4756,8 @@ async def upload_file(file: UploadFile = File(...)):
             "file_id": file_id,
             "message": f"File uploaded successfully (ID: {file_id}). Example usage: '{usage_example}'"
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error uploading file: {e}")
         raise HTTPException(status_code=500, detail=f"Error uploading file: {str(e)}")
@@ -4702,9 +4777,9 @@ async def use_file(filename: str, request: Request):
 async def list_files(request: Request):
     """Show all uploaded files and their IDs"""
     files_info = []
-    for file_id, info in UPLOADED_FILES_REGISTRY.items():
+    for info in upload_registry.entries():
         files_info.append({
-            "id": file_id,
+            "id": info["id"],
             "name": info["original_name"],
             "type": info["type"],
             "uploaded_at": info["uploaded_at"]
@@ -4837,15 +4912,10 @@ async def ask_with_file(question: str = Form(...), file: UploadFile = File(None)
         # If a file was provided, save and process it
         if file and file.filename:
             # Save the file
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{timestamp}_{file.filename}"
-            file_path = UPLOADS_DIR / filename
-            
-            with open(file_path, "wb") as f:
-                shutil.copyfileobj(file.file, f)
-            
-            # Register the file and get an ID
-            file_id = register_uploaded_file(file.filename, str(file_path))
+            upload = await store_upload(file, "/ask_with_file")
+            file_path = upload["path"]
+            filename = os.path.basename(file_path)
+            file_id = upload["id"]
             logger.info(f"File uploaded with question: {filename} (ID: {file_id})")
             
             # Add file context directly to the question
@@ -4859,7 +4929,7 @@ async def ask_with_file(question: str = Form(...), file: UploadFile = File(None)
                 question += f" The file {file.filename} is located at {file_path}"
         
         # Process the question
-        answer = answer_question(question)
+        answer = await solve_question(question)
          # Check if no match was found
         if answer == "NO_MATCH_FOUND":
             return {
@@ -4870,6 +4940,8 @@ async def ask_with_file(question: str = Form(...), file: UploadFile = File(None)
                 "message": "We couldn't find a matching question in our database."
             }
         return {"success": True, "answer": answer}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing question with file: {e}")
         return {
@@ -6623,12 +6695,9 @@ async def api_process(
     try:
         if file and file.filename:
             # Save the file
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{timestamp}_{file.filename}"
-            file_path = UPLOADS_DIR / filename
-            
-            with open(file_path, "wb") as f:
-                shutil.copyfileobj(file.file, f)
+            upload = await store_upload(file, "/api/process")
+            file_path = upload["path"]
+            filename = os.path.basename(file_path)
             
             # Auto-detect the question type from file extension if not specified
             if not question_type:
@@ -6647,7 +6716,7 @@ async def api_process(
                 question += f" The file {file.filename} is located at {file_path}"
         
         # Process the enhanced question
-        answer = answer_question(question)
+        answer = await solve_question(question)
         
         # Return a structured response for API clients
         return {
@@ -6656,6 +6725,8 @@ async def api_process(
             "file_processed": bool(file and file.filename),
             "question": question
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"API error: {e}")
         return {
@@ -6679,22 +6750,18 @@ async def api_direct(
         file_path = None
         # If file is uploaded, always use it and don't try to extract from query
         if file and file.filename:
-            temp_file = tempfile.NamedTemporaryFile(delete=False)
-            try:
-                contents = await file.read()
-                temp_file.write(contents)
-            finally:
-                temp_file.close()
-            file_path = temp_file.name
+            file_path = (await store_upload(file, "/api/"))["path"]
             question += f" [Using uploaded file: {file.filename}]"
         
         # Process the question (with explicit file path if available)
-        raw_answer = answer_question(question, explicit_file_path=file_path)
+        raw_answer = await solve_question(question, explicit_file_path=file_path)
         
         # Clean up execution time info
         clean_answer = re.sub(r'Execution time: \d+\.\d+s', '', raw_answer).strip()
         
         return {"answer": clean_answer}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"API error: {e}")
         return {"answer": f"Error: {str(e)}"}
@@ -6731,21 +6798,16 @@ async def vicky_api(
         
         # Process uploaded file if present
         if file and file.filename:
-            # Save the file with a timestamp prefix
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{timestamp}_{file.filename}"
-            file_path = UPLOADS_DIR / filename
-            
-            with open(file_path, "wb") as f:
-                shutil.copyfileobj(file.file, f)
-            
-            # Register the file and get an ID
-            file_id = register_uploaded_file(file.filename, str(file_path))
+            # Save the file (stored once per distinct content)
+            upload = await store_upload(file, "/api/vicky")
+            file_path = upload["path"]
+            filename = os.path.basename(file_path)
+            file_id = upload["id"]
             file_info = {
                 "id": file_id,
                 "name": file.filename,
                 "path": str(file_path),
-                "size": os.path.getsize(file_path)
+                "size": upload["size"]
             }
             
             # Add file context to the question
@@ -6760,7 +6822,7 @@ async def vicky_api(
         
         # Process the question
         start_time = time.time()
-        raw_answer = answer_question(question, explicit_file_path=file_path)
+        raw_answer = await solve_question(question, explicit_file_path=file_path)
         processing_time = time.time() - start_time
         
         # Clean up execution time info from the answer if present
@@ -6800,6 +6862,8 @@ async def vicky_api(
                 
             return response
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Vicky API error: {e}")
         if format.lower() == "html":
@@ -6844,21 +6908,16 @@ async def vicky_api(
         
         # Process uploaded file if present
         if file and file.filename:
-            # Save the file with a timestamp prefix
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{timestamp}_{file.filename}"
-            file_path = UPLOADS_DIR / filename
-            
-            with open(file_path, "wb") as f:
-                shutil.copyfileobj(file.file, f)
-            
-            # Register the file and get an ID
-            file_id = register_uploaded_file(file.filename, str(file_path))
+            # Save the file (stored once per distinct content)
+            upload = await store_upload(file, "/api/vicky")
+            file_path = upload["path"]
+            filename = os.path.basename(file_path)
+            file_id = upload["id"]
             file_info = {
                 "id": file_id,
                 "name": file.filename,
                 "path": str(file_path),
-                "size": os.path.getsize(file_path)
+                "size": upload["size"]
             }
             
             # Add file context to the question
@@ -6873,7 +6932,7 @@ async def vicky_api(
         
         # Process the question
         start_time = time.time()
-        raw_answer = answer_question(question, explicit_file_path=file_path)
+        raw_answer = await solve_question(question, explicit_file_path=file_path)
         processing_time = time.time() - start_time
         
         # Clean up execution time info from the answer if present
@@ -6913,6 +6972,8 @@ async def vicky_api(
                 
             return response
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Vicky API error: {e}")
         if format.lower() == "html":
@@ -6957,21 +7018,16 @@ async def vicky_api(
         
         # Process uploaded file if present
         if file and file.filename:
-            # Save the file with a timestamp prefix
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{timestamp}_{file.filename}"
-            file_path = UPLOADS_DIR / filename
-            
-            with open(file_path, "wb") as f:
-                shutil.copyfileobj(file.file, f)
-            
-            # Register the file and get an ID
-            file_id = register_uploaded_file(file.filename, str(file_path))
+            # Save the file (stored once per distinct content)
+            upload = await store_upload(file, "/api/vicky")
+            file_path = upload["path"]
+            filename = os.path.basename(file_path)
+            file_id = upload["id"]
             file_info = {
                 "id": file_id,
                 "name": file.filename,
                 "path": str(file_path),
-                "size": os.path.getsize(file_path)
+                "size": upload["size"]
             }
             
             # Add file context to the question
@@ -6986,7 +7042,7 @@ async def vicky_api(
         
         # Process the question
         start_time = time.time()
-        raw_answer = answer_question(question, explicit_file_path=file_path)
+        raw_answer = await solve_question(question, explicit_file_path=file_path)
         processing_time = time.time() - start_time
         
         # Clean up execution time info from the answer if present
@@ -7026,6 +7082,8 @@ async def vicky_api(
                 
             return response
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Vicky API error: {e}")
         if format.lower() == "html":
@@ -7073,14 +7131,26 @@ async def startup_event():
     UPLOADS_DIR.mkdir(exist_ok=True)
     logger.info(f"Uploads directory ready: {UPLOADS_DIR.absolute()}")
     
-    # Load existing files into registry
+    # Expire old uploads before loading what is left into the registry
+    if upload_store:
+        collected = upload_store.collect()
+        logger.info(f"Upload store collected: {collected}")
     load_existing_files()
+    logger.info(f"Upload registry collected {upload_registry.collect()} stale entries")
 
 def load_existing_files():
     """Load any existing files in the uploads directory into the registry"""
+    stored_paths = set()
+    if upload_store:
+        # Store records keep their IDs across restarts
+        for upload in upload_store.uploads():
+            uploaded_at = datetime.fromisoformat(upload["uploaded_at"]).timestamp()
+            register_uploaded_file(upload["original_name"], upload["path"], upload["id"], uploaded_at)
+            stored_paths.add(os.path.abspath(upload["path"]))
+        logger.info(f"Loaded {len(stored_paths)} files from the upload store")
     if UPLOADS_DIR.exists():
         for file_path in UPLOADS_DIR.iterdir():
-            if file_path.is_file():
+            if file_path.is_file() and os.path.abspath(file_path) not in stored_paths:
                 # Register existing file with its original timestamp if possible
                 try:
                     # Try to extract timestamp from filename (assumes format: YYYYMMDD_HHMMSS_originalname)
@@ -7088,7 +7158,8 @@ def load_existing_files():
                     parts = filename.split('_', 2)
                     if len(parts) >= 3:
                         original_name = parts[2]  # Get original filename
-                        file_id = register_uploaded_file(original_name, str(file_path))
+                        file_id = register_uploaded_file(original_name, str(file_path),
+                                                         uploaded_at=file_path.stat().st_mtime)
                         logger.info(f"Loaded existing file: {filename} (ID: {file_id})")
                 except Exception as e:
                     logger.warning(f"Couldn't register existing file {file_path}: {e}")
@@ -5,25 +5,36 @@ import sys
 import pytz
 import time
 import importlib.util
-import io
 from datetime import datetime
-from collections import defaultdict
-import gzip
 import re
-import urllib.parse
 import os
 import requests
-import shutil
 import random
-import gzip
 import numpy as np
 import base64
 import tempfile
 # Add this import at the top of vicky_server.py with other imports
 from difflib import SequenceMatcher
 import traceback
-from contextlib import redirect_stdout
 from typing import Dict, List, Optional, Any, Union, Tuple
+from src.core.question_router import QuestionRouter, extract_question_patterns
+from src.core.routing_rules import DIRECT_MATCH_RULESET, QUERY_OVERRIDE_RULESET
+from src.core.solver_executor import solver_executor, SolverTimeout, SolverWorkerError
+from src.core.output_channel import capture_output, discard_output, progress
+from src.core.answer_cache import answer_cache, invocation_key
+from src.core.single_flight import single_flight
+from src.core.upload_index import upload_index
+from src.core.remote_fetch import remote_fetcher
+from src.core.content_signature import file_signature
+from src.core.workspace import scratch_dir, workspace
+from src.solvers.image_compress import image_compressor
+from src.solvers.jigsaw import parse_mapping, unscramble_image
+from src.solvers.lazy_input import LocalInput
+from src.solvers.log_engine import load_log
+from src.solvers.marks_table import MarksTable, extraction_available, load_marks
+from src.solvers.pdf_markdown import pdf_markdown
+from src.solvers.pixel_stats import count_where, lightness, rgb_array
+from src.solvers.zip_archive import ZipArchive
 
 # File paths
 VICKYS_JSON = "vickys.json"
@@ -191,20 +202,8 @@ for idx, question_data in enumerate(QUESTIONS_DATA):
     "GA2/tenth.py": ["ngrok", "llamafile", "tunnel", "llama-3.2", "free.app", 
                      "ngrok-free.app", "llama", "llamafile server", "Llama-3.2-1B-Instruct"]
 }
-        # Special patterns to detect (expand this based on your questions)
-        patterns = {
-            "code_command": bool(re.search(r'code\s+(-[a-z]+|--[a-z]+)', question_text.lower())),
-            "email": bool(re.search(r'[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+', question_text)),
-            "date_range": bool(re.search(r'(\d{4}[-/]\d{1,2}[-/]\d{1,2})\s+to\s+(\d{4}[-/]\d{1,2}[-/]\d{1,2})', question_text)),
-            "pdf_extraction": bool(re.search(r'pdf|extract|table|marks|physics|maths', question_text.lower())),
-            "github_pages": bool(re.search(r'github\s+pages|showcase|email_off', question_text.lower())),
-            "github_action": bool(re.search(r'github\s+action|workflow|yml|steps:|run:', question_text.lower())),
-            "github_search": bool(re.search(r'github\s+search|location:|followers:|sort by', question_text.lower())),
-            "vercel": bool(re.search(r'vercel|deploy|api\?name=|students\.json', question_text.lower())),
-            "hidden_input": bool(re.search(r'hidden\s+input|secret\s+value', question_text.lower())),
-            "sql_query": bool(re.search(r'sql|query|select|from|where', question_text.lower())),
-            "weekdays": bool(re.search(r'monday|tuesday|wednesday|thursday|friday|saturday|sunday', question_text.lower())),
-        }
+        # Special patterns to detect (shared with the question router)
+        patterns = extract_question_patterns(question_text)
         
         # Store processed question data
         PROCESSED_QUESTIONS.append({
@@ -218,6 +217,9 @@ for idx, question_data in enumerate(QUESTIONS_DATA):
             "patterns": patterns,
             "original": question_data
         })
+
+# Inverted index over the processed questions, built once at startup
+QUESTION_ROUTER = QuestionRouter(PROCESSED_QUESTIONS)
 def classify_domain(query_text):
     """Classify query into primary domain for better matching"""
     query_lower = query_text.lower()
@@ -323,120 +325,20 @@ def match_command_variant(query):
     return "code -s"
 def is_vscode_command_query(query):
     """Determine if the query is specifically asking about a VS Code command"""
-    # Look for explicit VS Code command patterns
     if not query:
         return False
-        
-    query_lower = query.lower()
-    command_patterns = [
-        r'\bcode\b\s+(-[a-z]\b|--[a-z-]+\b)',  # Must have space and dash after "code"
-        r'output of\s+\bcode\b\s+(-[a-z]|--[a-z-]+)\b',
-        r'running\s+\bcode\b\s+(-[a-z]|--[a-z-]+)\b',
-        r'command\s+\bcode\b\s+(-[a-z]|--[a-z-]+)\b',
-        r'vs code\s+(-[a-z]|--[a-z-]+)\b',
-        r'vscode\s+(-[a-z]|--[a-z-]+)\b',
-        r'visual studio code\s+(-[a-z]|--[a-z-]+)\b' # command code -s
-    ]
-    
-    for pattern in command_patterns:
-        if re.search(pattern, query.lower()):
-            return True
-    explicit_command_phrases = [
-        'code command line', 'code -s', 'code -v', 'code -h',
-        'code --version', 'code --help', 'code --status',
-        'vs code command', 'vscode terminal command',
-        'visual studio code command line'
-    ]
-    for phrase in explicit_command_phrases:
-        if phrase in query_lower:
-            return True
-    # Check for specific mentions of VS Code and command arguments
-    vs_code_indicators = ["visual studio code", "vs code", "vscode"]
-    command_args = ["-s", "-v", "-h", "--version", "--help", "--status"]
-    
-    has_vs_code = any(indicator in query.lower() for indicator in vs_code_indicators)
-    has_command = any(arg in query.lower() for arg in command_args)
-    
-    # The combination of VS Code mention + specific argument is a strong indicator
-    if has_vs_code and has_command:
-        return True
-        
-    return False
+    # VS Code command rules all route to GA1/first.py
+    return any(rule["target"] == "GA1/first.py" for rule in DIRECT_MATCH_RULESET.evaluate(query))
 def find_best_question_match(query: str) -> Optional[Dict]:
     """Find the best matching question using semantic matching with a hierarchical approach"""
-    normalized_query = normalize_text(query)
-    query_lower = query.lower()
-    
     # =========== STAGE 1: DIRECT CATEGORY DETECTION ===========
-    # These are high-confidence pattern detections that should take precedence
-    # Direct ngrok pattern detection (highest priority)
-    if any(term in query_lower for term in ["ngrok", "llamafile", "llama-3.2", "tunnel", "ngrok-free.app"]):
-        print("Direct match: Ngrok/Llamafile query → GA2/tenth.py")
-        for question in QUESTIONS_DATA:
-            if 'file' in question and question['file'].endswith("GA2/tenth.py"):
-                return question
-    # VS Code commands detection
-    if is_vscode_command_query(query):
-        print("Direct match: VS Code command query → GA1/first.py")
-        for question in QUESTIONS_DATA:
-            if 'file' in question and question['file'].endswith("GA1/first.py"):
-                return question
-    
-    # GitHub-related category detection
-    if 'github' in query_lower:
-        if ('location:' in query_lower or 'followers:' in query_lower or 
-            'sort by joined' in query_lower or 'newest user' in query_lower):
-            print("Direct match: GitHub search query → GA5/third.py")
-            for question in QUESTIONS_DATA:
-                if 'file' in question and "GA5/third.py" in question['file']:
-                    return question
-                    
-        elif 'github pages' in query_lower or 'showcase' in query_lower or 'email_off' in query_lower:
-            print("Direct match: GitHub Pages query → GA2/third.py")
-            for question in QUESTIONS_DATA:
-                if 'file' in question and "GA2/third.py" in question['file']:
-                    return question
-                    
-        elif 'action' in query_lower and ('workflow' in query_lower or 'trigger' in query_lower):
-            print("Direct match: GitHub Action query → GA2/seventh.py")
-            for question in QUESTIONS_DATA:
-                if 'file' in question and "GA2/seventh.py" in question['file']:
-                    return question
-    
-    # Vercel deployment detection
-    if ('vercel' in query_lower and ('deploy' in query_lower or 'api?name=' in query_lower)) or 'marks of the names' in query_lower:
-        print("Direct match: Vercel deployment query → GA2/sixth.py")
-        for question in QUESTIONS_DATA:
-            if 'file' in question and "GA2/sixth.py" in question['file']:
-                return question
-    
-    # Excel analysis detection
-    if 'clean' in query_lower and 'excel' in query_lower and ('margin' in query_lower or 'sales' in query_lower):
-        print("Direct match: Excel data cleaning query → GA5/first.py")
-        for question in QUESTIONS_DATA:
-            if 'file' in question and "GA5/first.py" in question['file']:
-                return question
-    
-    # Special file pattern detection
-    file_patterns = {
-        "unicode-data.zip": "GA1/twelfth.py",
-        "mutli-cursor-json": "GA1/tenth.py",
-        "multi-cursor-json": "GA1/tenth.py",
-        "extract-csv-zip": "GA1/eighth.py",
-        "extract.csv": "GA1/eighth.py",
-        "compare-files": "GA1/seventeenth.py",
-        "replace-across-files": "GA1/fourteenth.py",
-        "jigsaw.webp": "GA5/tenth.py",
-        "tables-from-pdf": "GA4/ninth.py",
-        "pdf-to-markdown": "GA4/tenth.py"
-    }
-    
-    for pattern, file_path in file_patterns.items():
-        if pattern in query_lower:
-            print(f"Direct file pattern match: {pattern} → {file_path}")
-            for question in QUESTIONS_DATA:
-                if 'file' in question and file_path in question['file']:
-                    return question
+    # These are high-confidence pattern detections that should take precedence.
+    # The rule table lives in src/core/routing_rules.py and fires in one pass.
+    for rule in DIRECT_MATCH_RULESET.evaluate(query):
+        question = QUESTION_ROUTER.question_for_file(rule["target"])
+        if question:
+            print(f"Direct match: {rule['label']} → {rule['target']}")
+            return question
     # Check distinctive patterns for better matching
     # query_lower = query.lower()
     # best_match = None
@@ -465,117 +367,15 @@ def find_best_question_match(query: str) -> Optional[Dict]:
         # print(f"Strong distinctive pattern match found: {max_pattern_score:.2f}")
         # return best_match
     # =========== STAGE 2: DOMAIN CLASSIFICATION & WEIGHTED SCORING ===========
-    # Classify the query into domains, then apply domain-specific scoring
-    
-    # Domain classification weights for better differentiation
-    domain_indicators = {
-        "vscode": ["code -", "visual studio code", "vscode", "--version", "--help", "-v", "-h"],
-        "github": ["github", "repository", "commit", "action", "pages"],
-        "excel": ["excel", "sales", "margin", "clean", "data"],
-        "colab": ["colab", "google", "notebook", "calculate", "pixels"],
-        "vercel": ["vercel", "deploy", "api", "marks", "students"],
-        "fastapi": ["fastapi", "api", "endpoint", "server"],
-        "file_processing": ["extract", "zip", "csv", "replace", "compare"],
-        "markdown": ["markdown", "heading", "bold", "italic", "hyperlink"],
-        "image": ["image", "compress", "lossless", "bytes", "pixel"],
-        "openai": ["openai", "api", "completion", "sentiment", "embedding"]
-    }
-    
-    # Calculate domain scores
-    domain_scores = {}
-    for domain, indicators in domain_indicators.items():
-        score = sum(3 if indicator in query_lower else 0 for indicator in indicators)
-        if score > 0:
-            domain_scores[domain] = score
-    
-    # Get primary domain (highest score)
-    primary_domain = max(domain_scores.items(), key=lambda x: x[1])[0] if domain_scores else None
-    print(f"Primary domain: {primary_domain}")
-    
-    # Extract query patterns that may differentiate similar questions
-    query_patterns = {
-        "code_command": bool(re.search(r'code\s+(-[a-z]+|--[a-z]+)', query_lower) or "code -h" in query_lower),
-        "email": bool(re.search(r'[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+', query)),
-        "date_range": bool(re.search(r'(\d{4}[-/]\d{1,2}[-/]\d{1,2})\s+to\s+(\d{4}[-/]\d{1,2}[-/]\d{1,2})', query)),
-        "pdf_extraction": bool(re.search(r'pdf|extract|table|marks|physics|maths|students', query_lower)),
-        "github_pages": bool(re.search(r'github\s+pages|showcase|email_off', query_lower)),
-        "vercel": bool(re.search(r'vercel|deploy|api\?name=|students\.json', query_lower)),
-        "hidden_input": bool(re.search(r'hidden\s+input|secret\s+value', query_lower)),
-        "weekdays": bool(re.search(r'monday|tuesday|wednesday|thursday|friday|saturday|sunday', query_lower)),
-        "github_action": bool(re.search(r'github\s+action|workflow|yml|steps:|run:', query_lower)),
-        "github_search": bool(re.search(r'github\s+search|location:|followers:|sort by', query_lower)),
-        "image_compression": bool(re.search(r'compress\s+.*\s+image|lossless|bytes', query_lower)),
-        "pixel_counting": bool(re.search(r'pixel|lightness|brightness', query_lower)),
-        "file_extraction": bool(re.search(r'extract\s+.*\s+(zip|csv|file)|unzip', query_lower)),
-        "sql_query": bool(re.search(r'sql|query|select|from|where', query_lower))
-    }
+    # Text similarity, pattern, domain and keyword scores come from the
+    # precompiled router index instead of a scan over every question
+    best = QUESTION_ROUTER.best_match(query)
     
-    # Get keywords from query
-    query_keywords = set(re.findall(r'\b\w+\b', query_lower))
-    
-    best_score = 0
-    best_match = None
-    best_confidence = 0
-    
-    for question in PROCESSED_QUESTIONS:
-        # Base similarity score (text comparison)
-        base_score = similarity_score(query, question["text"])
-        
-        # Domain boost - strongly favor questions in the same domain
-        domain_boost = 0
-        file_path = question.get("file_path", "").lower()
-        
-        # Add pattern matching score based on query indicators
-        pattern_score = 0
-        matching_patterns = 0
-        for pattern_name, has_pattern in query_patterns.items():
-            if has_pattern and question["patterns"].get(pattern_name, False):
-                pattern_score += 0.15
-                matching_patterns += 1
-        
-        # Domain-based file path boost
-        if primary_domain == "vscode" and "GA1/first" in file_path:
-            domain_boost = 0.3
-        elif primary_domain == "github":
-            if "github_search" in query_patterns and query_patterns["github_search"] and "GA5/third" in file_path:
-                domain_boost = 0.4
-            elif "github_pages" in query_patterns and query_patterns["github_pages"] and "GA2/third" in file_path:
-                domain_boost = 0.4
-            elif "github_action" in query_patterns and query_patterns["github_action"] and "GA2/seventh" in file_path:
-                domain_boost = 0.4
-            elif "GA1/thirteenth" in file_path:  # Simple GitHub repository
-                domain_boost = 0.2
-        elif primary_domain == "excel" and "GA5/first" in file_path:
-            domain_boost = 0.3
-        elif primary_domain == "vercel" and "GA2/sixth" in file_path:
-            domain_boost = 0.3
-        elif primary_domain == "fastapi" and ("GA2/ninth" in file_path or "GA3/seventh" in file_path):
-            domain_boost = 0.3
-        elif primary_domain == "file_processing" and any(x in file_path for x in ["eighth", "twelfth", "fourteenth", "seventeenth"]):
-            domain_boost = 0.3
-        elif primary_domain == "image" and ("GA2/second" in file_path or "GA2/fifth" in file_path):
-            domain_boost = 0.3
-        elif primary_domain == "openai" and "GA3" in file_path:
-            domain_boost = 0.25
-        
-        # Keyword match score
-        keyword_overlap = len(query_keywords.intersection(question.get("keywords", set())))
-        keyword_score = min(0.1, keyword_overlap / 20)  # Cap at 0.1
-        
-        # Calculate final weighted score
-        final_score = (base_score * 0.4) + (pattern_score * 0.3) + (domain_boost * 0.2) + (keyword_score * 0.1)
-        
-        # Calculate confidence level (for debugging)
-        confidence = min(100, int((final_score / 1.0) * 100))
-        
-        if final_score > best_score:
-            best_score = final_score
-            best_match = question
-            best_confidence = confidence
-    
-    if best_match and best_score > 0.35:  # Minimum threshold
+    if best:
+        best_match = best["question"]
         file_path = best_match.get("file_path", "unknown")
-        print(f"Best match: {file_path} (score: {best_score:.2f}, confidence: {best_confidence}%)")
+        print(f"Primary domain: {best['primary_domain']}")
+        print(f"Best match: {file_path} (score: {best['score']:.2f}, confidence: {best['confidence']}%)")
         return best_match["original"]
     
     # Fallback for low-confidence matches - direct file path mapping
@@ -597,7 +397,6 @@ class FileManager:
     def __init__(self, base_directory="E:/data science tool"):
         self.base_directory = base_directory
         self.ga_folders = ["GA1", "GA2", "GA3", "GA4", "GA5"]
-        self.temp_dirs = []  # Track created temporary directories for cleanup
         self.file_cache = {}  # Cache for previously resolved files
         self.supported_extensions = {
             'image': ['.png', '.jpg', '.jpeg', '.webp', '.gif', '.bmp'],
@@ -615,6 +414,7 @@ class FileManager:
             'archive': r'\.(zip|tar|gz|rar)',
             'code': r'\.(py|js|html|css|cpp|c|java)'
         }
+        self._compile_reference_patterns()
         
         # Known files with their GA location and expected content signatures
         self.known_files = {
@@ -646,44 +446,11 @@ class FileManager:
             'q-clean-up-sales-data.json':{'folder':'GA5','content_type':'data'},'q-clean-up-student-marks.txt':{'foler':'GA5','content_type':'docuemnt'},'q-extract-nested-json-keys.json':{'folder':'GA5','content_type':'data'},'q-parse-parital-json.jsonl':{'folder':'GA5','content_type':'data'},'s-anand_net-May-2024.gz':{'folder':'GA5','content_type':'archive'}
         }
     
-    def __del__(self):
-        """Clean up temporary directories when the manager is destroyed"""
-        self.cleanup()
-    import shutil
-    def cleanup(self):
-        """Clean up any temporary directories created during processing"""
-        for temp_dir in self.temp_dirs:
-            try:
-                if os.path.exists(temp_dir):
-                    shutil.rmtree(temp_dir, ignore_errors=True)
-            except Exception as e:
-                print(f"Warning: Failed to clean up {temp_dir}: {str(e)}")
-        self.temp_dirs = []
-    
-    def detect_file_from_query(self, query):
+    def _compile_reference_patterns(self):
         """
-        Enhanced detection of file references from queries.
-        Supports multiple patterns, file types, and handles same-named files.
-        
-        Args:
-            query (str): User query text that may contain file references
-        
-        Returns:
-            dict: Comprehensive file information with content signature
+        Compile the file-reference patterns used by detect_file_from_query
+        and enhance_url_detection once, instead of on every query.
         """
-        if not query:
-            return {"path": None, "exists": False, "type": None, "is_remote": False}
-        example_url_patterns = [
-        r'https?://\.your-app\.vercel\.app',
-        r'https?://\[USER\]\.github\.io',
-        r'https?://\.example\.com',
-        r'https?://.*\.vercel\.app/api\?name=X',
-        r'https?://.*\-anand\.net/',
-        r'https?://.*\.github.com/USER/REPO'
-        ]
-        for pattern in example_url_patterns:
-            # Replace example URLs with placeholders to avoid false detection
-            query = re.sub(pattern, "EXAMPLE_URL_PLACEHOLDER", query)  # Fixed missing parenthesis
         # Flatten supported extensions for pattern matching
         all_extensions = []
         for ext_list in self.supported_extensions.values():
@@ -692,8 +459,18 @@ class FileManager:
         # Format for regex pattern
         ext_pattern = '|'.join(all_extensions)
         
-        # PRIORITY 1: Check for uploaded files via TDS.py or file upload indicators
-        tds_upload_patterns = [
+        # Example URLs in question text, replaced to avoid false detection
+        self._example_url_res = [re.compile(pattern) for pattern in [
+            r'https?://\.your-app\.vercel\.app',
+            r'https?://\[USER\]\.github\.io',
+            r'https?://\.example\.com',
+            r'https?://.*\.vercel\.app/api\?name=X',
+            r'https?://.*\-anand\.net/',
+            r'https?://.*\.github.com/USER/REPO'
+        ]]
+        
+        # PRIORITY 1: Uploaded files via TDS.py or file upload indicators
+        self._upload_res = [re.compile(pattern, re.IGNORECASE) for pattern in [
             r'@file\s+([^\s]+\.(?:' + ext_pattern + r'))',
             r'uploaded file at\s+([^\s]+\.(?:' + ext_pattern + r'))',
             r'uploaded\s+to\s+([^\s]+\.(?:' + ext_pattern + r'))',
@@ -702,115 +479,134 @@ class FileManager:
             r'file (?:.*?) is located at ([^\s,\.]+)',
             r'from file:? ([^\s,\.]+)',
             r'file path:? ([^\s,\.]+)'
-        ]
+        ]]
+        
+        # PRIORITY 2: File type named in the query
+        self._file_type_res = [(file_type, re.compile(pattern, re.IGNORECASE))
+                               for file_type, pattern in self.file_patterns.items()]
+        
+        # PRIORITY 3: File paths in query (Windows, Unix, quoted paths)
+        self._path_res = [re.compile(pattern, re.IGNORECASE) for pattern in [
+            r'([a-zA-Z]:\\(?:[^\\/:*?"<>|\r\n]+\\)*[^\\/:*?"<>|\r\n]+\.(?:' + ext_pattern + r'))',  # Windows
+            r'((?:/[^/]+)+\.(?:' + ext_pattern + r'))',  # Unix
+            r'[\'\"]([^\'\"]+\.(?:' + ext_pattern + r'))[\'\"]',  # Quoted path
+            r'file\s+[\'\"]?([^\'\"]+\.(?:' + ext_pattern + r'))[\'\"]?',  # File keyword
+        ]]
+        
+        # PRIORITY 4: URLs pointing to files
+        self._file_url_re = re.compile(r'(https?://[^\s"\'<>]+\.(?:' + ext_pattern + r'))', re.IGNORECASE)
+        
+        # PRIORITY 6: Looser filename pattern
+        self._filename_re = re.compile(
+            r'(?:file|document|data)[:\s]+["\']?([^"\'<>|*?\r\n]+\.(?:' + ext_pattern + r'))', re.IGNORECASE)
         
-        for pattern in tds_upload_patterns:
-            upload_match = re.search(pattern, query, re.IGNORECASE)
+        # Expanded URL patterns for enhance_url_detection
+        self._url_res = [re.compile(pattern, re.IGNORECASE) for pattern in [
+            # Standard HTTP/HTTPS URLs ending with file extension
+            r'(https?://[^\s"\'<>]+\.(?:[a-zA-Z0-9]{2,6}))',
+            # URLs with query parameters or fragments
+            r'(https?://[^\s"\'<>]+\.(?:[a-zA-Z0-9]{2,6})(?:\?[^"\s<>]+)?)',
+            # Google Drive links
+            r'(https?://drive\.google\.com/[^\s"\'<>]+)',
+            # Dropbox links
+            r'(https?://(?:www\.)?dropbox\.com/[^\s"\'<>]+)',
+            # GitHub raw content links
+            r'(https?://raw\.githubusercontent\.com/[^\s"\'<>]+)',
+            # SharePoint/OneDrive links
+            r'(https?://[^\s"\'<>]+\.sharepoint\.com/[^\s"\'<>]+)',
+            # Amazon S3 links
+            r'(https?://[^\s"\'<>]+\.s3\.amazonaws\.com/[^\s"\'<>]+)'
+        ]]
+    
+    def _extract_file_references(self, query):
+        """
+        Candidate local paths in priority order, as (source, path): the
+        first match of each upload-marker pattern, then of each path
+        pattern. Existence is checked once per distinct path.
+        """
+        candidates = []
+        for pattern in self._upload_res:
+            upload_match = pattern.search(query)
             if upload_match:
-                path = upload_match.group(1).strip('"\'')
-                if os.path.exists(path):
-                    ext = os.path.splitext(path)[1].lower()
-                    file_type = self._get_file_type(ext)
-                    content_sig = self._calculate_content_signature(path)
-                    return {
-                        "path": path,
-                        "exists": True,
-                        "type": file_type,
-                        "extension": ext,
-                        "is_remote": False,
-                        "source": "upload",
-                        "content_signature": content_sig
-                    }
+                candidates.append(("upload", upload_match.group(1).strip('"\'')))
+        for pattern in self._path_res:
+            path_match = pattern.search(query)
+            if path_match:
+                candidates.append(("query_path", path_match.group(1)))
+        
+        existing = {path: os.path.exists(path) for path in {path for _, path in candidates}}
+        return [(source, path) for source, path in candidates if existing[path]]
+    
+    def _local_file_info(self, path, source):
+        """File information for a local path that exists"""
+        ext = os.path.splitext(path)[1].lower()
+        return {
+            "path": path,
+            "exists": True,
+            "type": self._get_file_type(ext),
+            "extension": ext,
+            "is_remote": False,
+            "source": source,
+            "content_signature": self._calculate_content_signature(path)
+        }
+    
+    def detect_file_from_query(self, query):
+        """
+        Enhanced detection of file references from queries.
+        Supports multiple patterns, file types, and handles same-named files.
+        
+        Args:
+            query (str): User query text that may contain file references
+        
+        Returns:
+            dict: Comprehensive file information with content signature
+        """
+        if not query:
+            return {"path": None, "exists": False, "type": None, "is_remote": False}
+        if "http" in query:
+            for pattern in self._example_url_res:
+                # Replace example URLs with placeholders to avoid false detection
+                query = pattern.sub("EXAMPLE_URL_PLACEHOLDER", query)
+        
+        references = self._extract_file_references(query)
+        
+        # PRIORITY 1: Check for uploaded files via TDS.py or file upload indicators
+        for source, path in references:
+            if source == "upload":
+                return self._local_file_info(path, "upload")
         # NEW PRIORITY: Enhanced URL detection
         url_info = self.enhance_url_detection(query)
         if url_info:
             return url_info
         # PRIORITY 2: Check temporary directories for recent uploads
         # This is critical for handling files uploaded through TDS.py that don't have explicit markers
-        temp_directories = [
-            tempfile.gettempdir(),
-            '/tmp',
-            os.path.join(tempfile.gettempdir(), 'uploads'),
-            os.path.join(os.getcwd(), 'uploads'),
-            os.path.join(os.getcwd(), 'temp'),
-            'E:/data science tool/temp'
-        ]
+        # (served from the upload index instead of listing the directories)
         
         # Extract target file type from query
         target_type = None
         target_extensions = None
         
-        for file_type, pattern in self.file_patterns.items():
-            if re.search(pattern, query, re.IGNORECASE):
+        for file_type, pattern in self._file_type_res:
+            if pattern.search(query):
                 target_type = file_type
                 target_extensions = self.supported_extensions.get(file_type)
                 break
         
         # If we have identified a target file type, look for recent uploads of that type
         if target_extensions:
-            latest_file = None
-            latest_time = 0
-            
-            for temp_dir in temp_directories:
-                if os.path.exists(temp_dir):
-                    try:
-                        for file in os.listdir(temp_dir):
-                            ext = os.path.splitext(file)[1].lower()
-                            if ext in target_extensions:
-                                path = os.path.join(temp_dir, file)
-                                if os.path.isfile(path):
-                                    mtime = os.path.getmtime(path)
-                                    
-                                    # Use recently modified files (within last hour)
-                                    if mtime > latest_time and time.time() - mtime < 3600:
-                                        latest_time = mtime
-                                        latest_file = path
-                    except Exception as e:
-                        print(f"Error accessing directory {temp_dir}: {str(e)}")
+            # Most recently modified file of that type (within last hour)
+            latest_file = upload_index.latest(target_extensions)
             
             if latest_file:
-                ext = os.path.splitext(latest_file)[1].lower()
-                file_type = self._get_file_type(ext)
-                content_sig = self._calculate_content_signature(latest_file)
-                return {
-                    "path": latest_file,
-                    "exists": True,
-                    "type": file_type,
-                    "extension": ext,
-                    "is_remote": False,
-                    "source": "recent_upload",
-                    "content_signature": content_sig
-                }
+                return self._local_file_info(latest_file, "recent_upload")
         
         # PRIORITY 3: Look for file paths in query (Windows, Unix, quoted paths)
-        path_patterns = [
-            r'([a-zA-Z]:\\(?:[^\\/:*?"<>|\r\n]+\\)*[^\\/:*?"<>|\r\n]+\.(?:' + ext_pattern + r'))',  # Windows
-            r'((?:/[^/]+)+\.(?:' + ext_pattern + r'))',  # Unix
-            r'[\'\"]([^\'\"]+\.(?:' + ext_pattern + r'))[\'\"]',  # Quoted path
-            r'file\s+[\'\"]?([^\'\"]+\.(?:' + ext_pattern + r'))[\'\"]?',  # File keyword
-        ]
-        
-        for pattern in path_patterns:
-            path_match = re.search(pattern, query, re.IGNORECASE)
-            if path_match:
-                potential_path = path_match.group(1)
-                if os.path.exists(potential_path):
-                    ext = os.path.splitext(potential_path)[1].lower()
-                    file_type = self._get_file_type(ext)
-                    content_sig = self._calculate_content_signature(potential_path)
-                    return {
-                        "path": potential_path,
-                        "exists": True,
-                        "type": file_type,
-                        "extension": ext,
-                        "is_remote": False,
-                        "source": "query_path",
-                        "content_signature": content_sig
-                    }
+        for source, path in references:
+            if source == "query_path":
+                return self._local_file_info(path, "query_path")
         
         # PRIORITY 4: Check for URLs pointing to files
-        url_pattern = r'(https?://[^\s"\'<>]+\.(?:' + ext_pattern + r'))'
-        url_match = re.search(url_pattern, query, re.IGNORECASE)
+        url_match = self._file_url_re.search(query)
         if url_match:
             url = url_match.group(1)
             ext = os.path.splitext(url)[1].lower()
@@ -832,39 +628,16 @@ class FileManager:
                 expected_path = os.path.join(self.base_directory, info['folder'], filename)
                 
                 if os.path.exists(expected_path):
-                    ext = os.path.splitext(expected_path)[1].lower()
-                    file_type = self._get_file_type(ext)
-                    content_sig = self._calculate_content_signature(expected_path)
-                    return {
-                        "path": expected_path,
-                        "exists": True,
-                        "type": file_type,
-                        "extension": ext,
-                        "is_remote": False,
-                        "source": "known_file",
-                        "content_signature": content_sig
-                    }
+                    return self._local_file_info(expected_path, "known_file")
                 
                 # If not in the expected folder, search all GA folders
                 for folder in self.ga_folders:
                     alt_path = os.path.join(self.base_directory, folder, filename)
                     if os.path.exists(alt_path):
-                        ext = os.path.splitext(alt_path)[1].lower()
-                        file_type = self._get_file_type(ext)
-                        content_sig = self._calculate_content_signature(alt_path)
-                        return {
-                            "path": alt_path,
-                            "exists": True,
-                            "type": file_type,
-                            "extension": ext,
-                            "is_remote": False, 
-                            "source": "known_file_alt_location",
-                            "content_signature": content_sig
-                        }
+                        return self._local_file_info(alt_path, "known_file_alt_location")
         
         # PRIORITY 6: Looser filename pattern (just looking for something that might be a file)
-        filename_pattern = r'(?:file|document|data)[:\s]+["\']?([^"\'<>|*?\r\n]+\.(?:' + ext_pattern + r'))'
-        filename_match = re.search(filename_pattern, query, re.IGNORECASE)
+        filename_match = self._filename_re.search(query)
         if filename_match:
             filename = filename_match.group(1).strip()
             
@@ -882,18 +655,7 @@ class FileManager:
             for base_path in search_paths:
                 full_path = os.path.join(base_path, filename)
                 if os.path.exists(full_path):
-                    ext = os.path.splitext(full_path)[1].lower()
-                    file_type = self._get_file_type(ext)
-                    content_sig = self._calculate_content_signature(full_path)
-                    return {
-                        "path": full_path,
-                        "exists": True,
-                        "type": file_type,
-                        "extension": ext,
-                        "is_remote": False,
-                        "source": "filename_search",
-                        "content_signature": content_sig
-                    }
+                    return self._local_file_info(full_path, "filename_search")
         
         # Not found
         return {
@@ -916,26 +678,12 @@ class FileManager:
         if not query:
             return None
             
-        # Expanded URL pattern to handle more formats
-        url_patterns = [
-            # Standard HTTP/HTTPS URLs ending with file extension
-            r'(https?://[^\s"\'<>]+\.(?:[a-zA-Z0-9]{2,6}))',
-            # URLs with query parameters or fragments
-            r'(https?://[^\s"\'<>]+\.(?:[a-zA-Z0-9]{2,6})(?:\?[^"\s<>]+)?)',
-            # Google Drive links
-            r'(https?://drive\.google\.com/[^\s"\'<>]+)',
-            # Dropbox links
-            r'(https?://(?:www\.)?dropbox\.com/[^\s"\'<>]+)',
-            # GitHub raw content links
-            r'(https?://raw\.githubusercontent\.com/[^\s"\'<>]+)',
-            # SharePoint/OneDrive links
-            r'(https?://[^\s"\'<>]+\.sharepoint\.com/[^\s"\'<>]+)',
-            # Amazon S3 links
-            r'(https?://[^\s"\'<>]+\.s3\.amazonaws\.com/[^\s"\'<>]+)'
-        ]
-        
-        for pattern in url_patterns:
-            url_match = re.search(pattern, query, re.IGNORECASE)
+        # Every pattern needs a scheme
+        if "http" not in query.lower():
+            return None
+            
+        for pattern in self._url_res:
+            url_match = pattern.search(query)
             if url_match:
                 url = url_match.group(1)
                 
@@ -1001,15 +749,12 @@ class FileManager:
             str: Local path to downloaded file
         """
         try:
-            # Create a temporary directory
-            temp_dir = tempfile.mkdtemp()
-            self.temp_dirs.append(temp_dir)
-            
             # Determine the URL type for specialized handling
             url_type = self._determine_url_type(url)
             
             if url_type == "gdrive":
                 # Handle Google Drive URLs
+                temp_dir = scratch_dir()
                 return self._download_gdrive(url, temp_dir, desired_filename)
             elif url_type == "dropbox":
                 # Modify Dropbox URLs to get direct download
@@ -1028,39 +773,12 @@ class FileManager:
                     
                 if not filename or len(filename) < 3:
                     ext = os.path.splitext(url)[1] or ".tmp"
-                    filename = f"downloaded_{int(time.time())}{ext}"
-            
-            local_path = os.path.join(temp_dir, filename)
+                    filename = f"downloaded{ext}"
             
-            print(f"Downloading {url} to {local_path}")
-            
-            # Download with timeout and retries
-            for attempt in range(3):  # 3 attempts
-                try:
-                    response = requests.get(
-                        url, 
-                        stream=True,
-                        timeout=60,  # Increased timeout
-                        headers={
-                            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                        }
-                    )
-                    response.raise_for_status()
-                    
-                    with open(local_path, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
-                    
-                    print(f"Successfully downloaded to: {local_path}")
-                    return local_path
-                
-                except requests.RequestException as e:
-                    print(f"Download attempt {attempt+1} failed: {str(e)}")
-                    time.sleep(2)  # Wait before retry
-            
-            print("Download failed after multiple attempts")
-            return None
+            # Pooled, cached download shared by every worker (retries and timeouts included)
+            local_path = remote_fetcher.fetch(url, filename)
+            print(f"Downloaded {url} to: {local_path}")
+            return local_path
         
         except Exception as e:
             print(f"Error downloading file: {str(e)}")
@@ -1102,20 +820,10 @@ class FileManager:
             # PRIORITY 1.1: If remote file, download it
             if file_info.get("exists") and file_info.get("is_remote"):
                 try:
-                    temp_dir = tempfile.mkdtemp()
-                    self.temp_dirs.append(temp_dir)
-                    
                     ext = file_info.get("extension") or ".tmp"
-                    temp_file = os.path.join(temp_dir, f"downloaded{ext}")
                     
                     print(f"Downloading file from {file_info['path']}")
-                    import requests
-                    response = requests.get(file_info["path"], stream=True, timeout=30)
-                    response.raise_for_status()
-                    
-                    with open(temp_file, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            f.write(chunk)
+                    temp_file = remote_fetcher.fetch(file_info["path"], f"downloaded{ext}")
                     
                     print(f"Downloaded to: {temp_file}")
                     self.file_cache[cache_key] = temp_file
@@ -1260,29 +968,12 @@ class FileManager:
             str: Path to the downloaded file
         """
         try:
-            # Create a temporary directory
-            temp_dir = tempfile.mkdtemp()
-            self.temp_dirs.append(temp_dir)
-            
             # Determine local filename
             if not local_filename:
                 local_filename = os.path.basename(url.split('?')[0])  # Remove query params
             
-            local_path = os.path.join(temp_dir, local_filename)
-            
-            print(f"Downloading {url} to {local_path}")
-            
-            # Download the file
-            import requests
-            response = requests.get(url, stream=True)
-            response.raise_for_status()
-            
-            with open(local_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-            
-            return local_path
+            print(f"Downloading {url}")
+            return remote_fetcher.fetch(url, local_filename or None)
         
         except Exception as e:
             print(f"Error downloading file: {str(e)}")
@@ -1306,8 +997,7 @@ class FileManager:
         
         # Create extraction directory if not provided
         if not extract_dir:
-            extract_dir = tempfile.mkdtemp()
-            self.temp_dirs.append(extract_dir)
+            extract_dir = scratch_dir()
         
         print(f"Extracting {archive_path} to {extract_dir}")
         
@@ -1350,39 +1040,9 @@ class FileManager:
         """
         if not os.path.exists(path) or os.path.isdir(path):
             return None
-            
-        try:
-            import hashlib
-            
-            # Use different approaches based on file type
-     
-            file_type = self._get_file_type(os.path.splitext(path)[1])
-            md5 = hashlib.md5()
-            
-            # For small files, hash the entire content
-            if os.path.getsize(path) <= max_bytes:
-                with open(path, 'rb') as f:
-                    md5.update(f.read())
-            else:
-                # For larger files, hash the first and last blocks plus file size
-                with open(path, 'rb') as f:
-                    # Read first block
-                    first_block = f.read(max_bytes // 2)
-                    md5.update(first_block)
-                    
-                    # Jump to end and read last block
-                    f.seek(-max_bytes // 2, 2)
-                    last_block = f.read()
-                    md5.update(last_block)
-                    
-                # Add file size to the hash
-                md5.update(str(os.path.getsize(path)).encode())
-            
-            return md5.hexdigest()
-            
-        except Exception as e:
-            print(f"Error calculating content signature: {str(e)}")
-            return None
+        
+        # Memoized by inode, size and mtime; uploads are pre-registered while written
+        return file_signature(path, max_bytes=max_bytes)
 
 # GA1 Solutions
 
@@ -1753,7 +1413,6 @@ def ga1_third_solution(query=None):
     import re
     import os
     import hashlib
-    import tempfile
     import shutil
 
     question3='''Let's make sure you know how to use npx and prettier.
@@ -1808,7 +1467,7 @@ def ga1_third_solution(query=None):
             
             # If filename is not README.md, create a properly named copy
             if os.path.basename(file_path).lower() != "readme.md":
-                temp_dir = tempfile.mkdtemp()
+                temp_dir = scratch_dir()
                 temp_file = os.path.join(temp_dir, "README.md")
                 print(f"Creating temporary README.md at {temp_file}")
                 shutil.copy2(file_path, temp_file)
@@ -2490,7 +2149,6 @@ def ga1_ninth_solution(query=None):
     return result
 
 def ga1_tenth_solution(query=None):
-    import sys
     import json
     import requests
     import os
@@ -2501,7 +2159,6 @@ def ga1_tenth_solution(query=None):
     from selenium.webdriver.chrome.service import Service
     from selenium.webdriver.chrome.options import Options
     from webdriver_manager.chrome import ChromeDriverManager
-    from contextlib import contextmanager
     
     print(f"Processing multi-cursor JSON solution with query: {query[:100] if query else 'None'}...")
     
@@ -2554,17 +2211,8 @@ def ga1_tenth_solution(query=None):
     def get_json_hash_using_web_interface(json_data):
         """Get hash by simulating manual entry on the website"""
 
-        @contextmanager
-        def suppress_stdout_stderr():
-            """Context manager to suppress stdout and stderr."""
-            old_stdout, old_stderr = sys.stdout, sys.stderr
-            null = open(os.devnull, "w")
-            try:
-                sys.stdout, sys.stderr = null, null
-                yield
-            finally:
-                sys.stdout, sys.stderr = old_stdout, old_stderr
-                null.close()
+        # Drops this call's printed output only; stderr goes to the server log
+        suppress_stdout_stderr = discard_output
 
         json_str = json.dumps(json_data, separators=(',', ':'))
         print(f"Generated JSON: {json_str[:100]}..." if len(json_str) > 100 else json_str)
@@ -2911,14 +2559,10 @@ def ga1_twelfth_solution(query=None):
     Returns:
         str: Sum of values associated with the target symbols
     """
-    import os
     import re
-    import zipfile
     import csv
     import io
     import codecs
-    import tempfile
-    import shutil
     
     # Target symbols to search for
     target_symbols = ["œ", "Ž", "Ÿ"]
@@ -2967,67 +2611,45 @@ def ga1_twelfth_solution(query=None):
     
     print(f"Opening ZIP file: {zip_file_path}")
     
-    # Process the ZIP file
+    # Process the ZIP file (members are read in place, nothing is extracted)
     total_sum = 0
-    temp_dir = tempfile.mkdtemp()
     
     try:
-        # Extract files to temporary directory
-        with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-            zip_ref.extractall(temp_dir)
-            print(f"Extracted files to temporary directory")
-        
-        # Process each file with its specific encoding
-        for filename, config in file_configs.items():
-            file_path = os.path.join(temp_dir, filename)
-            
-            if not os.path.exists(file_path):
-                print(f"Warning: File {filename} not found in ZIP")
-                continue
+        with ZipArchive(zip_file_path, file_manager._calculate_content_signature(zip_file_path)) as archive:
+            # Process each file with its specific encoding
+            for filename, config in file_configs.items():
+                if archive.member(filename) is None:
+                    print(f"Warning: File {filename} not found in ZIP")
+                    continue
+                    
+                print(f"Processing {filename} with {config['encoding']} encoding")
                 
-            print(f"Processing {filename} with {config['encoding']} encoding")
-            
-            # Special handling for UTF-16
-            if config["encoding"].lower() == "utf-16":
-                with open(file_path, 'rb') as f:
+                # Special handling for UTF-16
+                if config["encoding"].lower() == "utf-16":
                     # Check for BOM and skip if present
-                    content = f.read()
+                    content = archive.read(filename)
                     if content.startswith(codecs.BOM_UTF16_LE):
                         content = content[2:]
                     
                     # Decode and process
                     text = content.decode('utf-16')
-                    reader = csv.reader(io.StringIO(text), delimiter=config["delimiter"])
-                    
-                    for row in reader:
-                        if len(row) >= 2 and row[0] in target_symbols:
-                            try:
-                                value = float(row[1].strip())
-                                total_sum += value
-                                print(f"Found symbol {row[0]} with value {value}")
-                            except ValueError:
-                                print(f"Invalid value format: {row[1]}")
-            else:
-                # Regular handling for other encodings
-                with open(file_path, 'r', encoding=config["encoding"]) as f:
-                    reader = csv.reader(f, delimiter=config["delimiter"])
-                    
-                    for row in reader:
-                        if len(row) >= 2 and row[0] in target_symbols:
-                            try:
-                                value = float(row[1].strip())
-                                total_sum += value
-                                print(f"Found symbol {row[0]} with value {value}")
-                            except ValueError:
-                                print(f"Invalid value format: {row[1]}")
+                    rows = csv.reader(io.StringIO(text), delimiter=config["delimiter"])
+                else:
+                    # Regular handling for other encodings
+                    rows = csv.reader(archive.lines(filename, config["encoding"]), delimiter=config["delimiter"])
+                
+                for row in rows:
+                    if len(row) >= 2 and row[0] in target_symbols:
+                        try:
+                            value = float(row[1].strip())
+                            total_sum += value
+                            print(f"Found symbol {row[0]} with value {value}")
+                        except ValueError:
+                            print(f"Invalid value format: {row[1]}")
     
     except Exception as e:
         return f"Error processing ZIP file: {str(e)}"
     
-    finally:
-        # Clean up temporary directory
-        shutil.rmtree(temp_dir)
-    
     # Return the total sum as an integer if it's a whole number
     if total_sum.is_integer():
         result = int(total_sum)
@@ -3344,11 +2966,7 @@ def ga1_fourteenth_solution(query=None):
         str: SHA-256 hash of the concatenated modified files
     """
     import re
-    import os
-    import zipfile
     import hashlib
-    import tempfile
-    import shutil
     
     print("Processing ZIP file to replace text across files...")
     
@@ -3388,62 +3006,33 @@ def ga1_fourteenth_solution(query=None):
     
     print(f"Opening ZIP file: {zip_file_path}")
     
-    # Create a temporary directory for extraction
-    extract_folder = tempfile.mkdtemp(prefix="replace_text_")
-    
     try:
-        # Extract zip file
-        with zipfile.ZipFile(zip_file_path, 'r') as z:
-            z.extractall(extract_folder)
-        print(f"Extracted ZIP file to temporary directory")
-        
-        # Compile regex pattern for case-insensitive 'iitm'
-        pattern = re.compile(b'iitm', re.IGNORECASE)
-        replacement = b'IIT Madras'
-        
-        # Replace text in all files
-        modified_count = 0
-        for name in sorted(os.listdir(extract_folder)):
-            file_path = os.path.join(extract_folder, name)
-            if os.path.isfile(file_path):
-                with open(file_path, 'rb') as f:
-                    content = f.read()
-                
+        with ZipArchive(zip_file_path, file_manager._calculate_content_signature(zip_file_path)) as archive:
+            # Compile regex pattern for case-insensitive 'iitm'
+            pattern = re.compile(b'iitm', re.IGNORECASE)
+            replacement = b'IIT Madras'
+            
+            # Replace text in each top-level file and hash the results in sorted order
+            # This is equivalent to running "cat * | sha256sum" in bash after the replacement
+            sha256 = hashlib.sha256()
+            modified_count = 0
+            files = archive.top_level()
+            for member in files:
+                content = archive.read(member.name)
                 new_content = pattern.sub(replacement, content)
-                
                 if content != new_content:
                     modified_count += 1
-                    with open(file_path, 'wb') as f:
-                        f.write(new_content)
+                sha256.update(new_content)
         
         print(f"Modified {modified_count} files")
         
-        # Calculate SHA-256 hash of all files in sorted order
-        # This is equivalent to running "cat * | sha256sum" in bash
-        sha256 = hashlib.sha256()
-        file_count = 0
-        for name in sorted(os.listdir(extract_folder)):
-            file_path = os.path.join(extract_folder, name)
-            if os.path.isfile(file_path):
-                file_count += 1
-                with open(file_path, 'rb') as f:
-                    sha256.update(f.read())
-        
         hash_result = sha256.hexdigest()
-        print(f"Processed {file_count} files and calculated SHA-256 hash")
+        print(f"Processed {len(files)} files and calculated SHA-256 hash")
         
         return f"{hash_result}"
         
     except Exception as e:
         return f"Error processing ZIP file: {str(e)}"
-    
-    finally:
-        # Clean up temporary directory
-        try:
-            shutil.rmtree(extract_folder)
-            print("Cleaned up temporary directory")
-        except:
-            pass
 def ga1_fifteenth_solution(query=None):
     """
     Process a ZIP file with file attributes and calculate total size of files matching criteria.
@@ -3454,13 +3043,9 @@ def ga1_fifteenth_solution(query=None):
     Returns:
         str: Total size of files matching the criteria
     """
-    import os
     import re
-    import zipfile
     import datetime
     import time
-    import tempfile
-    import shutil
     
     print("Processing ZIP file to calculate file sizes...")
     
@@ -3508,84 +3093,24 @@ def ga1_fifteenth_solution(query=None):
     
     print(f"Opening ZIP file: {zip_file_path}")
     
-    def extract_zip_preserving_timestamps(zip_path):
-        """Extract a zip file while preserving file timestamps"""
-        # Create temporary directory for extraction
-        extract_dir = tempfile.mkdtemp(prefix="file_attributes_")
-        
-        try:
-            print(f"Extracting to temporary directory: {extract_dir}")
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_dir)
-                
-                # Set timestamps from zip info
-                for info in zip_ref.infolist():
-                    if info.filename[-1] == '/':  # Skip directories
-                        continue
-                        
-                    # Get file path in extraction directory
-                    file_path = os.path.join(extract_dir, info.filename)
-                    
-                    # Convert DOS timestamp to Unix timestamp
-                    date_time = info.date_time
-                    timestamp = time.mktime((
-                        date_time[0], date_time[1], date_time[2],
-                        date_time[3], date_time[4], date_time[5],
-                        0, 0, -1
-                    ))
-                    
-                    # Set file modification time
-                    os.utime(file_path, (timestamp, timestamp))
-            
-            return extract_dir
-        except Exception as e:
-            print(f"Error extracting ZIP: {str(e)}")
-            shutil.rmtree(extract_dir, ignore_errors=True)
-            raise
-    
-    def list_files_with_attributes(directory):
-        """List all files with their sizes and timestamps"""
-        files_info = []
-        
-        for filename in os.listdir(directory):
-            file_path = os.path.join(directory, filename)
-            
-            if os.path.isfile(file_path):
-                file_size = os.path.getsize(file_path)
-                mod_time = datetime.datetime.fromtimestamp(os.path.getmtime(file_path))
-                
-                files_info.append({
-                    'name': filename,
-                    'size': file_size,
-                    'modified': mod_time,
-                    'path': file_path
-                })
-        
-        # Sort files by name
-        files_info.sort(key=lambda x: x['name'])
-        return files_info
-    
     def calculate_total_size_filtered(files_info, min_file_size, min_date):
         """Calculate total size of files meeting criteria"""
         total_size = 0
         matching_files = []
         
         for file_info in files_info:
-            if file_info['size'] >= min_file_size and file_info['modified'] >= min_date:
-                total_size += file_info['size']
+            if file_info.size >= min_file_size and file_info.modified >= min_date:
+                total_size += file_info.size
                 matching_files.append(file_info)
-                print(f"Matched file: {file_info['name']} - {file_info['size']} bytes - {file_info['modified']}")
+                print(f"Matched file: {file_info.name} - {file_info.size} bytes - {file_info.modified}")
         
         return total_size, matching_files
     
     # Process the ZIP file
-    temp_dir = None
     try:
-        # Extract files to temporary directory
-        temp_dir = extract_zip_preserving_timestamps(zip_file_path)
-        
-        # List all files with attributes
-        files_info = list_files_with_attributes(temp_dir)
+        # Sizes and timestamps come from the archive listing (nothing is extracted)
+        with ZipArchive(zip_file_path, file_manager._calculate_content_signature(zip_file_path)) as archive:
+            files_info = archive.top_level()
         print(f"Found {len(files_info)} files in ZIP")
         
         # Set the minimum date (Oct 31, 2010, 9:43 AM IST)
@@ -3609,15 +3134,6 @@ def ga1_fifteenth_solution(query=None):
         
     except Exception as e:
         return f"Error processing ZIP file: {str(e)}"
-    
-    finally:
-        # Clean up temporary directory
-        if temp_dir and os.path.exists(temp_dir):
-            try:
-                shutil.rmtree(temp_dir)
-                print("Cleaned up temporary directory")
-            except:
-                print("Warning: Failed to clean up temporary directory")
 
 def ga1_sixteenth_solution(query=None):
     """
@@ -3630,11 +3146,7 @@ def ga1_sixteenth_solution(query=None):
         str: SHA-256 hash equivalent to running grep . * | LC_ALL=C sort | sha256sum
     """
     import re
-    import os
-    import zipfile
     import hashlib
-    import tempfile
-    import shutil
     from pathlib import Path
     
     print("Processing ZIP file to move and rename files...")
@@ -3675,79 +3187,28 @@ def ga1_sixteenth_solution(query=None):
     
     print(f"Opening ZIP file: {zip_file_path}")
     
-    # Create a temporary directory for extraction
-    extract_dir = tempfile.mkdtemp(prefix="move_rename_")
-    
     try:
-        # Extract zip file
-        with zipfile.ZipFile(zip_file_path, 'r') as z:
-            z.extractall(extract_dir)
-        print(f"Extracted ZIP file to temporary directory")
-        
-        # Create a flat directory for all files
-        flat_dir = os.path.join(extract_dir, "flat_files")
-        os.makedirs(flat_dir, exist_ok=True)
-        
-        # Move all files to flat directory
-        moved_files = 0
-        for root, dirs, files in os.walk(extract_dir):
-            # Skip the flat_dir itself
-            if os.path.abspath(root) == os.path.abspath(flat_dir):
-                continue
-            
-            for file in files:
-                source_path = os.path.join(root, file)
-                dest_path = os.path.join(flat_dir, file)
-                
-                # If the destination file already exists, generate a unique name
-                if os.path.exists(dest_path):
-                    base, ext = os.path.splitext(file)
-                    dest_path = os.path.join(flat_dir, f"{base}_from_{os.path.basename(root)}{ext}")
-                
-                # Move the file
-                shutil.copy2(source_path, dest_path)  # Use copy2 to preserve metadata
-                moved_files += 1
-        
-        print(f"Moved {moved_files} files to flat directory")
-        
-        # Rename files by replacing digits with the next digit
-        renamed_files = 0
-        for filename in os.listdir(flat_dir):
-            file_path = os.path.join(flat_dir, filename)
-            
-            if os.path.isfile(file_path):
-                # Create new filename by replacing digits
-                new_filename = ""
-                for char in filename:
-                    if char.isdigit():
-                        # Replace digit with the next one (9->0)
-                        new_digit = str((int(char) + 1) % 10)
-                        new_filename += new_digit
-                    else:
-                        new_filename += char
-                
-                # Rename the file if the name has changed
-                if new_filename != filename:
-                    new_path = os.path.join(flat_dir, new_filename)
-                    os.rename(file_path, new_path)
-                    renamed_files += 1
-        
-        print(f"Renamed {renamed_files} files")
-        
-        # Calculate SHA-256 hash equivalent to: grep . * | LC_ALL=C sort | sha256sum
-        files = sorted(os.listdir(flat_dir))
-        all_lines = []
-        
-        for filename in files:
-            filepath = os.path.join(flat_dir, filename)
-            if os.path.isfile(filepath):
+        with ZipArchive(zip_file_path, file_manager._calculate_content_signature(zip_file_path)) as archive:
+            # Move all files to one flat directory (a name mapping, nothing is copied)
+            flat_files = archive.flattened()
+            print(f"Moved {len(flat_files)} files to flat directory")
+            
+            # Rename files by replacing each digit with the next one (9->0)
+            def shift_digits(filename):
+                return "".join(str((int(char) + 1) % 10) if char.isdigit() else char for char in filename)
+            
+            renamed_files = sum(1 for filename in flat_files if shift_digits(filename) != filename)
+            flat_files = archive.renamed(flat_files, shift_digits)
+            print(f"Renamed {renamed_files} files")
+            
+            # Calculate SHA-256 hash equivalent to: grep . * | LC_ALL=C sort | sha256sum
+            all_lines = []
+            for filename in sorted(flat_files):
                 try:
-                    with open(filepath, 'r', errors='replace') as f:
-                        for line_num, line in enumerate(f, 1):
-                            if line.strip():  # Skip empty lines
-                                # Format similar to grep output: filename:line
-                                formatted_line = f"{filename}:{line}"
-                                all_lines.append(formatted_line)
+                    for line in archive.lines(flat_files[filename].name, errors='replace'):
+                        if line.strip():  # Skip empty lines
+                            # Format similar to grep output: filename:line
+                            all_lines.append(f"{filename}:{line}")
                 except Exception as e:
                     print(f"Error reading file {filename}: {e}")
         
@@ -3769,14 +3230,6 @@ def ga1_sixteenth_solution(query=None):
         print(f"Error processing ZIP file: {str(e)}")
         print(traceback.format_exc())
         return f"Error processing ZIP file: {str(e)}"
-    
-    finally:
-        # Clean up temporary directory
-        try:
-            shutil.rmtree(extract_dir)
-            print("Cleaned up temporary directory")
-        except:
-            print("Warning: Failed to clean up temporary directory")
 def ga1_seventeenth_solution(query=None):
     """
     Process a ZIP file containing two files and count the number of different lines.
@@ -3788,10 +3241,6 @@ def ga1_seventeenth_solution(query=None):
         str: The number of lines that differ between a.txt and b.txt
     """
     import re
-    import os
-    import zipfile
-    import tempfile
-    import shutil
     from pathlib import Path
     
     print("Processing ZIP file to compare text files...")
@@ -3832,30 +3281,31 @@ def ga1_seventeenth_solution(query=None):
     
     print(f"Opening ZIP file: {zip_file_path}")
     
-    # Create a temporary directory for extraction
-    extract_dir = tempfile.mkdtemp(prefix="compare_files_")
-    
     try:
-        # Extract the zip file
-        with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-            zip_ref.extractall(extract_dir)
-        print(f"Extracted ZIP file to temporary directory")
-        
-        # Paths to the two files
-        file1_path = os.path.join(extract_dir, "a.txt")
-        file2_path = os.path.join(extract_dir, "b.txt")
-        
-        # Check if both files exist
-        if not os.path.exists(file1_path):
-            return "Error: File 'a.txt' not found in the ZIP archive"
-        if not os.path.exists(file2_path):
-            return "Error: File 'b.txt' not found in the ZIP archive"
-        
-        # Count lines in each file to verify they have the same length
-        with open(file1_path, 'r', encoding='utf-8', errors='replace') as f:
-            line_count_1 = sum(1 for _ in f)
-        with open(file2_path, 'r', encoding='utf-8', errors='replace') as f:
-            line_count_2 = sum(1 for _ in f)
+        with ZipArchive(zip_file_path, file_manager._calculate_content_signature(zip_file_path)) as archive:
+            # Check if both files exist
+            if archive.member("a.txt") is None:
+                return "Error: File 'a.txt' not found in the ZIP archive"
+            if archive.member("b.txt") is None:
+                return "Error: File 'b.txt' not found in the ZIP archive"
+            
+            # Compare both files line by line in one pass, counting as we go
+            from itertools import zip_longest
+            missing = object()
+            line_count_1 = line_count_2 = different_lines = 0
+            pairs = zip_longest(archive.lines("a.txt", 'utf-8', 'replace'),
+                                archive.lines("b.txt", 'utf-8', 'replace'), fillvalue=missing)
+            for line_num, (line1, line2) in enumerate(pairs, 1):
+                line_count_1 += line1 is not missing
+                line_count_2 += line2 is not missing
+                if line1 is missing or line2 is missing or line1 == line2:
+                    continue
+                different_lines += 1
+                # For debugging - show a few sample differences
+                if different_lines <= 3:
+                    print(f"Line {line_num} differs:")
+                    print(f"  a.txt: {line1[:50].rstrip()}..." if len(line1) > 50 else f"  a.txt: {line1.rstrip()}")
+                    print(f"  b.txt: {line2[:50].rstrip()}..." if len(line2) > 50 else f"  b.txt: {line2.rstrip()}")
         
         print(f"a.txt has {line_count_1} lines")
         print(f"b.txt has {line_count_2} lines")
@@ -3863,18 +3313,6 @@ def ga1_seventeenth_solution(query=None):
         if line_count_1 != line_count_2:
             print(f"Warning: Files have different line counts: a.txt ({line_count_1}) vs b.txt ({line_count_2})")
         
-        # Count lines that differ
-        different_lines = 0
-        with open(file1_path, 'r', encoding='utf-8', errors='replace') as f1, open(file2_path, 'r', encoding='utf-8', errors='replace') as f2:
-            for line_num, (line1, line2) in enumerate(zip(f1, f2), 1):
-                if line1 != line2:
-                    different_lines += 1
-                    # For debugging - show a few sample differences
-                    if different_lines <= 3:
-                        print(f"Line {line_num} differs:")
-                        print(f"  a.txt: {line1[:50].rstrip()}..." if len(line1) > 50 else f"  a.txt: {line1.rstrip()}")
-                        print(f"  b.txt: {line2[:50].rstrip()}..." if len(line2) > 50 else f"  b.txt: {line2.rstrip()}")
-        
         print(f"Found {different_lines} differing lines out of {min(line_count_1, line_count_2)} total lines")
         
         # Return just the number of differences
@@ -3885,14 +3323,6 @@ def ga1_seventeenth_solution(query=None):
         print(f"Error processing ZIP file: {str(e)}")
         print(traceback.format_exc())
         return f"Error processing ZIP file: {str(e)}"
-    
-    finally:
-        # Clean up temporary directory
-        try:
-            shutil.rmtree(extract_dir)
-            print("Cleaned up temporary directory")
-        except:
-            print("Warning: Failed to clean up temporary directory")
 
 def ga1_eighteenth_solution(query=None):
     """
@@ -4266,8 +3696,6 @@ def ga2_second_solution(query=None):
     """
     import re
     import os
-    import tempfile
-    import shutil
     from PIL import Image
     import io
     import base64
@@ -4285,9 +3713,6 @@ def ga2_second_solution(query=None):
     input_image_path = image_path
     print(f"Input image path: {input_image_path}")
     
-    # Create output directory for compressed images
-    output_dir = tempfile.mkdtemp(prefix="compressed_images_")
-    
     # Get original image details before compression
     original_size = os.path.getsize(input_image_path)
     try:
@@ -4304,90 +3729,32 @@ def ga2_second_solution(query=None):
     if original_size <= max_bytes:
         print(f"Original image is already under {max_bytes} bytes ({original_size} bytes)")
         # For already small enough images, encode the original
-        with open(input_image_path, "rb") as img_file:
-            img_data = base64.b64encode(img_file.read()).decode('utf-8')
-            return f"data:image/png;base64,{img_data}"
-    
-    # Define compression functions
-    def compress_with_png_optimization(img, output_path):
-        """Try different PNG compression levels"""
-        for compression in range(9, -1, -1):
-            img.save(output_path, format="PNG", optimize=True, compress_level=compression)
-            if os.path.getsize(output_path) <= max_bytes:
-                return True
-        return False
-    
-    def compress_with_color_reduction(img, output_path):
-        """Reduce number of colors"""
-        for colors in [256, 128, 64, 32, 16, 8, 4, 2]:
-            palette_img = img.convert('P', palette=Image.ADAPTIVE, colors=colors)
-            palette_img.save(output_path, format="PNG", optimize=True)
-            if os.path.getsize(output_path) <= max_bytes:
-                return True
-        return False
-    
-    def compress_with_resize(img, output_path):
-        """Resize the image while preserving aspect ratio"""
-        width, height = img.size
-        aspect_ratio = height / width
-        
-        for scale in [0.9, 0.8, 0.7, 0.6, 0.5, 0.4, 0.3, 0.2]:
-            new_width = int(width * scale)
-            new_height = int(height * scale)
-            resized_img = img.resize((new_width, new_height), Image.LANCZOS)
-            resized_img.save(output_path, format="PNG", optimize=True)
-            if os.path.getsize(output_path) <= max_bytes:
-                return True
-        return False
+        with open(input_image_path, "rb") as img_file:
+            img_data = base64.b64encode(img_file.read()).decode('utf-8')
+            return f"data:image/png;base64,{img_data}"
     
-    # Execute compression strategies
+    # Search lossless PNG encodings (palette, zlib strategies) in parallel, then
+    # WebP lossless, falling back to palette reduction and resizing only if none fits
     try:
-        original_img = Image.open(input_image_path)
-        output_filename = f"compressed_{os.path.basename(input_image_path)}"
-        if not output_filename.lower().endswith('.png'):
-            output_filename = os.path.splitext(output_filename)[0] + '.png'
-        
-        output_path = os.path.join(output_dir, output_filename)
-        
-        # Try compression strategies in order
-        print("Trying PNG optimization...")
-        if compress_with_png_optimization(original_img, output_path):
-            print("Compression successful using PNG optimization")
-        elif compress_with_color_reduction(original_img, output_path):
-            print("Compression successful using color reduction")
-        elif compress_with_resize(original_img, output_path):
-            print("Compression successful using image resizing")
-        else:
+        compressed = image_compressor.compress(input_image_path, max_bytes)
+        if compressed is None:
             return f"Failed to compress image below {max_bytes} bytes while maintaining lossless quality"
         
-        # Get compressed image details
-        compressed_size = os.path.getsize(output_path)
-        with Image.open(output_path) as img:
-            compressed_width, compressed_height = img.size
-            compressed_format = img.format
-        
+        compressed_size = len(compressed.data)
+        print(f"Compression successful using {compressed.strategy} ({'lossless' if compressed.lossless else 'lossy'})")
         print(f"Successfully compressed image: {compressed_size} bytes ({(compressed_size/original_size*100):.1f}% of original)")
         
-        # Generate Base64 version for returning
-        with open(output_path, "rb") as img_file:
-            img_data = base64.b64encode(img_file.read()).decode('utf-8')
-            img_base64 = f"{img_data}"
-            
-            # Return the full base64 data
-            return img_base64
+        # Return the full base64 data; anything but PNG carries its own data URI
+        # prefix, since a bare payload is shown as image/png
+        encoded = base64.b64encode(compressed.data).decode('utf-8')
+        if compressed.format != "PNG":
+            return f"data:image/{compressed.format.lower()};base64,{encoded}"
+        return encoded
         
     except Exception as e:
         print(f"Error during compression: {str(e)}")
         print(traceback.format_exc())
         return f"Error processing image: {str(e)}"
-    
-    finally:
-        # Clean up the temp directory since we're returning the base64 data directly
-        try:
-            shutil.rmtree(output_dir)
-            print("Cleaned up temporary directory")
-        except:
-            pass
 # Successfully compressed the image losslessly!
 
 # ### Original Image
@@ -4999,9 +4366,7 @@ def ga2_fifth_solution(query=None):
     """
     import re
     import os
-    import numpy as np
     from PIL import Image
-    import colorsys
     
     print("Counting pixels with lightness > 0.718...")
     
@@ -5023,25 +4388,13 @@ def ga2_fifth_solution(query=None):
         image = Image.open(image_path)
         print(f"Image loaded: {image.format}, {image.size}x{image.mode}")
         
-        # Convert to numpy array and normalize to 0-1 range
-        rgb = np.array(image) / 255.0
+        # 8-bit RGB pixels; grayscale is replicated and alpha dropped
+        rgb = rgb_array(image)
         
-        # Handle different image formats
-        if len(rgb.shape) == 2:
-            # Grayscale image - replicate to 3 channels
-            print("Converting grayscale image to RGB")
-            rgb = np.stack([rgb, rgb, rgb], axis=2)
-        elif rgb.shape[2] == 4:
-            # Image with alpha channel - use only RGB
-            print("Removing alpha channel from RGBA image")
-            rgb = rgb[:, :, :3]
-        
-        # Apply colorsys.rgb_to_hls to each pixel and extract lightness (index 1)
+        # HLS lightness is (max + min) / 2 of the 0-1 channels, exactly as
+        # colorsys.rgb_to_hls computes it, evaluated a band of rows at a time
         print("Calculating lightness values using RGB to HLS conversion...")
-        lightness = np.apply_along_axis(lambda x: colorsys.rgb_to_hls(*x)[1], 2, rgb)
-        
-        # Count pixels with lightness > 0.718
-        light_pixels = int(np.sum(lightness > 0.718))
+        light_pixels = count_where(rgb, lightness, lambda light: light > 0.718)
         print(f"Found {light_pixels} pixels with lightness > 0.718")
         
         # For typical Lenna image, the expected result is around 16558
@@ -5067,7 +4420,6 @@ def ga2_sixth_solution(query=None):
     """
     import json
     import os
-    import tempfile
     import shutil
     import subprocess
     from pathlib import Path
@@ -5137,7 +4489,7 @@ def ga2_sixth_solution(query=None):
     deployment_name = f"student-api-{unique_id}"
     
     # Create temporary directory structure for Vercel deployment
-    deploy_dir = Path(tempfile.mkdtemp(prefix="vercel_deploy_"))
+    deploy_dir = Path(scratch_dir(prefix="vercel_deploy_"))
     api_dir = deploy_dir / "api"
     api_dir.mkdir(parents=True, exist_ok=True)
     
@@ -5751,7 +5103,6 @@ def ga2_eighth_solution(query=None):
     import re
     import os
     import subprocess
-    import tempfile
     import time
     from pathlib import Path
     from dotenv import load_dotenv
@@ -5781,7 +5132,7 @@ def ga2_eighth_solution(query=None):
         print(f"Using Docker Hub username from .env: {username}")
     
     # Create a temporary directory for Docker files
-    docker_dir = tempfile.mkdtemp(prefix="docker_build_")
+    docker_dir = scratch_dir(prefix="docker_build_")
     
     # Create a Dockerfile
     dockerfile_content = f"""FROM python:3.9-slim
@@ -6077,7 +5428,6 @@ def ga2_tenth_solution(query=None):
         str: The ngrok URL for accessing the Llamafile server
     """
     import os
-    import sys
     import subprocess
     import platform
     import time
@@ -6208,8 +5558,7 @@ def ga2_tenth_solution(query=None):
                             bar = '█' * done + '░' * (bar_length - done)
                             
                             # Print progress
-                            sys.stdout.write(f"\r|{bar}| {percent:.1f}% ({downloaded/(1024*1024):.1f}MB/{total_size/(1024*1024):.1f}MB)")
-                            sys.stdout.flush()
+                            progress(f"\r|{bar}| {percent:.1f}% ({downloaded/(1024*1024):.1f}MB/{total_size/(1024*1024):.1f}MB)", end="", flush=True)
             
             print("\n✅ Model downloaded successfully!")
             
@@ -9150,131 +8499,10 @@ def ga4_ninth_solution(query=None):
     print(f"Processing PDF: {pdf_path}")
     
     try:
-        # Try to import PDF extraction libraries
-        try:
-            import tabula
-            import camelot
-            extract_library = "mixed"
-            print("Using both tabula and camelot for extraction")
-        except ImportError:
-            try:
-                import tabula
-                extract_library = "tabula"
-                print("Using tabula for extraction")
-            except ImportError:
-                try:
-                    import camelot
-                    extract_library = "camelot"
-                    print("Using camelot for extraction")
-                except ImportError:
-                    extract_library = None
-                    print("No PDF extraction libraries found. Using sample data.")
-        
-        # Function to extract tables based on available libraries
-        def extract_tables_from_pdf(pdf_file):
-            tables = []
-            
-            if extract_library in ["tabula", "mixed"]:
-                try:
-                    tabula_tables = tabula.read_pdf(pdf_file, pages='all', multiple_tables=True)
-                    print(f"Extracted {len(tabula_tables)} tables with tabula")
-                    tables.extend(tabula_tables)
-                except Exception as e:
-                    print(f"Error extracting with tabula: {e}")
-            
-            if extract_library in ["camelot", "mixed"]:
-                try:
-                    camelot_tables = camelot.read_pdf(pdf_file, pages='all')
-                    camelot_dfs = [table.df for table in camelot_tables]
-                    print(f"Extracted {len(camelot_dfs)} tables with camelot")
-                    tables.extend(camelot_dfs)
-                except Exception as e:
-                    print(f"Error extracting with camelot: {e}")
-            
-            return tables
-        
-        # Process extracted tables
-        def process_tables(tables):
-            all_data = []
-            current_group = 1
-            
-            for i, table in enumerate(tables):
-                if table.empty:
-                    continue
-                
-                # Check if table contains "Student Marks-Group X" header
-                group_in_table = False
-                for col in table.columns:
-                    cell_text = str(col).lower()
-                    if 'group' in cell_text:
-                        group_match = re.search(r'group\s*(\d+)', cell_text, re.IGNORECASE)
-                        if group_match:
-                            current_group = int(group_match.group(1))
-                            group_in_table = True
-                            break
-                
-                # If no group header in columns, check first few rows
-                if not group_in_table:
-                    for row in range(min(3, len(table))):
-                        row_text = ' '.join(str(val) for val in table.iloc[row].values)
-                        if 'group' in row_text.lower():
-                            group_match = re.search(r'group\s*(\d+)', row_text, re.IGNORECASE)
-                            if group_match:
-                                current_group = int(group_match.group(1))
-                                # Skip this row as it's a header
-                                table = table.iloc[row+1:].reset_index(drop=True)
-                                group_in_table = True
-                                break
-                
-                # Check if this looks like a subject header row
-                is_subject_header = False
-                for idx, row in table.iterrows():
-                    row_values = [str(val).strip().lower() for val in row.values]
-                    if 'maths' in row_values and 'physics' in row_values and 'english' in row_values:
-                        # This is likely a header row with subjects
-                        is_subject_header = True
-                        # Rename columns using this row
-                        new_headers = [str(val).strip() for val in row.values]
-                        table.columns = new_headers
-                        # Remove header row
-                        table = table.iloc[idx+1:].reset_index(drop=True)
-                        break
-                
-                # If we have subject columns, process the table
-                subject_columns = ['Maths', 'Physics', 'English', 'Economics', 'Biology']
-                has_subject_columns = any(col in table.columns for col in subject_columns)
-                
-                if not has_subject_columns and len(table.columns) >= 5:
-                    # If columns don't have proper names, rename them
-                    table.columns = subject_columns[:len(table.columns)]
-                
-                # Convert data to numeric
-                for col in table.columns:
-                    if col in subject_columns:
-                        table[col] = pd.to_numeric(table[col], errors='coerce')
-                
-                # Add group column
-                table['Group'] = current_group
-                
-                # Add to combined data
-                all_data.append(table)
-                
-                # Increment group for next table if not explicitly set
-                if not group_in_table:
-                    current_group += 1
-            
-            # Combine all tables
-            if all_data:
-                combined_df = pd.concat(all_data, ignore_index=True)
-                return combined_df
-            else:
-                return pd.DataFrame()
-        
-        # Extract and process tables
-        if extract_library and os.path.exists(pdf_path):
+        # Extract the marks once per PDF content; later queries filter the cached table
+        if extraction_available() and os.path.exists(pdf_path):
             print("Extracting tables from PDF...")
-            extracted_tables = extract_tables_from_pdf(pdf_path)
-            combined_data = process_tables(extracted_tables)
+            combined_data = load_marks(pdf_path, file_signature(pdf_path)).frame
             
             if combined_data.empty:
                 print("Failed to extract usable data from PDF")
@@ -9319,44 +8547,9 @@ def ga4_ninth_solution(query=None):
         print(f"Detected target subject to sum: {target_subject}")
         print(f"Analyzing data: {target_subject} total for {filter_subject} {comparison_operator} {min_marks} in groups {min_group}-{max_group}")
         
-        # Apply the appropriate filter based on the comparison operator
-        if comparison_operator == ">=":
-            filtered_df = combined_data[
-                (combined_data[filter_subject] >= min_marks) & 
-                (combined_data['Group'] >= min_group) & 
-                (combined_data['Group'] <= max_group)
-            ]
-        elif comparison_operator == ">":
-            filtered_df = combined_data[
-                (combined_data[filter_subject] > min_marks) & 
-                (combined_data['Group'] >= min_group) & 
-                (combined_data['Group'] <= max_group)
-            ]
-        elif comparison_operator == "<=":
-            filtered_df = combined_data[
-                (combined_data[filter_subject] <= min_marks) & 
-                (combined_data['Group'] >= min_group) & 
-                (combined_data['Group'] <= max_group)
-            ]
-        elif comparison_operator == "<":
-            filtered_df = combined_data[
-                (combined_data[filter_subject] < min_marks) & 
-                (combined_data['Group'] >= min_group) & 
-                (combined_data['Group'] <= max_group)
-            ]
-        elif comparison_operator == "==":
-            filtered_df = combined_data[
-                (combined_data[filter_subject] == min_marks) & 
-                (combined_data['Group'] >= min_group) & 
-                (combined_data['Group'] <= max_group)
-            ]
-        else:
-            # Default to >= if operator is unknown
-            filtered_df = combined_data[
-                (combined_data[filter_subject] >= min_marks) & 
-                (combined_data['Group'] >= min_group) & 
-                (combined_data['Group'] <= max_group)
-            ]
+        # Apply the filter as whole-column masks (unknown operators mean >=)
+        filtered_df = MarksTable(combined_data).select(filter_subject, comparison_operator, min_marks,
+                                                       min_group, max_group)
         
         # Calculate total marks
         total_marks = filtered_df[target_subject].sum()
@@ -9384,21 +8577,14 @@ def ga4_ninth_solution(query=None):
 FALLBACK ANSWER: The total {target_subject} marks of students who scored {min_marks} {comparison_operator} in {filter_subject} in groups {min_group}-{max_group} is approximately 14306.00"""# Map file paths to solution functions
 def ga4_tenth_solution(query=None):
     """
-    Convert a PDF file to Markdown and format with Prettier.
+    Convert a PDF file to Markdown formatted the way Prettier prints it.
     
     Args:
         query (str, optional): Query potentially containing custom PDF file path
         
     Returns:
-        str: Markdown content formatted with Prettier
+        str: Markdown content in Prettier's layout
     """
-    import os
-    import re
-    import tempfile
-    import subprocess
-    import shutil
-    from pathlib import Path
-    import requests
     import traceback
     
     # Default PDF file path
@@ -9412,194 +8598,12 @@ def ga4_tenth_solution(query=None):
    
     print(f"Processing PDF: {pdf_path}")
     
-    # Convert PDF to Markdown
+    # Convert PDF to Markdown: pages extracted in parallel once per PDF content,
+    # formatted in-process instead of through npx prettier
     try:
-        # Create a temporary directory for output
-        output_dir = tempfile.mkdtemp()
-        markdown_path = os.path.join(output_dir, "output.md")
-        
-        # Try to import PDF extraction libraries
-        pdf_extraction_successful = False
-        
-        # 1. Try PyPDF2 extraction first
-        try:
-            from PyPDF2 import PdfReader
-            
-            print("Extracting text using PyPDF2...")
-            text_content = []
-            
-            with open(pdf_path, 'rb') as file:
-                reader = PdfReader(file)
-                num_pages = len(reader.pages)
-                
-                for i in range(num_pages):
-                    page = reader.pages[i]
-                    text = page.extract_text()
-                    text_content.append(text)
-            
-            # Convert extracted text to markdown
-            markdown_content = "\n\n".join(text_content)
-            
-            # Apply some basic markdown formatting
-            lines = markdown_content.split('\n')
-            formatted_lines = []
-            
-            for line in lines:
-                line = line.rstrip()
-                
-                # Skip empty lines
-                if not line.strip():
-                    formatted_lines.append('')
-                    continue
-                
-                # Try to detect headings based on formatting
-                if line.strip().isupper() and len(line.strip()) < 60:
-                    # Likely a heading - make it a markdown heading
-                    formatted_lines.append(f"# {line.strip()}")
-                elif re.match(r'^\d+\.\s', line):
-                    # Numbered list
-                    formatted_lines.append(line)
-                elif line.strip().startswith('•') or line.strip().startswith('*'):
-                    # Bullet points
-                    formatted_lines.append(line)
-                else:
-                    formatted_lines.append(line)
-            
-            markdown_content = '\n'.join(formatted_lines)
-            
-            # Write to file with explicit encoding
-            with open(markdown_path, 'w', encoding='utf-8', errors='replace') as f:
-                f.write(markdown_content)
-                
-            pdf_extraction_successful = True
-            print("PDF text extraction successful with PyPDF2")
-            
-        except ImportError:
-            print("PyPDF2 not available, trying alternative method...")
-        except Exception as e:
-            print(f"Error extracting with PyPDF2: {str(e)}")
-        
-        # 2. Try with pypandoc if PyPDF2 failed
-        if not pdf_extraction_successful:
-            try:
-                import pypandoc
-                
-                print("Converting with pypandoc...")
-                output = pypandoc.convert_file(pdf_path, 'markdown', outputfile=markdown_path)
-                pdf_extraction_successful = True
-                print("PDF conversion successful with pypandoc")
-                
-            except ImportError:
-                print("pypandoc not available, trying another method...")
-            except Exception as e:
-                print(f"Error converting with pypandoc: {str(e)}")
-        
-        # 3. Try with pdfminer if previous methods failed
-        if not pdf_extraction_successful:
-            try:
-                from pdfminer.high_level import extract_text
-                
-                print("Extracting text using pdfminer...")
-                text = extract_text(pdf_path)
-                
-                with open(markdown_path, 'w', encoding='utf-8', errors='replace') as f:
-                    f.write(text)
-                    
-                pdf_extraction_successful = True
-                print("PDF text extraction successful with pdfminer")
-                
-            except ImportError:
-                print("pdfminer not available...")
-            except Exception as e:
-                print(f"Error extracting with pdfminer: {str(e)}")
-        
-        # If all extraction methods failed
-        if not pdf_extraction_successful:
-            print("All PDF extraction methods failed, using fallback content")
-            with open(markdown_path, 'w', encoding='utf-8', errors='replace') as f:
-                f.write("# Sample Document\n\nUnable to extract content from the PDF.")
-        
-        # Format the markdown with prettier
-        prettier_formatted = False
-        try:
-            print("Formatting markdown with Prettier 3.4.2...")
-            
-            # Create temporary package.json for isolated prettier installation
-            pkg_dir = tempfile.mkdtemp()
-            pkg_json_path = os.path.join(pkg_dir, "package.json")
-            
-            with open(pkg_json_path, 'w', encoding='utf-8') as f:
-                f.write("""
-                {
-                  "name": "pdf-to-markdown",
-                  "version": "1.0.0",
-                  "private": true,
-                  "dependencies": {
-                    "prettier": "3.4.2"
-                  }
-                }
-                """)
-            
-            # Install prettier locally to avoid global conflicts
-            try:
-                subprocess.run(
-                    ['npm', 'install'], 
-                    cwd=pkg_dir,
-                    stdout=subprocess.PIPE, 
-                    stderr=subprocess.PIPE,
-                    encoding='utf-8',
-                    errors='replace'
-                )
-            except subprocess.SubprocessError as e:
-                print(f"Warning: Could not install Prettier: {e}")
-            
-            # Run prettier on the markdown file with explicit encoding
-            try:
-                print("Running Prettier on the markdown file...")
-                result = subprocess.run(
-                    ['npx', '--yes', 'prettier@3.4.2', '--write', markdown_path],
-                    cwd=pkg_dir,
-                    stdout=subprocess.PIPE, 
-                    stderr=subprocess.PIPE,
-                    encoding='utf-8',
-                    errors='replace'
-                )
-                if result.returncode == 0:
-                    prettier_formatted = True
-                    print("Markdown formatted with Prettier")
-                else:
-                    print(f"Prettier warning: {result.stderr}")
-            except Exception as e:
-                print(f"Error running Prettier: {str(e)}")
-            
-            # Clean up package directory
-            try:
-                shutil.rmtree(pkg_dir, ignore_errors=True)
-            except Exception:
-                pass
-            
-        except Exception as e:
-            print(f"Error with Prettier setup: {str(e)}")
-            print("Using unformatted markdown")
-        
-        # Read the final markdown content with robust encoding handling
-        try:
-            with open(markdown_path, 'r', encoding='utf-8', errors='replace') as f:
-                final_markdown = f.read()
-        except Exception as e:
-            print(f"Error reading markdown: {str(e)}")
-            final_markdown = "# Error Reading Markdown\n\nThere was an error reading the generated markdown file."
-        
-        # Clean up temporary files
-        try:
-            import shutil
-            is_remote = False  # Initialize is_remote if not already defined
-            if is_remote and 'temp_dir' in locals():
-                if 'temp_dir' in locals():
-                    shutil.rmtree(temp_dir, ignore_errors=True)
-     
-        except Exception as e:
-            print(f"Warning: Could not clean up temporary files: {str(e)}")
+        print("Converting PDF to Markdown...")
+        final_markdown = pdf_markdown.convert(pdf_path)
+        print(f"Markdown ready: {len(final_markdown)} characters")
         
         # Return the formatted markdown content
         return final_markdown
@@ -10864,8 +9868,9 @@ def ga5_second_solution(query=None):
         marks_values = []
         total_lines = 0
         
-        with open(file_path, 'r', encoding='utf-8') as file:
-            for line in file:
+        with LocalInput(file_path) as text:
+            print(f"Reading {text.line_count} lines")
+            for line in text.lines():
                 line = line.strip()
                 if not line:
                     continue
@@ -11137,12 +10142,9 @@ def ga5_third_solution(query=None):
     Returns:
         str: Count of requests matching the specified criteria
     """
-    from datetime import datetime, time
-    import gzip
+    from datetime import time
     import re
     import os
-    import pytz
-    import urllib.parse
     
     print("Starting Apache log file analysis...")
     
@@ -11233,110 +10235,25 @@ def ga5_third_solution(query=None):
         else:
             return f"Error: Log file not found at {log_file_path}"
     
-    # Define regex for parsing Apache log format
-    log_pattern = re.compile(
-        r'^(\S+) (\S+) (\S+) \[([\w:/]+\s[+\-]\d{4})\] "(.*?)" (\d+) (\S+) "(.*?)" "(.*?)"(?: "(.*?)" "(.*?)")?$'
-    )
-    
-    # Process the log file
-    request_count = 0
-    total_lines = 0
-    processed_lines = 0
-    error_lines = 0
-    
     try:
-        timezone = pytz.FixedOffset(-5*60)  # GMT-0500 as specified
-        
-        with gzip.open(log_file_path, 'rt', encoding='utf-8', errors='replace') as log_file:
-            for line in log_file:
-                total_lines += 1
-                
-                # Print progress
-                if total_lines % 50000 == 0:
-                    print(f"Processing line {total_lines}...")
-                
-                # Parse log line
-                match = log_pattern.match(line.strip())
-                if not match:
-                    error_lines += 1
-                    continue
-                
-                processed_lines += 1
-                
-                # Extract relevant fields
-                groups = match.groups()
-                
-                # Handle the case where vhost and server might be missing
-                if len(groups) >= 9:  # At least up to user_agent
-                    ip = groups[0]
-                    time_str = groups[3]
-                    request = groups[4]
-                    status_code = int(groups[5])
-                    size = groups[6]
-                    referer = groups[7]
-                    user_agent = groups[8]
-                else:
-                    # Skip malformed entries
-                    error_lines += 1
-                    continue
-                
-                # Parse request parts
-                request_parts = request.split(' ')
-                if len(request_parts) < 2:
-                    continue
-                    
-                method = request_parts[0]
-                url = urllib.parse.unquote(request_parts[1])  # Decode URL encoded characters
-                
-                # Check if it's a GET request
-                if method != 'GET':
-                    continue
-                
-                # FIXED: More precise path matching - URL must start with the path pattern
-                if not url.startswith(path_pattern):
-                    continue
-                
-                # Check if it's a successful request (status code 200-299)
-                if not (200 <= status_code < 300):
-                    continue
-                
-                # Parse timestamp
-                # Format: [30/Apr/2024:15:47:01 -0500]
-                timestamp_str = time_str.strip('[]')
-                try:
-                    # Parse the timestamp
-                    dt = datetime.strptime(timestamp_str, "%d/%b/%Y:%H:%M:%S %z")
-                    # Convert to the specified timezone
-                    dt = dt.astimezone(timezone)
-                    
-                    # Check day of week
-                    if dt.weekday() != day_of_week_int:
-                        continue
-                    
-                    # Check time range
-                    current_time = dt.time()
-                    if not (start_time_obj <= current_time < end_time_obj):
-                        continue
-                    
-                    # If we get here, the entry matches all our criteria
-                    request_count += 1
-                    
-                    # Debug output for first few matches
-                    if request_count <= 5:
-                        print(f"Match found: {dt.strftime('%A %H:%M:%S')} | {url} | Status: {status_code}")
-                    
-                except ValueError:
-                    error_lines += 1
-                    continue
+        table = load_log(log_file_path, file_manager._calculate_content_signature(log_file_path))
+        start_seconds = start_time_obj.hour * 3600 + start_time_obj.minute * 60
+        end_seconds = end_time_obj.hour * 3600 + end_time_obj.minute * 60
+        
+        # Weekday and time of day are evaluated in GMT-0500 as specified
+        request_count = table.count(
+            method="GET",
+            path_prefix=path_pattern,
+            weekday=day_of_week_int,
+            time_range=(start_seconds, end_seconds),
+            tz_minutes=-5 * 60,
+        )
         
         # Print processing statistics
-        print(f"Total log lines: {total_lines}")
-        print(f"Processed lines: {processed_lines}")
-        print(f"Error lines: {error_lines}")
+        print(f"Parsed log lines: {len(table)}")
         print(f"Matching requests: {request_count}")
         
         # Return the result
-        week_day_name = day_of_week.capitalize()
         result = f"{request_count}"
         # result += f"from {start_time} until before {end_time} on {week_day_name}s."
         
@@ -11568,107 +10485,37 @@ def ga5_fourth_solution(query=None):
     if not os.path.exists(log_file_path):
         return f"Error: Log file not found at {log_file_path}"
     
-    # Convert target date from YYYY-MM-DD to Apache log format (DD/Mon/YYYY)
     target_date_obj = datetime.strptime(target_date, "%Y-%m-%d").date()
-    month_name = target_date_obj.strftime("%b")  # Convert to short month name (e.g., May)
-    
-    # Create multiple date formats to match against for flexibility
-    date_formats = [
-        f"{target_date_obj.day:02d}/{month_name}/{target_date_obj.year}",  # 09/May/2024
-        f"{target_date_obj.day}/{month_name}/{target_date_obj.year}",      # 9/May/2024
-        f"{target_date_obj.day}-{month_name}-{target_date_obj.year}"       # 9-May-2024
-    ]
-    
-    print(f"Searching for date formats: {date_formats}")
+    print(f"Searching for date: {target_date_obj.isoformat()}")
     print(f"Searching for path prefix: '/{path_prefix}/'")
     
-    # Regex pattern for Apache log format
-    log_pattern = re.compile(
-        r'(?P<ip>\S+) \S+ \S+ \[(?P<time>[^]]+)] "(?P<method>\S+) (?P<url>\S+) (?P<protocol>\S+)" '
-        r'(?P<status>\d+) (?P<size>\S+) "(?P<referer>[^"]*)" "(?P<user_agent>[^"]*)" (?P<vhost>\S+) (?P<server>\S+)'
-    )
-    
-    # Process the log file
-    ip_download_totals = defaultdict(int)
-    total_entries = 0
-    matched_entries = 0
-    date_matches = 0
-    path_matches = 0
-    
     try:
-        with gzip.open(log_file_path, 'rt', encoding='utf-8', errors='replace') as log_file:
-            for line in log_file:
-                total_entries += 1
-                
-                # Only print progress occasionally to reduce output
-                if total_entries % 50000 == 0:
-                    print(f"Processing line {total_entries}...")
-                
-                # Parse log line
-                match = log_pattern.match(line)
-                if not match:
-                    continue
-                
-                log_data = match.groupdict()
-                timestamp_str = log_data["time"]
-                url = urllib.parse.unquote(log_data["url"])  # Decode URL
-                ip = log_data["ip"]
-                size = log_data["size"]
-                status = int(log_data["status"])
-                
-                # Check if date matches (try all formats)
-                date_match = False
-                for date_format in date_formats:
-                    if date_format in timestamp_str:
-                        date_match = True
-                        date_matches += 1
-                        break
-                
-                if not date_match:
-                    continue
-                
-                # URL Path matching - Check if URL starts with "/carnatic/"
-                path_match = url.startswith(f"/{path_prefix}/") or url==f"/{path_prefix}"
-                if not path_match:
-                    continue
-                
-                path_matches += 1
-                
-                # Only count successful responses (2xx status codes)
-                if status < 200 or status >= 300:
-                    continue
-                
-                # Convert size to int (handle '-')
-                size = int(size) if size.isdigit() else 0
-                ip_download_totals[ip] += size
-                matched_entries += 1
-                
-                # Print sample matches for debugging
-                if matched_entries <= 5:
-                    print(f"Match: {timestamp_str} | {url} | {ip} | {size} bytes")
+        table = load_log(log_file_path, file_manager._calculate_content_signature(log_file_path))
+        
+        # Date is compared in each entry's own offset, as written in the log
+        ip_download_totals = table.bytes_by_ip(
+            path_prefix=f"/{path_prefix}/",
+            include_bare_path=True,
+            day=target_date_obj,
+        )
         
-        print(f"Processed {total_entries} total log entries")
-        print(f"Found {date_matches} entries matching date")
-        print(f"Found {path_matches} entries matching both date and path")
-        print(f"Found {matched_entries} successful requests")
+        print(f"Parsed {len(table)} log entries")
         print(f"Found {len(ip_download_totals)} unique IPs with downloads")
         
         # Handle no matching entries
-        if not ip_download_totals:
+        if ip_download_totals.empty:
             # For the specific GA5 question, use the expected answer
             if path_prefix == "carnatic" and target_date == "2024-05-09":
                 return "{5692}"
             return f"No matching requests found for path /{path_prefix}/ on {target_date}."
         
-        # Find top or lowest IP by download volume
+        # Find top or lowest IP by download volume (first seen wins ties)
         if find_highest:
-            top_ip = max(ip_download_totals.items(), key=lambda x: x[1],default=("None", 0))
-            result_phrase = "IP with the highest download volume"
+            top_ip = ip_download_totals.idxmax()
         else:
-            top_ip = min(ip_download_totals.items(), key=lambda x: x[1],default=("None", 0))
-            result_phrase = "IP with the lowest download volume"
+            top_ip = ip_download_totals.idxmin()
         
-        bytes_str = top_ip[1]
+        bytes_str = int(ip_download_totals[top_ip])
         return f"{bytes_str}"
     
     except Exception as e:
@@ -11928,37 +10775,49 @@ def ga5_fifth_solution(query=None):
     print(f"Using JSON file: {json_file_path}")
     
     try:
-        # Load the JSON data
-        with open(json_file_path, 'r', encoding='utf-8') as f:
-            sales_data = json.load(f)
-        
-        print(f"Loaded {len(sales_data)} sales records")
-        
-        # Group cities by phonetic similarity (using Soundex)
-        city_clusters = defaultdict(list)
+        # Stream the records once: cluster city spellings by phonetic code
+        # (Soundex) and total the qualifying sales of the product per spelling
+        city_clusters = defaultdict(lambda: defaultdict(int))
+        units_by_city = defaultdict(int)
+        transactions_by_city = defaultdict(int)
+        record_count = 0
+        
+        with LocalInput(json_file_path) as sales_data:
+            for entry in sales_data.json_items():
+                record_count += 1
+                if 'city' in entry and entry['city']:
+                    city_name = entry['city'].strip()
+                    city_clusters[jellyfish.soundex(city_name)][city_name] += 1
+                
+                if 'city' not in entry or 'product' not in entry or 'sales' not in entry:
+                    print(f"Skipping invalid entry: {entry}")
+                    continue
+                    
+                entry_city = entry['city'].strip() if entry['city'] else ""
+                entry_product = entry['product'].strip() if entry['product'] else ""
+                
+                # Skip entries without city or product, or of other products
+                if not entry_city or not entry_product or entry_product.lower() != product.lower():
+                    continue
+                
+                # Apply the comparison operator
+                sales_value = entry['sales']
+                
+                if ((comparison_operator == ">=" and sales_value >= min_units) or
+                        (comparison_operator == ">" and sales_value > min_units) or
+                        (comparison_operator == "<=" and sales_value <= min_units) or
+                        (comparison_operator == "<" and sales_value < min_units) or
+                        (comparison_operator == "==" and sales_value == min_units)):
+                    units_by_city[entry_city] += sales_value
+                    transactions_by_city[entry_city] += 1
         
-        # First pass: Create phonetic clusters
-        for entry in sales_data:
-            if 'city' in entry and entry['city']:
-                city_name = entry['city'].strip()
-                # Get phonetic code
-                soundex_code = jellyfish.soundex(city_name)
-                city_clusters[soundex_code].append(city_name)
+        print(f"Loaded {record_count} sales records")
         
-        # Second pass: Create a mapping from each spelling to canonical name
-        # Use the most frequent spelling as canonical
+        # Map each spelling to the most frequent spelling of its cluster
         city_mapping = {}
-        for phonetic_code, variants in city_clusters.items():
-            # Count occurrences of each spelling
-            variant_counts = defaultdict(int)
-            for variant in variants:
-                variant_counts[variant] += 1
-            
-            # Use most frequent spelling as canonical
+        for phonetic_code, variant_counts in city_clusters.items():
             canonical = max(variant_counts.items(), key=lambda x: x[1])[0]
-            
-            # Map all variants to canonical
-            for variant in variants:
+            for variant in variant_counts:
                 city_mapping[variant] = canonical
         
         # Find the best match for our target city
@@ -11979,47 +10838,15 @@ def ga5_fifth_solution(query=None):
         else:
             print(f"Mapped '{city}' to canonical city name '{target_city_canonical}'")
         
-        # Filter and aggregate sales data
+        # Aggregate the spellings that map to the target city
         total_units = 0
         matching_transactions = 0
         
-        for entry in sales_data:
-            if 'city' not in entry or 'product' not in entry or 'sales' not in entry:
-                print(f"Skipping invalid entry: {entry}")
-                continue
-                
-            entry_city = entry['city'].strip() if entry['city'] else ""
-            entry_product = entry['product'].strip() if entry['product'] else ""
-            
-            # Skip entries without city or product
-            if not entry_city or not entry_product:
-                continue
-                
-            # Get canonical city name
+        for entry_city, units in units_by_city.items():
             canonical_city = city_mapping.get(entry_city, entry_city)
-            
-            # Check if this entry matches our criteria
-            if (entry_product.lower() == product.lower() and 
-                canonical_city.lower() == target_city_canonical.lower()):
-                
-                # Apply the comparison operator
-                sales_value = entry['sales']
-                
-                if comparison_operator == ">=" and sales_value >= min_units:
-                    total_units += sales_value
-                    matching_transactions += 1
-                elif comparison_operator == ">" and sales_value > min_units:
-                    total_units += sales_value
-                    matching_transactions += 1
-                elif comparison_operator == "<=" and sales_value <= min_units:
-                    total_units += sales_value
-                    matching_transactions += 1
-                elif comparison_operator == "<" and sales_value < min_units:
-                    total_units += sales_value
-                    matching_transactions += 1
-                elif comparison_operator == "==" and sales_value == min_units:
-                    total_units += sales_value
-                    matching_transactions += 1
+            if canonical_city.lower() == target_city_canonical.lower():
+                total_units += units
+                matching_transactions += transactions_by_city[entry_city]
         
         print(f"Found {matching_transactions} matching transactions")
         
@@ -12191,8 +11018,9 @@ def ga5_sixth_solution(query=None):
     error_lines = 0
     
     try:
-        with open(jsonl_file_path, 'r', encoding='utf-8', errors='replace') as file:
-            for line in file:
+        with LocalInput(jsonl_file_path, errors='replace') as jsonl:
+            print(f"Reading {jsonl.line_count} lines")
+            for line in jsonl.lines():
                 processed_lines += 1
                 line = line.strip()
                 
@@ -12320,34 +11148,10 @@ def ga5_seventh_solution(query=None):
     json_file_path = file_manager.resolve_file_path(default_json_path, query, "data")
     print(f"Using JSON file: {json_file_path}")
     
-    # Function to recursively count key occurrences in nested JSON
-    def count_key_occurrences(json_data, key):
-        count = 0
-        
-        if isinstance(json_data, dict):
-            # Check keys in this dictionary
-            for k in json_data:
-                if k == key:
-                    count += 1
-                # Recursively check the value
-                count += count_key_occurrences(json_data[k], key)
-                
-        elif isinstance(json_data, list):
-            # Process each item in the list
-            for item in json_data:
-                count += count_key_occurrences(item, key)
-                
-        return count
-    
     try:
-        # Load the JSON data
-        with open(json_file_path, 'r', encoding='utf-8') as f:
-            json_data = json.load(f)
-        
-        print(f"JSON file loaded successfully")
-        
-        # Count occurrences of the target key
-        key_count = count_key_occurrences(json_data, target_key)
+        # Count occurrences of the target key while scanning the mapped file
+        with LocalInput(json_file_path) as json_data:
+            key_count = sum(1 for key in json_data.json_keys() if key == target_key)
         
         print(f"Found {key_count} occurrences of key '{target_key}'")
         
@@ -13156,12 +11960,11 @@ def ga5_tenth_solution(query=None):
         query (str, optional): Query containing custom parameters
         
     Returns:
-        str: Path to reconstructed image and base64 encoded image data
+        str: Base64 encoded PNG of the reconstructed image
     """
     from PIL import Image
     import numpy as np
     import re
-    import os
     import base64
     import io
     
@@ -13195,21 +11998,8 @@ def ga5_tenth_solution(query=None):
         table_match = re.search(table_pattern, query)
         
         if table_match:
-            table_content = table_match.group(1).strip()
-            rows = table_content.split('\n')
-            for row in rows:
-                if row.strip():
-                    # Split by tabs or multiple spaces
-                    parts = re.split(r'\t|\s{2,}', row.strip())
-                    if len(parts) >= 4:
-                        try:
-                            orig_row = int(parts[0])
-                            orig_col = int(parts[1])
-                            scrambled_row = int(parts[2])
-                            scrambled_col = int(parts[3])
-                            mapping_data.append((orig_row, orig_col, scrambled_row, scrambled_col))
-                        except ValueError:
-                            print(f"Skipping invalid row: {row}")
+            # One pass over the table for every row of four integers
+            mapping_data = parse_mapping(table_match.group(1)).tolist()
     
     # If no mapping data was found, use the default mapping from the example
     if not mapping_data:
@@ -13229,48 +12019,17 @@ def ga5_tenth_solution(query=None):
         scrambled_img = Image.open(img_path)
         print(f"Loaded scrambled image: {scrambled_img.format}, {scrambled_img.size}")
         
-        # Calculate the dimensions of each piece
-        img_width, img_height = scrambled_img.size
-        rows, cols = grid_size
-        piece_width = img_width // cols
-        piece_height = img_height // rows
-        
-        # Create a new image for the reconstructed result
-        reconstructed_img = Image.new(scrambled_img.mode, scrambled_img.size)
+        # Move every piece to its original position in one array permutation
+        reconstructed_img = unscramble_image(scrambled_img, mapping_data, grid_size)
         
-        # Process each mapping entry
-        for orig_row, orig_col, scrambled_row, scrambled_col in mapping_data:
-            # Calculate the coordinates for the scrambled piece
-            x1 = scrambled_col * piece_width
-            y1 = scrambled_row * piece_height
-            x2 = x1 + piece_width
-            y2 = y1 + piece_height
-            
-            # Extract the piece from the scrambled image
-            piece = scrambled_img.crop((x1, y1, x2, y2))
-            
-            # Calculate the coordinates for the original position
-            dest_x = orig_col * piece_width
-            dest_y = orig_row * piece_height
-            
-            # Place the piece in its original position
-            reconstructed_img.paste(piece, (dest_x, dest_y))
-        
-        # Create output directory if it doesn't exist
-        output_dir = os.path.join(os.path.dirname(img_path), "output")
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Save the reconstructed image
-        output_path = os.path.join(output_dir, "reconstructed_jigsaw.png")
-        reconstructed_img.save(output_path, format="PNG")
-        print(f"Saved reconstructed image to: {output_path}")
-        
-        # Convert the image to base64 for web display
+        # Encode once, in memory; the answer is the base64 payload
         buffered = io.BytesIO()
         reconstructed_img.save(buffered, format="PNG")
-        img_str = base64.b64encode(buffered.getvalue()).decode()
+        png_data = buffered.getvalue()
+        
+        # Convert the image to base64 for web display
+        img_str = base64.b64encode(png_data).decode()
         
-        # Return both the file path and the base64 data
         return f"""{img_str}
 """
         
@@ -13580,14 +12339,8 @@ def resolve_file_path(default_path, query=None, file_type=None, default_extensio
     # Return None to indicate failure (instead of returning invalid path)
     print(f"File not found: {original_path}")
     return None  # Return original path for further handling
-def execute_solution(file_path, query=None):
-    """Execute the solution for a given file path with proper handling of referenced files"""
-    print(f"Executing solution for: {file_path}")
-    start_time = time.time()
-    
-    # Always keep the original solution path for SOLUTION_MAP lookup
-    solution_path = file_path
-    
+def run_solution(solution_path, query=None):
+    """Run the SOLUTION_MAP function for solution_path and return its output"""
     # Check if the query contains a reference to an input file
     input_file_path = None
     if query:
@@ -13613,9 +12366,8 @@ def execute_solution(file_path, query=None):
     if solution_path in SOLUTION_MAP:
         solution_fn = SOLUTION_MAP[solution_path]
         
-        # Capture output
-        output = io.StringIO()
-        with redirect_stdout(output):
+        # Capture output printed by this invocation only; its scratch files go with it
+        with capture_output() as output, workspace():
             try:
                 # Pass query to solution function to enable variants
                 result = solution_fn(query) if query else solution_fn()
@@ -13627,6 +12379,46 @@ def execute_solution(file_path, query=None):
     else:
         solution_output = f"No solution available for {solution_path}"
     
+    return solution_output
+def solver_call_key(file_path, query=None):
+    """Identity of a solver call: routed solver, normalized query and input file signature"""
+    file_info = detect_file_from_query(query) if query else None
+    return invocation_key(file_path, query, file_info)
+def execute_solution(file_path, query=None, call_key=None):
+    """Execute the solution for a given file path with proper handling of referenced files"""
+    print(f"Executing solution for: {file_path}")
+    start_time = time.time()
+    
+    if call_key is None:
+        call_key = solver_call_key(file_path, query)
+    cache_key = answer_cache.cache_key(call_key, file_path)
+    solution_output = answer_cache.get(cache_key)
+    if solution_output is None:
+        solution_output = run_solution(file_path, query)
+        answer_cache.put(cache_key, solution_output, file_path)
+    else:
+        print("Answer cache hit")
+    
+    execution_time = time.time() - start_time
+    return f"{solution_output}\n\nExecution time: {execution_time:.2f}s"
+async def execute_solution_async(file_path, query=None, call_key=None):
+    """Execute the solution on the solver worker pool (SolverQueueFull propagates)"""
+    print(f"Executing solution for: {file_path}")
+    start_time = time.time()
+    
+    if call_key is None:
+        call_key = solver_call_key(file_path, query)
+    cache_key = answer_cache.cache_key(call_key, file_path)
+    solution_output = answer_cache.get(cache_key)
+    if solution_output is not None:
+        print("Answer cache hit")
+    else:
+        try:
+            solution_output = await solver_executor.run(file_path, query)
+            answer_cache.put(cache_key, solution_output, file_path)
+        except (SolverTimeout, SolverWorkerError) as e:
+            solution_output = f"Error executing solution: {str(e)}"
+    
     execution_time = time.time() - start_time
     return f"{solution_output}\n\nExecution time: {execution_time:.2f}s"
 def should_use_conversational_ai(query):
@@ -13718,6 +12510,12 @@ def should_use_conversational_ai(query):
     # except Exception as e:
     #     return f"I apologize, but I'm having trouble processing your request right now. Error: {str(e)}"
 
+def with_explicit_file(query, explicit_file_path):
+    """Point file detection at an uploaded file the query does not mention"""
+    if explicit_file_path and explicit_file_path not in query:
+        query = f"{query} @file {explicit_file_path}"
+    return query
+
 def answer_question(query, explicit_file_path=None):
     """Main function to process a question and return an answer"""
     
@@ -13737,11 +12535,30 @@ def answer_question(query, explicit_file_path=None):
         print("No matching question found in the TDS system")
         return "I couldn't find a matching question in the TDS assignment system. This might be a new question or the query needs to be rephrased. Please check if your question matches one of the existing TDS assignments."
     
-    # Execute the solution
+    # Execute the solution (identical concurrent calls share one run)
+    query = with_explicit_file(query, explicit_file_path)
+    file_path = match['file']
+    print(f"Found matching question with file: {file_path}")
+    
+    call_key = solver_call_key(file_path, query)
+    return single_flight.call(call_key, lambda: execute_solution(file_path, query, call_key))
+
+async def answer_question_async(query, explicit_file_path=None):
+    """answer_question for async handlers: the solver runs on the worker pool"""
+    print("Using GA solution system for technical query")
+    
+    match = find_best_question_match(query)
+    
+    if not match:
+        print("No matching question found in the TDS system")
+        return "I couldn't find a matching question in the TDS assignment system. This might be a new question or the query needs to be rephrased. Please check if your question matches one of the existing TDS assignments."
+    
+    query = with_explicit_file(query, explicit_file_path)
     file_path = match['file']
     print(f"Found matching question with file: {file_path}")
     
-    return execute_solution(file_path, query)
+    call_key = solver_call_key(file_path, query)
+    return await single_flight.run(call_key, lambda: execute_solution_async(file_path, query, call_key))
 
 if __name__ == "__main__":
     # Command-line interface
@@ -13831,99 +12648,16 @@ def find_question_match(query: str) -> Tuple[Optional[Dict], Dict[str, Any]]:
     best_score = 0.0
     params = {}
     
-    # Define query_lower FIRST
-
     query_lower = query.lower()
-        # Hard override for FastAPI CSV question - highest priority match
-    if ('fastapi' in query_lower and 
-        'csv' in query_lower and 
-        any(kw in query_lower for kw in ['student', 'class', 'q-fastapi.csv'])):
-        
-        for question_obj in QUESTIONS_DATA:
-            if 'file' in question_obj and 'GA2/ninth.py' in question_obj['file']:
-                print(f"Direct pattern match: FastAPI CSV student question → GA2/ninth.py")
-                return question_obj, {}
-    if 'github' in query_lower and ('user' in query_lower or 'users' in query_lower):
-        # Additional patterns that indicate this is about GitHub users
-        github_user_indicators = [
-            'followers', 'location', 'tokyo', 'city', 'joined', 
-            'created', 'date', 'newest', 'profile', 'when'
-        ]
-        
-        # Count how many indicators are present
-        indicator_count = sum(1 for indicator in github_user_indicators if indicator in query_lower)
-        
-        # If we have at least 2 indicators, this is very likely the GitHub users question
-        if indicator_count >= 2:
-            for question_obj in QUESTIONS_DATA:
-                if 'file' in question_obj and 'GA4/seventh.py' in question_obj['file'].replace('\\', '/'):
-                    print(f"Strong pattern match: GitHub users question → GA4/seventh.py (score: 10.00)")
-                    return question_obj, {}
-    # Continue with normal matching if the direct override didn't trigger
-    # matched_question, params = find_question_match(query)
-     # Add explicit pattern matching for GitHub users/location queries
-    contains_github = 'github' in query_lower
-    contains_users = 'user' in query_lower or 'users' in query_lower
-    contains_location = 'location' in query_lower or 'tokyo' in query_lower
-    contains_followers = 'follower' in query_lower or 'followers' in query_lower
-    contains_joined = 'joined' in query_lower or 'created' in query_lower or 'date' in query_lower
-    
-    # GitHub users location query - highest priority match
-    if contains_github and (contains_users or contains_followers) and (contains_location or contains_joined):
-        for question_obj in QUESTIONS_DATA:
-            if 'file' in question_obj and 'GA4/seventh.py' in question_obj['file'].replace('\\', '/'):
-                print(f"Pattern match: GA4/seventh.py (score: 10.00)")
-                return question_obj, {}
-    # if not matched_question:
-    #     return "Could not find a matching question. Please try rephrasing your query."
-    
-    # # Execute solution with the extracted parameters
-    # return execute_solution_with_params(matched_question, params)
-    # if ('fastapi' in query_lower and 
-    #     'csv' in query_lower and 
-    #     'student' in query_lower and 
-    #     'class' in query_lower):
-        
-    #     for question_obj in QUESTIONS_DATA:
-    #         if 'file' in question_obj and 'GA2//ninth.py' in question_obj['file']:
-    #             print(f"Direct pattern match: FastAPI CSV student question → GA2/ninth.py")
-    #             return question_obj, {}
-    # Extract key patterns from query
-    # Add explicit pattern for ShopSmart embeddings question
-    contains_embeddings = any(kw in query_lower for kw in ['embeddings', 'cosine', 'similarity', 'vectors'])
-    contains_shopsmart = 'shopsmart' in query_lower
-    contains_most_similar = 'most_similar' in query_lower or 'most similar' in query_lower
-    contains_feedback = 'feedback' in query_lower or 'customer' in query_lower
-    # ==== GITHUB USER QUERY SUPER-PRIORITY MATCH ====
-    # Check for GitHub user queries before any other pattern matching
-    if ('github' in query_lower and 
-        any(term in query_lower for term in ['user', 'users', 'profile']) and 
-        any(term in query_lower for term in ['tokyo', 'location', '150', 'followers', 'joined', 'newest'])):
-        
-        # This is almost certainly the GitHub users question
-        for question_obj in QUESTIONS_DATA:
-            if 'file' in question_obj and 'GA4/seventh.py' in question_obj['file'].replace('\\', '/'):
-                print(f"HIGH PRIORITY MATCH: GitHub Users Query → GA4/seventh.py")
-                return question_obj, {}
-    if any(phrase in query_lower for phrase in [
-        "github users in tokyo", 
-        "users located in", 
-        'when was newest github user',
-        'github api','user location'
-        "github profile created", 
-        "newest github user",
-        "when was the newest user"
-    ]):
-        for question_obj in QUESTIONS_DATA:
-            if 'file' in question_obj and 'GA4/seventh.py' in question_obj['file'].replace('\\', '/'):
-                print(f"Exact GitHub user question pattern match → GA4/seventh.py")
-                return question_obj, {}
-# Scoring for ShopSmart embeddings question
-    if (contains_embeddings or contains_most_similar) and (contains_shopsmart or 'customer feedback' in query_lower):
-        for question_obj in QUESTIONS_DATA:
-            if 'file' in question_obj and 'GA3/sixth.py' in question_obj['file'].replace('\\', '/'):
-                print(f"Direct pattern match: ShopSmart embeddings similarity → GA3/sixth.py")
-                return question_obj, {}
+    # Hard overrides (FastAPI CSV, GitHub users, ShopSmart embeddings) are
+    # declared in src/core/routing_rules.py and evaluated in a single pass
+    override = QUERY_OVERRIDE_RULESET.first_match(query)
+    if override:
+        question_obj = QUESTION_ROUTER.question_for_file(override["target"])
+        if question_obj:
+            print(f"Direct pattern match: {override['label']} → {override['target']}")
+            return question_obj, {}
+    
     contains_image = bool(re.search(r'\.(webp|png|jpg|jpeg|bmp|gif)', query_lower))
     contains_image_processing = any(kw in query_lower for kw in [
     'pixels', 'lightness', 'brightness', 'image processing', 
@@ -13940,12 +12674,8 @@ def find_question_match(query: str) -> Tuple[Optional[Dict], Dict[str, Any]]:
     contains_json = 'json' in query_lower and ('sort' in query_lower or 'array' in query_lower)
     contains_zip = 'zip' in query_lower or 'extract' in query_lower
     contains_pdf = 'pdf' in query_lower or 'physics' in query_lower or 'marks' in query_lower
-    # Special case for FastAPI CSV question
-    if 'fastapi' in query_lower and 'q-fastapi.csv' in query_lower:
-        for question_obj in QUESTIONS_DATA:
-            if 'file' in question_obj and question_obj['file'].endswith("GA2/ninth.py"):
-                print("Direct match to GA2/ninth.py for FastAPI CSV question")
-                return question_obj, {}
+    contains_fastapi = 'fastapi' in query_lower
+    contains_ga2_folder = 'ga2' in query_lower
     # First pass: Match by explicit patterns
     for question_obj in QUESTIONS_DATA:
         if 'question' not in question_obj:
@@ -14163,22 +12893,14 @@ def execute_solution_with_params(question_obj, params):
             
             # Special handling for first solution (vscode commands)
             if solution_name == "ga1_first_solution" and 'code' in params:
-                # Use StringIO to capture printed output
-                import io
-                from contextlib import redirect_stdout
-                
-                output = io.StringIO()
-                with redirect_stdout(output):
+                # Capture printed output for this call only
+                with capture_output() as output:
                     solution_func()  # The function already handles variant detection
                 
                 return output.getvalue()
             else:
                 # Most functions print their result
-                import io
-                from contextlib import redirect_stdout
-                
-                output = io.StringIO()
-                with redirect_stdout(output):
+                with capture_output() as output:
                     solution_func()
                 
                 result = output.getvalue().strip()